@@ -0,0 +1,101 @@
+"""Time to open a long chat.
+
+Seeds a throw-away store with one chat of many turns, then measures how long
+``ChatContainer.load_messages`` takes, reading the latest page into the
+virtualized message list, against reading every message into it and against
+mounting a ``ChatItem`` for every message (how oterm used to open a chat),
+running headless.
+
+Run with ``uv run python benchmarks/chat_load.py [messages]``.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+async def main() -> None:
+    os.environ["OTERM_DATA_DIR"] = tempfile.mkdtemp(prefix="oterm-bench-")
+
+    from textual.app import App, ComposeResult
+
+    from oterm.app.widgets.chat import ChatContainer, ChatItem, MessageList
+    from oterm.store.store import Store
+    from oterm.types import ChatModel
+
+    store = await Store.get_store()
+    chat = ChatModel(name="long", model="m")
+    chat.id = chat_id = await store.save_chat(chat)
+    await store.connection.executemany(
+        "INSERT INTO message(chat_id, author, text, images) VALUES (?, ?, ?, '[]')",
+        [
+            (
+                chat_id,
+                "user" if i % 2 == 0 else "assistant",
+                f"**{i}**\n\n" + PARAGRAPH * 3 + "\n\n- point\n- point\n",
+            )
+            for i in range(MESSAGES)
+        ],
+    )
+    await store.connection.commit()
+    messages = await store.get_messages(chat_id)
+    print(f"{MESSAGES} messages")
+
+    class Host(App):
+        CSS_PATH = "../src/oterm/app/oterm.tcss"
+
+        def compose(self) -> ComposeResult:
+            yield ChatContainer(chat_model=chat)
+
+    async def open_chat() -> float:
+        app = Host()
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            start = time.perf_counter()
+            await container.load_messages()
+            await pilot.pause()
+            return (time.perf_counter() - start) * 1e3
+
+    async def read_every_message() -> float:
+        app = Host()
+        async with app.run_test() as pilot:
+            message_list = app.query_one(MessageList)
+            start = time.perf_counter()
+            await message_list.load(await store.get_messages(chat_id))
+            message_list.scroll_end(animate=False)
+            await pilot.pause()
+            return (time.perf_counter() - start) * 1e3
+
+    async def mount_every_message() -> float:
+        app = Host()
+        async with app.run_test() as pilot:
+            message_container = app.query_one("#messageContainer")
+            start = time.perf_counter()
+            for message in messages:
+                item = ChatItem()
+                item.author = message.role
+                item.text = message.text
+                await message_container.mount(item)
+            await pilot.pause()
+            return (time.perf_counter() - start) * 1e3
+
+    every_ms = await mount_every_message()
+    read_ms = await read_every_message()
+    page_ms = await open_chat()
+    print(f"{'mount every message':<24}{every_ms:>10.0f} ms")
+    print(f"{'virtualized':<24}{read_ms:>10.0f} ms")
+    print(f"{'virtualized, paged':<24}{page_ms:>10.0f} ms")
+    await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""Size of an attached photo as sent, and the time to prepare it.
+
+Makes a photo-like image (a noisy gradient) the size of a 24 MP phone photo
+and prepares it with ``prepare_image`` for a few settings, against how oterm
+used to send it: re-encoded as JPEG at full resolution.
+
+Run with ``uv run python benchmarks/image_upload.py [megapixels]``.
+"""
+
+import sys
+import time
+from io import BytesIO
+
+import PIL.Image as PILImage
+
+from oterm.images import format_size, prepare_image
+
+MEGAPIXELS = float(sys.argv[1]) if len(sys.argv) > 1 else 24
+ITERATIONS = 3
+
+
+def _photo() -> bytes:
+    width = int((MEGAPIXELS * 1e6 * 3 / 2) ** 0.5)
+    height = width * 2 // 3
+    gradient = PILImage.linear_gradient("L").resize((width, height))
+    noise = PILImage.effect_noise((width, height), 40)
+    image = PILImage.merge("RGB", (gradient, noise, gradient.rotate(180)))
+    buf = BytesIO()
+    image.save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def _full_size(data: bytes) -> bytes:
+    buf = BytesIO()
+    PILImage.open(BytesIO(data)).convert("RGB").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def main() -> None:
+    data = _photo()
+    print(f"{MEGAPIXELS:g} MP photo, {format_size(len(data))}")
+    print(f"{'':<24}{'sent':>10}{'prepare (ms)':>14}")
+    cases = {
+        "full size (before)": lambda: _full_size(data),
+        "1568 px": lambda: prepare_image(data, 1568).data,
+        "2048 px": lambda: prepare_image(data, 2048).data,
+        "1568 px, webp": lambda: prepare_image(data, 1568, format="webp").data,
+    }
+    for name, prepare in cases.items():
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            sent = prepare()
+        ms = (time.perf_counter() - start) / ITERATIONS * 1e3
+        print(f"{name:<24}{format_size(len(sent)):>10}{ms:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
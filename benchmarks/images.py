@@ -0,0 +1,112 @@
+"""Cost of opening a chat full of generated images.
+
+Seeds a throw-away store with one chat whose assistant messages each carry a
+1024×1024 image, then opens it headless three ways: showing the full-size
+images (how oterm used to), making the thumbnails, and reading the
+thumbnails back from the disk cache. Reports the time to open and the
+decoded pixel data the mounted images hold.
+
+Run with ``uv run python benchmarks/images.py [images]``.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+IMAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+
+
+async def main() -> None:
+    os.environ["OTERM_DATA_DIR"] = tempfile.mkdtemp(prefix="oterm-bench-")
+
+    from PIL import Image as PILImage
+    from textual.app import App, ComposeResult
+
+    import oterm.thumbnails as thumbnails
+    from oterm.app.widgets.chat import (
+        AssistantImage,
+        ChatContainer,
+        ChatItem,
+        MessageList,
+    )
+    from oterm.store.store import Store
+    from oterm.types import ChatModel, MessageModel
+
+    store = await Store.get_store()
+    chat = ChatModel(name="images", model="m")
+    chat.id = await store.save_chat(chat)
+    rng = random.Random(0)
+    for i in range(IMAGES):
+        buf = BytesIO()
+        PILImage.frombytes("RGB", (1024, 1024), rng.randbytes(1024 * 1024 * 3)).save(
+            buf, format="PNG"
+        )
+        hash = await store.save_image(buf.getvalue())
+        await store.save_message(
+            MessageModel(chat_id=chat.id, role="user", text=f"draw {i}")
+        )
+        await store.save_message(
+            MessageModel(chat_id=chat.id, role="assistant", text="here", images=[hash])
+        )
+    print(f"{IMAGES} images of 1024×1024")
+
+    class FullSizeList(MessageList):
+        async def _thumbnails(self, message: MessageModel):
+            if message.role != "assistant" or not message.images:
+                return []
+            images = await store.get_images(message.images)
+            return [
+                (hash, PILImage.open(BytesIO(images[hash]))) for hash in message.images
+            ]
+
+    class FullSizeContainer(ChatContainer):
+        def compose(self) -> ComposeResult:
+            for widget in super().compose():
+                if isinstance(widget, MessageList):
+                    widget = FullSizeList(id="messageContainer")
+                yield widget
+
+    async def open_chat(container_class: type[ChatContainer]) -> tuple[float, int]:
+        class Host(App):
+            CSS_PATH = "../src/oterm/app/oterm.tcss"
+
+            def compose(self) -> ComposeResult:
+                yield container_class(chat_model=chat)
+
+        app = Host()
+        async with app.run_test(size=(120, 300)) as pilot:
+            container = app.query_one(ChatContainer)
+            start = time.perf_counter()
+            await container.load_messages()
+            await pilot.pause()
+            elapsed = (time.perf_counter() - start) * 1e3
+            pixels = 0
+            for item in container.query(ChatItem):
+                for image in item.query(AssistantImage):
+                    image.image.load()
+                    pixels += len(image.image.getbands()) * (
+                        image.image.width * image.image.height
+                    )
+            return elapsed, pixels // 2**20
+
+    full = await open_chat(FullSizeContainer)
+    thumbnails._memory.clear()
+    made = await open_chat(ChatContainer)
+    thumbnails._memory.clear()
+    cached = await open_chat(ChatContainer)
+    print(f"{'':<24}{'open (ms)':>10}{'pixels (MiB)':>14}")
+    for name, (ms, mib) in (
+        ("full size", full),
+        ("thumbnails, made", made),
+        ("thumbnails, on disk", cached),
+    ):
+        print(f"{name:<24}{ms:>10.0f}{mib:>14}")
+    await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Memory held by the in-memory log after a long session, and logging cost.
+
+Logs as many lines as a chatty MCP server might forward over a day and
+reports the memory the log holds (traced with ``tracemalloc``) and the time
+per call, for the unbounded list oterm used to keep, the bounded
+``LogBuffer``, and the buffer with the rotating file sink on.
+
+Run with ``uv run python benchmarks/logs.py [lines]``.
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from textual import LogGroup
+
+import oterm.log
+from oterm.log import LogBuffer, log, start_file_sink, stop_file_sink
+
+LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+
+class _Unbounded(list):
+    """The plain list `log_lines` used to be."""
+
+    level = 0
+
+    def keeps(self, group: LogGroup) -> bool:
+        return True
+
+
+def _run(name: str, buffer) -> None:
+    oterm.log.log_lines = buffer
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(LINES):
+        log.debug(f"server-everything: notification {i}", level="debug")
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop_file_sink()
+    print(f"{name:<24}{held / 2**20:>12.1f}{elapsed / LINES * 1e6:>12.1f}")
+
+
+def main() -> None:
+    print(f"{LINES} lines")
+    print(f"{'':<24}{'held (MiB)':>12}{'call (µs)':>12}")
+    _run("unbounded list", _Unbounded())
+    _run("LogBuffer", LogBuffer())
+    start_file_sink(Path(tempfile.mkdtemp(prefix="oterm-bench-")) / "oterm.log")
+    _run("LogBuffer + file", LogBuffer())
+
+
+if __name__ == "__main__":
+    main()
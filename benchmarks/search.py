@@ -0,0 +1,86 @@
+"""Latency of searching messages across every chat.
+
+Fills a store with synthetic chats and times ``Store.search_messages``, which
+ranks only the ``SEARCH_CANDIDATES`` most recent matches, against the same
+search ranking every match with BM25.
+
+Run with ``uv run python benchmarks/search.py [messages]``.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+MESSAGES_PER_CHAT = 200
+ITERATIONS = 10
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo "
+    "consequat duis aute irure in reprehenderit voluptate velit esse cillum"
+).split()
+
+# Each message also mentions one of this many rarer terms (``term0``, ...).
+TERMS = 5_000
+QUERIES = ("term42", "term42 dolor", "term4", "ma", "magna aliqua")
+
+
+async def _timed(fn: Callable[[], Awaitable[object]]) -> float:
+    """Mean latency of ``fn`` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1e3
+
+
+async def main() -> None:
+    os.environ["OTERM_DATA_DIR"] = tempfile.mkdtemp(prefix="oterm-bench-")
+
+    import oterm.store.store as store_mod
+    from oterm.store.store import Store
+    from oterm.types import ChatModel
+
+    store = await Store.get_store()
+    rng = random.Random(0)
+    for start in range(0, MESSAGES, MESSAGES_PER_CHAT):
+        chat_id = await store.save_chat(ChatModel(name=f"chat {start}", model="m"))
+        await store.connection.executemany(
+            "INSERT INTO message(chat_id, author, text) VALUES (?, ?, ?);",
+            [
+                (
+                    chat_id,
+                    "user" if i % 2 == 0 else "assistant",
+                    " ".join(
+                        [
+                            *rng.choices(WORDS, k=rng.randint(10, 120)),
+                            f"term{rng.randrange(TERMS)}",
+                        ]
+                    ),
+                )
+                for i in range(min(MESSAGES_PER_CHAT, MESSAGES - start))
+            ],
+        )
+    await store.connection.commit()
+    candidates = store_mod.SEARCH_CANDIDATES
+    print(f"{MESSAGES} messages, mean latency of the top 50 results")
+
+    async def search(query: str, limit: int) -> None:
+        await store.search_messages(query, candidates=limit)
+
+    print(f"{'query':<16}{'rank all (ms)':>16}{f'rank {candidates} (ms)':>18}")
+    for query in QUERIES:
+        all_ms = await _timed(lambda q=query: search(q, MESSAGES))
+        recent_ms = await _timed(lambda q=query: search(q, candidates))
+        print(f"{query:<16}{all_ms:>16.1f}{recent_ms:>18.1f}")
+
+    await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
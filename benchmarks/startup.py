@@ -0,0 +1,80 @@
+"""Startup cost of restoring saved chats.
+
+Seeds a throw-away store with many chats, then measures:
+
+* the store work done before the first tab can be shown, when every chat's
+  messages are fetched up front (how oterm used to start) versus fetching only
+  chat metadata (messages load when a tab is first activated);
+* the wall time until ``OTerm`` has mounted every tab, running headless.
+
+Run with ``uv run python benchmarks/startup.py [chats] [messages-per-chat]``.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+CHATS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+
+async def main() -> None:
+    data_dir = tempfile.mkdtemp(prefix="oterm-bench-")
+    os.environ["OTERM_DATA_DIR"] = data_dir
+    # The app never reaches the provider; the key only satisfies construction.
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    from oterm.config import appConfig
+    from oterm.store.store import Store
+    from oterm.types import ChatModel
+
+    appConfig.set("splash-screen", False)
+
+    store = await Store.get_store()
+    for c in range(CHATS):
+        chat_id = await store.save_chat(
+            ChatModel(name=f"chat {c}", model="gpt-4o-mini", provider="openai-chat")
+        )
+        await store.connection.executemany(
+            "INSERT INTO message(chat_id, author, text, images) VALUES (?, ?, ?, '[]')",
+            [
+                (chat_id, "user" if m % 2 == 0 else "assistant", "lorem ipsum " * 40)
+                for m in range(MESSAGES)
+            ],
+        )
+    await store.connection.commit()
+    print(f"store: {store.db_path} ({CHATS} chats × {MESSAGES} messages)")
+
+    start = time.perf_counter()
+    chats = await store.get_chats()
+    for chat in chats:
+        assert chat.id is not None
+        await store.get_messages(chat.id)
+    eager_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    chats = await store.get_chats()
+    lazy_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"{'store work before first tab':<32}{'ms':>10}")
+    print(f"{'  eager (all messages)':<32}{eager_ms:>10.1f}")
+    print(f"{'  lazy (chat metadata)':<32}{lazy_ms:>10.1f}")
+
+    from textual.widgets import TabPane
+
+    from oterm.app.oterm import OTerm
+
+    app = OTerm()
+    start = time.perf_counter()
+    async with app.run_test() as pilot:
+        while len(app.query(TabPane)) < len(chats):
+            await pilot.pause(0.01)
+        mounted_ms = (time.perf_counter() - start) * 1e3
+        await app.action_quit()
+    print(f"{'app: all tabs mounted':<32}{mounted_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
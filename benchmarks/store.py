@@ -0,0 +1,90 @@
+"""Per-operation latency of the chat store.
+
+Compares opening an ``aiosqlite`` connection per call (how ``Store`` used to
+work) against the long-lived connection ``Store`` now owns. Both columns run
+the same ``Store`` method; the per-call column swaps in a freshly opened
+connection around each call.
+
+Run with ``uv run python benchmarks/store.py [iterations]``.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+async def _timed(fn: Callable[[], Awaitable[object]], iterations: int) -> float:
+    """Mean latency of ``fn`` in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main() -> None:
+    os.environ["OTERM_DATA_DIR"] = tempfile.mkdtemp(prefix="oterm-bench-")
+
+    import aiosqlite
+
+    from oterm.store.store import Store
+    from oterm.types import ChatModel, MessageModel
+
+    store = await Store.get_store()
+    print(f"store: {Path(store.db_path)}")
+
+    read_chat = await store.save_chat(ChatModel(name="read", model="m"))
+    for i in range(50):
+        await store.save_message(
+            MessageModel(
+                chat_id=read_chat,
+                role="user" if i % 2 == 0 else "assistant",
+                text="lorem ipsum " * 40,
+            )
+        )
+    write_chat = await store.save_chat(ChatModel(name="write", model="m"))
+    message = MessageModel(chat_id=write_chat, role="user", text="hello " * 50)
+
+    def per_call(
+        method: Callable[[], Awaitable[object]],
+    ) -> Callable[[], Awaitable[None]]:
+        async def run() -> None:
+            shared = store.connection
+            async with aiosqlite.connect(store.db_path) as connection:
+                await connection.execute("PRAGMA foreign_keys = on;")
+                store.connection = connection
+                try:
+                    await method()
+                finally:
+                    store.connection = shared
+
+        return run
+
+    operations: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+        ("save_message", lambda: store.save_message(message)),
+        ("get_messages", lambda: store.get_messages(read_chat)),
+        ("get_chats", store.get_chats),
+        ("get_chat", lambda: store.get_chat(read_chat)),
+        ("rename_chat", lambda: store.rename_chat(write_chat, "renamed")),
+    ]
+
+    print(f"{ITERATIONS} iterations, mean latency per operation")
+    print(f"{'operation':<14}{'per-call (µs)':>16}{'shared (µs)':>14}{'speedup':>10}")
+    for name, method in operations:
+        before_us = await _timed(per_call(method), ITERATIONS)
+        after_us = await _timed(method, ITERATIONS)
+        print(
+            f"{name:<14}{before_us:>16.1f}{after_us:>14.1f}"
+            f"{before_us / after_us:>9.1f}x"
+        )
+
+    await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
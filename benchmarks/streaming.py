@@ -0,0 +1,70 @@
+"""Cost of streaming a long response through ``ChatItem``.
+
+Feeds many small synthetic deltas to ``ChatItem.append_text`` and
+``append_thinking`` and finishes the stream, comparing the buffered deltas
+``ChatItem`` now keeps against concatenating each delta onto the ``text`` and
+``thinking`` reactives (how oterm used to stream), running headless.
+
+Run with ``uv run python benchmarks/streaming.py [deltas]``.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DELTAS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+WORDS = ("lorem ", "ipsum ", "dolor ", "sit ", "amet,\n", "consectetur ")
+
+
+async def main() -> None:
+    os.environ["OTERM_DATA_DIR"] = tempfile.mkdtemp(prefix="oterm-bench-")
+
+    from textual.app import App, ComposeResult
+
+    from oterm.app.widgets.chat import ChatItem
+
+    class ConcatenatingItem(ChatItem):
+        async def append_text(self, delta: str) -> None:
+            await super().append_text(delta)
+            self._materialize()
+
+        async def append_thinking(self, delta: str) -> None:
+            await super().append_thinking(delta)
+            self._materialize()
+
+    deltas = [WORDS[i % len(WORDS)] for i in range(DELTAS)]
+    print(f"{DELTAS} deltas, {sum(map(len, deltas)) // 1024} KiB")
+
+    class Host(App):
+        CSS_PATH = "../src/oterm/app/oterm.tcss"
+
+        def compose(self) -> ComposeResult:
+            yield from ()
+
+    async def stream(item: ChatItem) -> float:
+        app = Host()
+        async with app.run_test() as pilot:
+            item.author = "assistant"
+            await app.screen.mount(item)
+            await pilot.pause()
+            start = time.perf_counter()
+            for delta in deltas:
+                await item.append_thinking(delta)
+            for delta in deltas:
+                await item.append_text(delta)
+            await item.finish_stream()
+            elapsed = (time.perf_counter() - start) * 1e3
+            assert item.text == "".join(deltas)
+            return elapsed
+
+    concat_ms = await stream(ConcatenatingItem())
+    buffered_ms = await stream(ChatItem())
+    print(f"{'concatenate per delta':<24}{concat_ms:>10.0f} ms")
+    print(f"{'buffered':<24}{buffered_ms:>10.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,15 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
 from dataclasses import replace
+from functools import lru_cache
 from typing import Any
 
 from pydantic_ai import Agent
 from pydantic_ai import Tool as PydanticTool
 from pydantic_ai.capabilities import AbstractCapability, NativeTool
+from pydantic_ai.models import Model, infer_model
 from pydantic_ai.models.openai import OpenAIChatModel, OpenAIResponsesModel
 from pydantic_ai.native_tools import ImageGenerationTool
 from pydantic_ai.providers.ollama import OllamaProvider
@@ -12,17 +18,64 @@ from pydantic_ai.settings import ModelSettings
 from pydantic_ai.toolsets import AbstractToolset
 
 from oterm.config import envConfig
-from oterm.providers.capabilities import get_capabilities
+from oterm.providers.capabilities import cached_capabilities
+from oterm.providers.http import get_http_client
 from oterm.providers.ollama import openai_compat_base_url
 from oterm.providers.settings import get_supported_setting_keys
 
+# Agents (and, separately, models) kept alive for reuse. Chats with the same
+# configuration share an agent; chats on the same model share its provider.
+# Providers oterm builds itself share HTTP clients per server (see
+# `oterm.providers.http`).
+AGENT_CACHE_SIZE = 32
+
+_agents: OrderedDict[tuple[Any, ...], Agent[None, str]] = OrderedDict()
+
+# Prompt caching turned on by default where the provider needs to be asked.
+# For Anthropic, cache breakpoints go after the instructions and the tool
+# definitions, and an automatic one moves forward with the conversation, so
+# each turn re-reads the previous turns from the cache. OpenAI caches prompt
+# prefixes on its own; `_build_model_settings` adds a cache key so requests
+# sharing a prefix are routed to the same cache. Chat parameters setting any
+# of these keys take precedence.
+_PROMPT_CACHE_SETTINGS: dict[str, dict[str, Any]] = {
+    "anthropic": {
+        "anthropic_cache_instructions": True,
+        "anthropic_cache_tool_definitions": True,
+        "anthropic_cache": True,
+    },
+}
+# Defaults left out when the chat turns on a setting they can't be combined
+# with: Anthropic's automatic breakpoint and per-message ones are exclusive.
+_PROMPT_CACHE_CONFLICTS: dict[str, tuple[str, ...]] = {
+    "anthropic_cache": ("anthropic_cache_messages",),
+}
+_PROMPT_CACHE_KEY_PROVIDERS = ("openai-chat", "openai-responses")
+
+
+def _prompt_cache_key(model: str, system: str | None) -> str:
+    """A key shared by requests that start with the same model and instructions."""
+    digest = hashlib.sha256(f"{model}\0{system or ''}".encode()).hexdigest()
+    return f"oterm-{digest[:16]}"
+
 
 def _build_model_settings(
     parameters: dict[str, Any] | None,
     thinking: bool,
     provider: str,
+    model: str = "",
+    system: str | None = None,
 ) -> ModelSettings:
-    settings: dict[str, Any] = {}
+    settings: dict[str, Any] = {
+        key: value
+        for key, value in _PROMPT_CACHE_SETTINGS.get(provider, {}).items()
+        if not any(
+            (parameters or {}).get(other)
+            for other in _PROMPT_CACHE_CONFLICTS.get(key, ())
+        )
+    }
+    if provider in _PROMPT_CACHE_KEY_PROVIDERS:
+        settings["openai_prompt_cache_key"] = _prompt_cache_key(model, system)
     if parameters:
         supported = get_supported_setting_keys(provider)
         for key, value in parameters.items():
@@ -46,68 +99,147 @@ def _build_model_settings(
     return ModelSettings(**settings)
 
 
-def get_agent(
-    provider: str = "ollama",
-    model: str = "",
-    system: str | None = None,
-    tools: list[PydanticTool] | None = None,
-    toolsets: list[AbstractToolset[None]] | None = None,
-    parameters: dict[str, Any] | None = None,
-    thinking: bool = False,
-) -> Agent[None, str]:
-    pydantic_model: OpenAIChatModel | OpenAIResponsesModel | str
-    capabilities: list[AbstractCapability[None]] = []
+def _model_inputs(provider: str, model: str) -> tuple[str | None, bool]:
+    """What `_get_model` builds the model from besides its name.
+
+    The config of an OpenAI-compatible endpoint (as JSON), and whether an
+    Ollama model can think, as far as its capabilities are already known (see
+    `fetch_capabilities`). They are passed to `_get_model` so that its cache
+    builds a new model when they change.
+    """
+    if provider == "ollama":
+        capabilities = cached_capabilities(provider, model)
+        return None, capabilities is not None and capabilities.supports_thinking
+    if provider.startswith("openai-compat/"):
+        from oterm.providers import get_openai_compatible_providers
+
+        endpoint_name = provider.removeprefix("openai-compat/")
+        config = get_openai_compatible_providers().get(endpoint_name)
+        return json.dumps(config, sort_keys=True), False
+    return None, False
+
+
+@lru_cache(maxsize=AGENT_CACHE_SIZE)
+def _get_model(
+    provider: str, model: str, endpoint: str | None = None, thinking: bool = False
+) -> tuple[Model, tuple[NativeTool, ...]]:
+    """The pydantic-ai model for ``provider``/``model`` and its native tools.
+
+    ``endpoint`` and ``thinking`` are as returned by `_model_inputs`.
+    """
     if provider == "ollama":
+        base_url = openai_compat_base_url()
         ollama_provider = OllamaProvider(
-            base_url=openai_compat_base_url(),
+            base_url=base_url,
             api_key=envConfig.OLLAMA_API_KEY or "ollama",
+            http_client=get_http_client(base_url),
         )
         # Ollama's pydantic-ai profiles don't mark thinking-capable models as
         # supporting thinking, so the unified `thinking` setting is dropped
         # before the request and thinking can't be turned off. Ollama itself
         # reports the capability, so trust that and let the setting through.
         profile = ollama_provider.model_profile(model)
-        if profile is not None and get_capabilities(provider, model).supports_thinking:
+        if profile is not None and thinking:
             profile = replace(profile, supports_thinking=True)
-        pydantic_model = OpenAIChatModel(
-            model_name=model,
-            provider=ollama_provider,
-            profile=profile,
+        return (
+            OpenAIChatModel(
+                model_name=model,
+                provider=ollama_provider,
+                profile=profile,
+            ),
+            (),
         )
-    elif provider == "openai-responses":
-        pydantic_model = OpenAIResponsesModel(model_name=model)
-        capabilities.append(NativeTool(ImageGenerationTool()))
-    elif provider.startswith("openai-compat/"):
-        from oterm.providers import (
-            UNRESOLVED_API_KEY,
-            _resolve_api_key,
-            get_openai_compatible_providers,
+    if provider == "openai-responses":
+        base_url = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        return (
+            OpenAIResponsesModel(
+                model_name=model,
+                provider=OpenAIProvider(http_client=get_http_client(base_url)),
+            ),
+            (NativeTool(ImageGenerationTool()),),
         )
+    if provider.startswith("openai-compat/"):
+        from oterm.providers import UNRESOLVED_API_KEY, _resolve_api_key
 
         endpoint_name = provider.removeprefix("openai-compat/")
-        config = get_openai_compatible_providers().get(endpoint_name)
+        config = json.loads(endpoint or "null")
         if config is None:
             raise ValueError(
                 f"OpenAI-compatible endpoint {endpoint_name!r} is not configured. "
                 f"Add it to the `openaiCompatible` section of your config.json."
             )
         api_key = _resolve_api_key(config.get("api_key")) or UNRESOLVED_API_KEY
-        pydantic_model = OpenAIChatModel(
-            model_name=model,
-            provider=OpenAIProvider(
-                base_url=config["base_url"],
-                api_key=api_key,
+        return (
+            OpenAIChatModel(
+                model_name=model,
+                provider=OpenAIProvider(
+                    base_url=config["base_url"],
+                    api_key=api_key,
+                    http_client=get_http_client(config["base_url"]),
+                ),
             ),
+            (),
         )
-    else:
-        pydantic_model = f"{provider}:{model}"
+    return infer_model(f"{provider}:{model}"), ()
+
+
+def clear_agent_cache() -> None:
+    """Forget cached agents and models.
+
+    Provider config is only read at startup, so this is for tests, which
+    patch providers and environment between runs.
+    """
+    _agents.clear()
+    _get_model.cache_clear()
+
+
+def get_agent(
+    provider: str = "ollama",
+    model: str = "",
+    system: str | None = None,
+    tools: list[PydanticTool] | None = None,
+    toolsets: list[AbstractToolset[None]] | None = None,
+    parameters: dict[str, Any] | None = None,
+    thinking: bool = False,
+) -> Agent[None, str]:
+    """An agent for the given chat configuration, reused while it is cached.
+
+    Tools and toolsets are matched by identity; callers pass the same objects
+    for the same selection (see ``_resolve_tools`` in the chat widget).
+    """
+    tools = tools or []
+    toolsets = toolsets or []
+    inputs = _model_inputs(provider, model)
+    key = (
+        provider,
+        model,
+        inputs,
+        system,
+        tuple(id(tool) for tool in tools),
+        tuple(id(toolset) for toolset in toolsets),
+        json.dumps(parameters, sort_keys=True, default=str),
+        thinking,
+    )
+    agent = _agents.get(key)
+    if agent is not None:
+        _agents.move_to_end(key)
+        return agent
 
-    agent: Agent[None, str] = Agent(
+    pydantic_model, native_tools = _get_model(provider, model, *inputs)
+    capabilities: list[AbstractCapability[None]] = list(native_tools)
+    agent = Agent(
         pydantic_model,
         instructions=system,
-        tools=tools or [],
-        toolsets=toolsets or [],
+        tools=tools,
+        toolsets=toolsets,
         capabilities=capabilities,
-        model_settings=_build_model_settings(parameters, thinking, provider),
+        model_settings=_build_model_settings(
+            parameters, thinking, provider, model, system
+        ),
     )
+    # The agent holds on to the tools and toolsets, so their ids in the key
+    # can't be reused by other objects while the entry lives.
+    _agents[key] = agent
+    if len(_agents) > AGENT_CACHE_SIZE:
+        _agents.popitem(last=False)
     return agent
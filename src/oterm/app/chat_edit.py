@@ -21,10 +21,14 @@ from oterm.app.widgets.tool_select import ToolSelector
 from oterm.providers import (
     get_available_providers,
     get_provider_name,
-    list_models,
     ollama,
 )
-from oterm.providers.capabilities import get_capabilities
+from oterm.providers.capabilities import (
+    get_capabilities,
+    note_ollama_models,
+    remember_ollama_capabilities,
+)
+from oterm.providers.catalogue import get_models
 from oterm.providers.settings import get_supported_setting_keys
 from oterm.types import ChatModel
 
@@ -196,13 +200,14 @@ class ChatEdit(ModalScreen[str]):
                 list_response: ListResponse = await asyncio.to_thread(
                     ollama.list_models
                 )
+                note_ollama_models(list_response.models)
                 self.models = [m.model or "" for m in list_response.models]
                 self.models_size = {}
                 for m in list_response.models:
                     if m.model:  # pragma: no branch
                         self.models_size[m.model] = m["size"]
             else:
-                self.models = await asyncio.to_thread(list_models, provider)
+                self.models = await get_models(provider)
         except Exception as e:
             self.app.notify(
                 f"Failed to load models for {provider}: {e}", severity="error"
@@ -235,6 +240,7 @@ class ChatEdit(ModalScreen[str]):
                     self.app.notify(f"Failed to load model info: {e}", severity="error")
                     return
                 self.models_info[model] = meta
+                remember_ollama_capabilities(model, meta)
 
             self.model_info = meta
             self._populate_parameter_inputs(self.parameters)
@@ -0,0 +1,92 @@
+import asyncio
+import re
+
+from rich.text import Text
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Container
+from textual.screen import ModalScreen
+from textual.widgets import Input, Label, OptionList
+from textual.widgets.option_list import Option
+
+from oterm.store.store import SEARCH_MATCH_END, SEARCH_MATCH_START, Store
+from oterm.types import SearchResultModel
+
+# Seconds to wait for typing to pause before searching.
+SEARCH_DELAY = 0.15
+
+
+def _snippet(result: SearchResultModel) -> Text:
+    """The result's chat, author and snippet, with the matches highlighted."""
+    text = Text()
+    text.append(result.chat_name, style="bold")
+    text.append(f"  {result.role}\n", style="dim")
+    # Snippets span lines; show them on one.
+    snippet = re.sub(r"\s+", " ", result.snippet).strip()
+    before, *matches = snippet.split(SEARCH_MATCH_START)
+    text.append(before)
+    for piece in matches:
+        match, _, rest = piece.partition(SEARCH_MATCH_END)
+        text.append(match, style="reverse")
+        text.append(rest)
+    return text
+
+
+class ChatSearch(ModalScreen[tuple[int, int]]):
+    """Searches the messages of every chat.
+
+    Dismisses with the chat and message ids of the chosen result.
+    """
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        Binding("down", "focus_results", "results", show=False),
+    ]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.results: list[SearchResultModel] = []
+
+    def action_cancel(self) -> None:
+        self.dismiss()
+
+    def action_focus_results(self) -> None:
+        results = self.query_one("#search-results", OptionList)
+        if results.option_count:
+            results.focus()
+            results.highlighted = results.highlighted or 0
+
+    @on(Input.Changed)
+    def on_changed(self, event: Input.Changed) -> None:
+        self.search(event.value)
+
+    @work(exclusive=True, group="search")
+    async def search(self, query: str) -> None:
+        # Superseded by the next keystroke until typing pauses.
+        await asyncio.sleep(SEARCH_DELAY)
+        store = await Store.get_store()
+        self.results = await store.search_messages(query)
+        results = self.query_one("#search-results", OptionList)
+        results.clear_options()
+        results.add_options(
+            Option(_snippet(result), id=str(i)) for i, result in enumerate(self.results)
+        )
+
+    @on(Input.Submitted)
+    def on_submit(self) -> None:
+        if self.results:
+            self._choose(self.results[0])
+
+    @on(OptionList.OptionSelected)
+    def on_selected(self, event: OptionList.OptionSelected) -> None:
+        self._choose(self.results[event.option_index])
+
+    def _choose(self, result: SearchResultModel) -> None:
+        self.dismiss((result.chat_id, result.message_id))
+
+    def compose(self) -> ComposeResult:
+        with Container(classes="screen-container full-height"):
+            yield Label("Search chats", classes="title")
+            yield Input(id="search-input", placeholder="Search all chats…")
+            yield OptionList(id="search-results")
@@ -1,5 +1,3 @@
-from base64 import b64encode
-from io import BytesIO
 from pathlib import Path
 
 import PIL.Image as PILImage
@@ -14,7 +12,7 @@ from textual_image.widget import Image
 from oterm.app.widgets.image import IMAGE_EXTENSIONS, ImageDirectoryTree
 
 
-class ImageSelect(ModalScreen[tuple[Path, str]]):
+class ImageSelect(ModalScreen[Path]):
     BINDINGS = [
         ("escape", "cancel", "Cancel"),
     ]
@@ -29,15 +27,11 @@ class ImageSelect(ModalScreen[tuple[Path, str]]):
 
     @on(DirectoryTree.FileSelected)
     async def on_image_selected(self, ev: DirectoryTree.FileSelected) -> None:
-        try:
-            buffer = BytesIO()
-            image = PILImage.open(ev.path)
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-            image.save(buffer, format="JPEG")
-            b64 = b64encode(buffer.getvalue()).decode("utf-8")
-            self.dismiss((ev.path, b64))
-        except UnidentifiedImageError:
+        # Only the path: the chat reads and prepares the image off the event
+        # loop, for the model it is sent to.
+        if ev.path.suffix.lower() in IMAGE_EXTENSIONS:
+            self.dismiss(ev.path)
+        else:
             self.dismiss()
 
     @on(DirectoryTree.NodeHighlighted)
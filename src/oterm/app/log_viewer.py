@@ -1,24 +1,54 @@
+import logging
+from collections import deque
 from datetime import datetime
 
+from textual import on
 from textual.app import ComposeResult
-from textual.containers import Container
+from textual.containers import Container, Horizontal
+from textual.message import Message
 from textual.reactive import reactive
 from textual.screen import ModalScreen
-from textual.widgets import Label, RichLog
+from textual.widgets import Input, Label, RichLog, Select
 
 from oterm.config import envConfig
-from oterm.log import log_lines
-from oterm.utils import debounce
+from oterm.log import LogGroup, log_lines, severity
+
+LEVELS = [
+    ("debug", logging.DEBUG),
+    ("info", logging.INFO),
+    ("warning", logging.WARNING),
+    ("error", logging.ERROR),
+]
 
 
 class LogViewer(ModalScreen[str]):
+    """Shows the log, following it as lines are added.
+
+    The viewer subscribes to `log_lines` and is told when lines arrive, so it
+    does nothing while the log is quiet. Only new lines are filtered and
+    written; changing the filter rewrites the view, from the lines shown when
+    the filter only narrows.
+    """
+
     line_count: reactive[int] = reactive(0)
 
+    AUTO_FOCUS = "RichLog"
     BINDINGS = [
         ("escape", "cancel", "Cancel"),
         ("s", "save_logs", "Save logs"),
     ]
 
+    class LinesAdded(Message):
+        """Lines were added to the log since the viewer last read it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.level = logging.DEBUG
+        self.text = ""
+        # The lines matching the filter, as written to the view.
+        self._shown: deque[tuple[LogGroup, str]] = deque(maxlen=log_lines.capacity)
+        self._pending = False
+
     def action_cancel(self) -> None:
         self.dismiss()
 
@@ -38,25 +68,72 @@ class LogViewer(ModalScreen[str]):
             return
         self.app.notify(f"Logs exported to {path}")
 
-    @debounce(0.5)
-    async def log_update(self) -> None:
+    def on_mount(self) -> None:
+        log_lines.subscribe(self._lines_added)
+        self._read()
+
+    def on_unmount(self) -> None:
+        log_lines.unsubscribe(self._lines_added)
+
+    def _lines_added(self) -> None:
+        # Called for every line logged, possibly from another thread; only the
+        # first since the last read posts a message.
+        if not self._pending:
+            self._pending = True
+            self.post_message(self.LinesAdded())
+
+    def on_log_viewer_lines_added(self) -> None:
+        self._pending = False
+        self._read()
+
+    def _read(self) -> None:
+        """Write the lines logged since the last read that match the filter."""
+        lines = log_lines.since(self.line_count)
+        self.line_count = log_lines.total
+        self._write([line for line in lines if self._matches(line)])
+
+    def _matches(self, line: tuple[LogGroup, str]) -> bool:
+        group, text = line
+        return severity(group) >= self.level and self.text in text.lower()
+
+    def _write(self, lines: list[tuple[LogGroup, str]]) -> None:
+        self._shown.extend(lines)
         widget = self.query_one(RichLog)
-        new_lines = log_lines[self.line_count :]
-        self.line_count += len(new_lines)
-        for group, line in new_lines:
+        for group, line in lines:
             widget.write(f"[b]{group.name}[/b] - {line}")
-        await self.log_update()
 
-    async def on_screen_resume(self) -> None:
-        await self.log_update()
+    def _filter(self, level: int, text: str) -> None:
+        self._read()
+        # A higher level or a longer text only hides lines that are shown.
+        narrower = level >= self.level and self.text in text
+        source = list(self._shown if narrower else log_lines)
+        self.level, self.text = level, text
+        self._shown.clear()
+        self.query_one(RichLog).clear()
+        self._write([line for line in source if self._matches(line)])
+
+    @on(Select.Changed, "#log-level")
+    def on_level_changed(self, event: Select.Changed) -> None:
+        if isinstance(event.value, int):  # pragma: no branch
+            self._filter(event.value, self.text)
+
+    @on(Input.Changed, "#log-filter")
+    def on_text_changed(self, event: Input.Changed) -> None:
+        self._filter(self.level, event.value.lower())
 
     def compose(self) -> ComposeResult:
         with Container(id="log-viewer", classes="screen-container full-height"):
             yield Label("oterm logs", classes="title")
+            with Horizontal(id="log-filters"):
+                yield Select(
+                    LEVELS, id="log-level", value=logging.DEBUG, allow_blank=False
+                )
+                yield Input(id="log-filter", placeholder="Filter…")
             yield RichLog(
                 highlight=True,
                 markup=True,
                 auto_scroll=True,
                 wrap=True,
+                max_lines=log_lines.capacity,
             )
             yield Label("[dim]press [b]s[/b] to save logs to disk[/dim]")
@@ -1,20 +1,30 @@
+import asyncio
 from collections.abc import Iterable
 
 from textual import on, work
 from textual.app import App, ComposeResult, SystemCommand
 from textual.binding import Binding
+from textual.css.query import NoMatches
 from textual.screen import Screen
 from textual.widgets import Footer, Header, TabbedContent, TabPane
 
 from oterm.app.chat_edit import ChatEdit
 from oterm.app.chat_export import ChatExport, slugify
+from oterm.app.chat_search import ChatSearch
 from oterm.app.splash import splash
 from oterm.app.themes.solarized_dark import solarized_dark
 from oterm.app.widgets.chat import ChatContainer
 from oterm.app.widgets.empty_state import EmptyState
 from oterm.config import appConfig
+from oterm.providers.capabilities import fetch_capabilities, refresh_ollama_models
+from oterm.providers.catalogue import prefetch_models
+from oterm.providers.http import close_http_clients
 from oterm.store.store import Store
-from oterm.tools.mcp.setup import setup_mcp_servers, teardown_mcp_servers
+from oterm.tools.mcp.setup import (
+    mcp_tool_meta,
+    setup_mcp_servers,
+    teardown_mcp_servers,
+)
 from oterm.types import ChatModel
 from oterm.utils import is_up_to_date
 
@@ -36,6 +46,7 @@ class OTerm(App):
         ),
         Binding("ctrl+n", "new_chat", "new chat", id="new.chat"),
         Binding("ctrl+t", "toggle_thinking", "toggle thinking", id="toggle.thinking"),
+        Binding("ctrl+s", "search_chats", "search", id="search.chats"),
         Binding("ctrl+l", "show_logs", "show logs", id="show.logs"),
         Binding("ctrl+q", "quit", "quit", id="quit"),
     ]
@@ -77,6 +88,11 @@ class OTerm(App):
             "Shows previously sent prompts in the current chat",
             self.action_prompt_history,
         )
+        yield SystemCommand(
+            "Search chats",
+            "Searches the messages of every chat",
+            self.action_search_chats,
+        )
         yield SystemCommand(
             "Show logs", "Shows the logs of the app", self.action_show_logs
         )
@@ -84,8 +100,14 @@ class OTerm(App):
     async def action_quit(self) -> None:
         self.log("Quitting...")
         await teardown_mcp_servers()
+        await close_http_clients()
+        await Store.close_store()
         return self.exit()
 
+    async def on_unmount(self) -> None:
+        # However the app exits, not only through `quit`.
+        await Store.close_store()
+
     def action_cycle_chat(self, change: int) -> None:
         tabs = self.query_one(TabbedContent)
         if tabs.active_pane is None:
@@ -113,6 +135,7 @@ class OTerm(App):
         id = await store.save_chat(chat_model)
         chat_model.id = id
 
+        await fetch_capabilities(chat_model.provider, chat_model.model)
         pane = TabPane(name, id=f"chat-{id}")
         pane.compose_add_child(
             ChatContainer(
@@ -136,7 +159,7 @@ class OTerm(App):
         if tabs.active_pane is None:
             return
         chat = tabs.active_pane.query_one(ChatContainer)
-        chat.action_toggle_thinking()
+        await chat.action_toggle_thinking()
 
     async def action_rename_chat(self) -> None:
         tabs = self.query_one(TabbedContent)
@@ -192,6 +215,25 @@ class OTerm(App):
         chat = tabs.active_pane.query_one(ChatContainer)
         await chat.action_history()
 
+    @work
+    async def action_search_chats(self) -> None:
+        found = await self.push_screen_wait(ChatSearch())
+        if found is None:
+            return
+        chat_id, message_id = found
+        tabs = self.query_one(TabbedContent)
+        try:
+            pane = tabs.get_pane(f"chat-{chat_id}")
+        except NoMatches:  # pragma: no cover
+            return
+        container = pane.query_one(ChatContainer)
+        container.land_on(message_id)
+        if tabs.active == pane.id:
+            await container.load_messages()
+        else:
+            # Activating the tab loads its transcript, landing on the message.
+            tabs.active = pane.id or ""
+
     async def action_show_logs(self) -> None:
         from oterm.app.log_viewer import LogViewer
 
@@ -203,7 +245,15 @@ class OTerm(App):
 
         builtin_tools.clear()
         builtin_tools.extend(discover_tools())
-        await setup_mcp_servers()
+        await setup_mcp_servers(on_ready=self.on_mcp_server_ready)
+
+    def on_mcp_server_ready(self, name: str) -> None:
+        """Hand a late MCP server's tools to the chats that selected them."""
+        names = {meta["name"] for meta in mcp_tool_meta.get(name, [])}
+        for container in self.query(ChatContainer):
+            if names & set(container.chat_model.tools):
+                container.rebuild_agent()
+        self.notify(f"MCP server {name} is ready.")
 
     @work(exclusive=True, group="checks")
     async def perform_checks(self) -> None:
@@ -214,6 +264,16 @@ class OTerm(App):
                 severity="warning",
             )
 
+    @work(exclusive=True, group="capabilities")
+    async def refresh_capabilities(self) -> None:
+        """Forget cached model capabilities whose model has changed since."""
+        await refresh_ollama_models()
+
+    @work(exclusive=True, group="models")
+    async def prefetch_model_lists(self) -> None:
+        """Catalogue every available provider's models ahead of the model picker."""
+        await prefetch_models()
+
     async def on_mount(self) -> None:
         self.register_theme(solarized_dark)
         store = await Store.get_store()
@@ -234,23 +294,30 @@ class OTerm(App):
             self.set_keymap(keymap)
 
         await self.load_tools()
+        # Building each chat's agent reads its model's capabilities; fetch
+        # uncached ones concurrently and off the event loop first.
+        await asyncio.gather(
+            *(
+                fetch_capabilities(provider, model)
+                for provider, model in {(c.provider, c.model) for c in saved_chats}
+            )
+        )
 
         async def on_splash_done(message) -> None:
             tabs = self.query_one(TabbedContent)
             for chat_model in saved_chats:
                 # Only process chats with a valid ID
                 if chat_model.id is not None:
-                    messages = await store.get_messages(chat_model.id)
-                    container = ChatContainer(
-                        chat_model=chat_model,
-                        messages=messages,
-                    )
+                    # Messages are fetched when the tab is first activated.
+                    container = ChatContainer(chat_model=chat_model)
                     pane = TabPane(
                         chat_model.name, container, id=f"chat-{chat_model.id}"
                     )
                     tabs.add_pane(pane)
             self._update_empty_state()
             self.perform_checks()
+            self.refresh_capabilities()
+            self.prefetch_model_lists()
 
         if appConfig.get("splash-screen"):
             self.push_screen(splash, callback=on_splash_done)
@@ -264,6 +331,10 @@ class OTerm(App):
     @work
     @on(TabbedContent.TabActivated)
     async def on_tab_activated(self, event: TabbedContent.TabActivated) -> None:
+        # Adding panes at startup activates each one in turn; only load the
+        # tab that is still active by the time the event is handled.
+        if self.query_one(TabbedContent).active != event.pane.id:
+            return
         container = event.pane.query_one(ChatContainer)
         await container.load_messages()
 
@@ -3,7 +3,9 @@ import base64
 import binascii
 import json
 import time
-from collections.abc import AsyncGenerator
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator, Mapping, Sequence
 from io import BytesIO
 from pathlib import Path
 from typing import Any
@@ -44,6 +46,7 @@ from textual.app import ComposeResult
 from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.css.query import NoMatches
 from textual.events import Click
+from textual.message import Message
 from textual.reactive import reactive
 from textual.widget import Widget
 from textual.widgets import (
@@ -54,19 +57,34 @@ from textual.widgets import (
 from textual.widgets.markdown import MarkdownStream
 from textual_image.widget import Image as TerminalImage
 
-from oterm.agent import get_agent
+from oterm.agent import AGENT_CACHE_SIZE, get_agent
 from oterm.app.chat_edit import ChatEdit
 from oterm.app.chat_rename import ChatRename
 from oterm.app.prompt_history import PromptHistory
-from oterm.app.widgets.image import ImageAdded
+from oterm.app.widgets.image import ImageAdded, ImageSelected
 from oterm.app.widgets.prompt import IMAGE_TOKEN_RE, FlexibleInput, PostableTextArea
-from oterm.config import envConfig
+from oterm.compaction import (
+    compaction_settings,
+    summarize,
+    turn_starts,
+    turns_to_summarize,
+    with_summary,
+)
+from oterm.config import appConfig, envConfig
+from oterm.context import ContextWindow
+from oterm.images import format_size, image_media_type, image_settings, prepare_image
 from oterm.log import log
-from oterm.providers.capabilities import get_capabilities
-from oterm.store.store import Store
+from oterm.providers.capabilities import fetch_capabilities
+from oterm.store.store import Store, dump_turn, image_hash, load_turn
+from oterm.thumbnails import cached_thumbnails, make_thumbnails
 from oterm.tools import builtin_tools
 from oterm.tools.mcp.setup import mcp_servers, mcp_tool_meta
-from oterm.types import ChatModel, MessageModel
+from oterm.types import ChatModel, MessageModel, SummaryModel
+
+# Default for the `stream-interval` config key: the most often, in seconds, a
+# streaming response is pushed to the UI. Deltas arriving in between are
+# batched into one update.
+STREAM_INTERVAL = 1 / 60
 
 # Auto-follow the streaming response when the viewport is within this many
 # rows of the bottom. Accounts for partial-row rounding and content shifts
@@ -78,19 +96,96 @@ def _near_bottom(container) -> bool:
     return container.max_scroll_y - container.scroll_y <= _SCROLL_FOLLOW_THRESHOLD
 
 
-def _decode_image(b64: str) -> BinaryContent | None:
+def _merge_deltas(pieces: list[Any]) -> list[Any]:
+    """Fold runs of text (or thinking) deltas into a single delta each."""
+    merged: list[Any] = []
+    for piece in pieces:
+        last = merged[-1] if merged else None
+        if isinstance(piece, TextPartDelta) and isinstance(last, TextPartDelta):
+            merged[-1] = TextPartDelta(
+                content_delta=last.content_delta + piece.content_delta
+            )
+        elif isinstance(piece, ThinkingPartDelta) and isinstance(
+            last, ThinkingPartDelta
+        ):
+            merged[-1] = ThinkingPartDelta(
+                content_delta=(last.content_delta or "") + (piece.content_delta or "")
+            )
+        else:
+            merged.append(piece)
+    return merged
+
+
+async def coalesce(
+    pieces: AsyncIterator[Any], interval: float
+) -> AsyncGenerator[list[Any], None]:
+    """Batch ``pieces`` so a consumer handles them at most once per ``interval``.
+
+    ``pieces`` is drained by a background task, so fast producers never wait
+    on the consumer. Each batch holds everything that arrived since the last
+    one, with consecutive text and thinking deltas merged. The first piece
+    after a quiet spell is yielded immediately; an exception (including a
+    cancellation) raised by ``pieces`` is re-raised after the pieces that
+    preceded it.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue()
+    done = object()
+
+    async def pump() -> None:
+        try:
+            async for piece in pieces:
+                queue.put_nowait(piece)
+        except (Exception, asyncio.CancelledError) as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(done)
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(pump())
+    last_flush = -interval
+    try:
+        while True:
+            batch = [await queue.get()]
+            delay = last_flush + interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            end = batch[-1]
+            failed = isinstance(end, BaseException)
+            finished = end is done or failed
+            if finished:
+                batch.pop()
+            if batch:
+                yield _merge_deltas(batch)
+                last_flush = loop.time()
+            if failed:
+                raise end
+            if finished:
+                return
+    finally:
+        task.cancel()
+
+
+def _decode_image(image: str | bytes | None) -> BinaryContent | None:
+    if image is None:
+        return None
+    if isinstance(image, bytes):
+        return BinaryContent(data=image, media_type=image_media_type(image))
     try:
-        data = base64.b64decode(b64, validate=True)
+        data = base64.b64decode(image, validate=True)
     except (binascii.Error, ValueError):
         return None
-    return BinaryContent(data=data, media_type="image/png")
+    return BinaryContent(data=data, media_type=image_media_type(data))
 
 
 def build_user_prompt(
-    text: str, images: list[str]
+    text: str, images: Sequence[str | bytes | None]
 ) -> tuple[str | list[str | BinaryContent], int]:
     """Interleave text and images by `[Image #N]` tokens, 1-indexed into images.
 
+    Images are base64 strings (freshly attached) or bytes loaded from the
+    store; `None` stands for an image the store no longer has.
     Falls back to appending all images at the end when no tokens appear, so
     history saved before tokens existed still renders correctly on regenerate.
     Returns (user_prompt, skipped_count).
@@ -101,8 +196,8 @@ def build_user_prompt(
             return text, 0
         parts: list[str | BinaryContent] = [text] if text else []
         skipped = 0
-        for b64 in images:
-            content = _decode_image(b64)
+        for image in images:
+            content = _decode_image(image)
             if content is None:
                 skipped += 1
             else:
@@ -150,6 +245,14 @@ def _last_user_prompt_index(history: list[ModelMessage]) -> int | None:
     return None
 
 
+# Filtered MCP toolsets by server and selected tool names, along with the
+# server they wrap. Handing the same toolset to `get_agent` for the same
+# selection lets it reuse a cached agent. As many are kept as agents.
+_filtered_toolsets: OrderedDict[tuple[str, frozenset[str]], tuple[Any, Any]] = (
+    OrderedDict()
+)
+
+
 def _resolve_tools(tool_names: list[str]):
     """Split selected tool names into pydantic-ai Tool objects and filtered MCP toolsets."""
     from pydantic_ai import Tool as PydanticTool
@@ -170,13 +273,20 @@ def _resolve_tools(tool_names: list[str]):
     for server_name, meta in mcp_tool_meta.items():
         names_on_server = {m["name"] for m in meta}
         available_names |= names_on_server
-        chosen = selected & names_on_server
+        chosen = frozenset(selected & names_on_server)
         if chosen:
-            toolsets.append(
-                mcp_servers[server_name].filtered(
+            server = mcp_servers[server_name]
+            key = (server_name, chosen)
+            cached = _filtered_toolsets.get(key)
+            if cached is None or cached[0] is not server:
+                filtered = server.filtered(
                     lambda _ctx, td, names=chosen: td.name in names
                 )
-            )
+                cached = _filtered_toolsets[key] = (server, filtered)
+            _filtered_toolsets.move_to_end(key)
+            if len(_filtered_toolsets) > AGENT_CACHE_SIZE:
+                _filtered_toolsets.popitem(last=False)
+            toolsets.append(cached[1])
 
     missing = selected - available_names
     if missing:
@@ -189,32 +299,62 @@ class ChatContainer(Widget):
     messages: reactive[list[MessageModel]] = reactive([])
     images: list[tuple[Path, str]] = []
 
+    # Stored messages shown at a time: the latest ones when the transcript is
+    # first loaded, then the ones before as it is scrolled back.
+    PAGE_SIZE = 100
+
     def __init__(
         self,
         *children: Widget,
-        messages: list[MessageModel] = [],
+        messages: list[MessageModel] | None = None,
         chat_model: ChatModel,
         **kwargs,
     ) -> None:
+        """Without ``messages``, the chat's history is fetched from the store
+        the first time it is needed (see ``_fetch_messages``), so saved chats
+        can be restored into tabs from their metadata alone."""
         super().__init__(*children, **kwargs)
 
-        self.messages = messages
         self.chat_model = chat_model
         self.model = chat_model.model
         self.system = chat_model.system
 
+        self._messages_fetched = messages is not None
+        self._fetch_lock = asyncio.Lock()
+        self._older_lock = asyncio.Lock()
+        self.messages = messages if messages is not None else []
         self.pydantic_history: list[ModelMessage] = self._build_pydantic_history(
-            messages
+            self.messages
         )
-
-        self._rebuild_agent()
+        # Stands in for the earliest turns of `pydantic_history` in requests
+        # once compaction has summarized them (see `compact_history`).
+        self.summary: SummaryModel | None = None
+        self._compacting = False
+        # Bumped when the history is cleared, so a summary of the old history
+        # that finishes afterwards is dropped.
+        self._history_epoch = 0
+
+        self.rebuild_agent()
         self.loaded = False
         self.loading = False
+        self._landing: int | None = None
         self.images = []
         self._stream_usage: RunUsage = RunUsage()
+        # The messages the last run added after the user's prompt, saved with
+        # the assistant message so reloaded chats keep their tool calls.
+        self._turn_messages: list[ModelMessage] = []
 
-    def _rebuild_agent(self) -> None:
-        """(Re)build the agent for the current chat_model. Defers errors to send time."""
+    def rebuild_agent(self) -> None:
+        """(Re)build the agent for the current chat_model. Defers errors to send time.
+
+        The model's capabilities are read from the cache, without asking the
+        provider; callers fetch them beforehand (see `fetch_capabilities`).
+        """
+        self.context_window = ContextWindow.for_chat(
+            self.chat_model.provider,
+            self.chat_model.model,
+            self.chat_model.parameters,
+        )
         tools, toolsets = _resolve_tools(self.chat_model.tools)
         try:
             self.agent = get_agent(
@@ -232,23 +372,41 @@ class ChatContainer(Widget):
             self._agent_error = str(e)
 
     def _build_pydantic_history(
-        self, messages: list[MessageModel]
+        self,
+        messages: list[MessageModel],
+        images: Mapping[str, bytes] | None = None,
     ) -> list[ModelMessage]:
-        # Tool calls/responses from prior turns are not preserved across
-        # reloads: the message schema only stores user/assistant text and
-        # images, so a turn that fanned out into tool calls reconstructs as
-        # a single TextPart of the final answer.
+        """Replay stored messages as pydantic-ai history.
+
+        ``images`` maps the hashes in ``MessageModel.images`` to their bytes;
+        images missing from it are skipped. Assistant messages saved with their
+        turn's messages (``MessageModel.history``) replay them as they were,
+        tool calls and returns included, so the model doesn't run them again;
+        older ones, and turns whose images are missing, reconstruct as a
+        single TextPart of the final answer.
+        """
         pydantic_messages: list[ModelMessage] = []
         for msg_model in messages:
             if msg_model.role == "user":
-                content, _ = build_user_prompt(msg_model.text, msg_model.images)
+                content, _ = build_user_prompt(
+                    msg_model.text,
+                    [(images or {}).get(hash) for hash in msg_model.images],
+                )
                 pydantic_messages.append(
                     ModelRequest(parts=[UserPromptPart(content=content)])
                 )
             else:
-                pydantic_messages.append(
-                    ModelResponse(parts=[TextPart(content=msg_model.text)])
+                turn = (
+                    load_turn(msg_model.history, images)
+                    if msg_model.history is not None
+                    else None
                 )
+                if turn:
+                    pydantic_messages.extend(turn)
+                else:
+                    pydantic_messages.append(
+                        ModelResponse(parts=[TextPart(content=msg_model.text)])
+                    )
         return pydantic_messages
 
     def on_mount(self) -> None:
@@ -277,9 +435,15 @@ class ChatContainer(Widget):
         # so callers don't have to.
         seen_file_ids: set[str] = set()
 
-        async with self.agent.iter(
-            user_prompt, message_history=self.pydantic_history
-        ) as run:
+        history = self.context_window.fit(
+            with_summary(self.pydantic_history, self.summary), user_prompt
+        )
+        if self.context_window.dropped_turns:
+            log.info(
+                f"Left {self.context_window.dropped_turns} earlier turn(s) out "
+                "to fit the context window"
+            )
+        async with self.agent.iter(user_prompt, message_history=history) as run:
             async for node in run:
                 if Agent.is_model_request_node(node):
                     async with node.stream(run.ctx) as request_stream:
@@ -332,28 +496,267 @@ class ChatContainer(Widget):
                                 )
                                 yield event.part
             if run.result is not None:  # pragma: no branch
-                self.pydantic_history = list(run.result.all_messages())
+                new_messages = list(run.result.new_messages())
+                self.pydantic_history = self.pydantic_history + new_messages
+                # The first new message is the request carrying the prompt,
+                # which is saved (and replayed) as the user message.
+                self._turn_messages = new_messages[1:]
                 self._stream_usage = run.result.usage
 
-    async def load_messages(self) -> None:
+    async def _fetch_messages(self) -> None:
+        """Fetch messages and rebuild the pydantic history, once per chat."""
+        async with self._fetch_lock:
+            if self._messages_fetched:
+                return
+            chat_id = self.chat_model.id
+            assert chat_id is not None
+            store = await Store.get_store()
+            self.messages = await store.get_messages(chat_id)
+            self.summary = await store.get_summary(chat_id)
+            self.pydantic_history = await self._load_pydantic_history()
+            self._messages_fetched = True
+
+    async def _load_pydantic_history(self) -> list[ModelMessage]:
+        """Rebuild the pydantic history, loading its images from the store.
+
+        Those of user messages, and of assistant messages whose saved turn
+        references them.
+        """
+        store = await Store.get_store()
+        images = await store.get_images(
+            [
+                hash
+                for m in self.messages
+                if m.role == "user" or m.history is not None
+                for hash in m.images
+            ]
+        )
+        return self._build_pydantic_history(self.messages, images)
+
+    async def _load_images(self, hashes: list[str]) -> list[bytes | None]:
+        store = await Store.get_store()
+        images = await store.get_images(hashes)
+        return [images.get(hash) for hash in hashes]
+
+    async def _save_images(self, images: Sequence[str | bytes]) -> list[str]:
+        """Store images content-addressed and return their hashes.
+
+        Base64 that does not decode is kept verbatim, so `[Image #N]` tokens
+        still line up; it never resolves to stored bytes.
+        """
+        store = await Store.get_store()
+        hashes: list[str] = []
+        for image in images:
+            content = _decode_image(image)
+            if content is not None:
+                hashes.append(await store.save_image(content.data))
+            elif isinstance(image, str):  # pragma: no branch
+                hashes.append(image)
+        return hashes
+
+    async def _stream_response(
+        self,
+        user_prompt: str | list[str | BinaryContent],
+        response_chat_item: "ChatItem",
+        status: "UsageStatus",
+    ) -> list[bytes]:
+        """Stream an agent run into ``response_chat_item``.
+
+        Shared by sending and regenerating so both render deltas through the
+        item's ``MarkdownStream``s. Returns the images the response produced.
+        """
         message_container = self.query_one("#messageContainer")
-        if self.loaded or self.loading:
-            message_container.scroll_end()
+        assistant_images: list[bytes] = []
+        interval = appConfig.get("stream-interval", STREAM_INTERVAL)
+        async for batch in coalesce(self.stream_agent(user_prompt), interval):
+            status.update_context(self.context_window.used, self.context_window.budget)
+            follow = _near_bottom(message_container)
+            for piece in batch:
+                match piece:
+                    case ThinkingPartDelta(content_delta=delta):
+                        status.start_output()
+                        await response_chat_item.append_thinking(delta or "")
+                    case TextPartDelta(content_delta=delta):
+                        status.start_output()
+                        await response_chat_item.append_text(delta)
+                    case ToolCallPart() | NativeToolCallPart():
+                        await response_chat_item.add_tool_call(piece)
+                    case ToolReturnPart() | NativeToolReturnPart():
+                        response_chat_item.update_tool_result(
+                            piece.tool_call_id, piece.content
+                        )
+                        items = (
+                            piece.content
+                            if isinstance(piece.content, list)
+                            else [piece.content]
+                        )
+                        for item in items:
+                            if isinstance(item, BinaryImage):
+                                await response_chat_item.add_image(item.data)
+                                assistant_images.append(item.data)
+                    case RetryPromptPart():
+                        response_chat_item.update_tool_result(
+                            piece.tool_call_id,
+                            f"error: {piece.model_response()}",
+                        )
+                    case FilePart(content=BinaryImage(data=data)):
+                        await response_chat_item.add_image(data)
+                        assistant_images.append(data)
+            status.update_usage(
+                self._stream_usage.input_tokens,
+                self._stream_usage.output_tokens,
+                self._stream_usage.cache_read_tokens,
+                self._stream_usage.cache_write_tokens,
+            )
+            if follow:  # pragma: no branch
+                message_container.scroll_end()
+
+        await response_chat_item.finish_stream()
+
+        status.update_usage(
+            self._stream_usage.input_tokens,
+            self._stream_usage.output_tokens,
+            self._stream_usage.cache_read_tokens,
+            self._stream_usage.cache_write_tokens,
+        )
+        status.finish()
+        if _near_bottom(message_container):  # pragma: no branch
+            self.call_after_refresh(message_container.scroll_end)
+        return assistant_images
+
+    def _maybe_compact(self) -> None:
+        """Summarize older turns in the background once compaction calls for it."""
+        settings = compaction_settings()
+        if settings is None or self._compacting:
+            return
+        turns = turns_to_summarize(
+            self.pydantic_history,
+            self.summary,
+            settings["threshold"],
+            settings["keepTurns"],
+        )
+        if not turns:
+            return
+        self._compacting = True
+        # Read now: the chat may be cleared before the worker starts.
+        previous = self.summary
+        done = previous.turns if previous is not None else 0
+        starts = turn_starts(self.pydantic_history)
+        self.compact_history(
+            settings["provider"],
+            settings["model"],
+            previous,
+            self.pydantic_history[starts[done] : starts[turns]],
+            turns,
+            self._history_epoch,
+        )
+
+    @work(group="compaction")
+    async def compact_history(
+        self,
+        provider: str,
+        model: str,
+        previous: SummaryModel | None,
+        messages: list[ModelMessage],
+        turns: int,
+        epoch: int,
+    ) -> None:
+        """Fold ``messages``, the turns after ``previous`` up to the first
+        ``turns``, into the chat's summary.
+
+        The turns stay in `pydantic_history` and on screen; requests send the
+        summary in their place. The summary is dropped if the history was
+        cleared since ``epoch``.
+        """
+        chat_id = self.chat_model.id
+        assert chat_id is not None
+        done = previous.turns if previous is not None else 0
+        try:
+            text = await summarize(
+                provider,
+                model,
+                previous.text if previous is not None else None,
+                messages,
+            )
+            if epoch != self._history_epoch:
+                return
+            summary = SummaryModel(chat_id=chat_id, turns=turns, text=text)
+            store = await Store.get_store()
+            await store.save_summary(summary)
+            self.summary = summary
+            log.info(f"Summarized {turns - done} earlier turn(s) of the chat")
+        except Exception as e:
+            log.error(f"Could not summarize earlier turns: {e}")
+        finally:
+            self._compacting = False
+
+    def land_on(self, message_id: int) -> None:
+        """Show the stored message ``message_id`` the next time the transcript
+        is loaded or re-shown (see `load_messages`), instead of the end."""
+        self._landing = message_id
+
+    async def _land(self, message_list: "MessageList") -> None:
+        message_id, self._landing = self._landing, None
+        if message_id is not None:
+            await self._load_older(until=message_id)
+        if message_id is None or not await message_list.show_message(message_id):
+            # Jump rather than animate: an animated scroll would mount every
+            # row of the virtualized list on its way down.
+            message_list.scroll_end(animate=False)
+
+    async def load_messages(self) -> None:
+        message_container = self.query_one("#messageContainer", MessageList)
+        if self.loading:
+            # The load under way lands once it's done.
+            return
+        if self.loaded:
+            await self._land(message_container)
             return
         self.loading = True
-        for message in self.messages:
-            chat_item = ChatItem()
-            chat_item.author = message.role
-            chat_item.text = message.text
-            await message_container.mount(chat_item)
-            if message.role == "assistant":
-                for b64 in message.images:
-                    decoded = _decode_image(b64)
-                    if decoded is not None:  # pragma: no branch
-                        await chat_item.add_image(decoded.data)
+        if self._messages_fetched:
+            await message_container.load(self.messages)
+        else:
+            # Only the latest page; the rest is read as the user scrolls back,
+            # and in full once the history is needed (see `_fetch_messages`).
+            page = await self._page()
+            await message_container.load(page, older=len(page) == self.PAGE_SIZE)
         self.loading = False
         self.loaded = True
-        message_container.scroll_end()
+        await self._land(message_container)
+
+    async def _page(self, before_id: int | None = None) -> list[MessageModel]:
+        """The `PAGE_SIZE` stored messages before ``before_id``, or the last."""
+        chat_id = self.chat_model.id
+        assert chat_id is not None
+        store = await Store.get_store()
+        return await store.get_messages(
+            chat_id, before_id=before_id, limit=self.PAGE_SIZE
+        )
+
+    async def _load_older(self, until: int | None = None) -> None:
+        """Prepend the page before the transcript's first row, or every page
+        back to the stored message ``until``."""
+        message_list = self.query_one("#messageContainer", MessageList)
+        async with self._older_lock:
+            while message_list.has_older:
+                first = message_list.first_row
+                assert first is not None and first.id is not None
+                if until is not None and first.id <= until:
+                    return
+                page = await self._page(before_id=first.id)
+                if message_list.first_row is not first:
+                    # Cleared or reloaded meanwhile.
+                    return
+                await message_list.prepend(page, older=len(page) == self.PAGE_SIZE)
+                if until is None:
+                    return
+
+    def on_message_list_older_needed(self) -> None:
+        self.load_older_messages()
+
+    @work(group="history")
+    async def load_older_messages(self) -> None:
+        await self._load_older()
 
     async def response_task(self, message: str) -> None:
         if self.agent is None:
@@ -363,6 +766,7 @@ class ChatContainer(Widget):
             return
         chat_id = self.chat_model.id
         assert chat_id is not None
+        await self._fetch_messages()
         message_container = self.query_one("#messageContainer")
 
         user_chat_item = ChatItem()
@@ -377,8 +781,6 @@ class ChatContainer(Widget):
         message_container.scroll_end()
 
         try:
-            text = ""
-            assistant_images: list[str] = []
             user_prompt, skipped = build_user_prompt(
                 message, [img for _, img in self.images]
             )
@@ -386,55 +788,9 @@ class ChatContainer(Widget):
                 self.app.notify(
                     f"Skipped {skipped} malformed image(s)", severity="warning"
                 )
-            async for piece in self.stream_agent(user_prompt):
-                follow = _near_bottom(message_container)
-                match piece:
-                    case ThinkingPartDelta(content_delta=delta):
-                        await response_chat_item.append_thinking(delta or "")
-                    case TextPartDelta(content_delta=delta):
-                        text += delta
-                        await response_chat_item.append_text(delta)
-                    case ToolCallPart() | NativeToolCallPart():
-                        await response_chat_item.add_tool_call(piece)
-                    case ToolReturnPart() | NativeToolReturnPart():
-                        response_chat_item.update_tool_result(
-                            piece.tool_call_id, piece.content
-                        )
-                        items = (
-                            piece.content
-                            if isinstance(piece.content, list)
-                            else [piece.content]
-                        )
-                        for item in items:
-                            if isinstance(item, BinaryImage):
-                                await response_chat_item.add_image(item.data)
-                                assistant_images.append(
-                                    base64.b64encode(item.data).decode()
-                                )
-                    case RetryPromptPart():
-                        response_chat_item.update_tool_result(
-                            piece.tool_call_id,
-                            f"error: {piece.model_response()}",
-                        )
-                    case FilePart(content=BinaryImage(data=data)):
-                        await response_chat_item.add_image(data)
-                        assistant_images.append(base64.b64encode(data).decode())
-                status.update_usage(
-                    self._stream_usage.input_tokens,
-                    self._stream_usage.output_tokens,
-                )
-                if follow:  # pragma: no branch
-                    message_container.scroll_end()
-
-            await response_chat_item.finish_stream()
-
-            status.update_usage(
-                self._stream_usage.input_tokens,
-                self._stream_usage.output_tokens,
+            assistant_images = await self._stream_response(
+                user_prompt, response_chat_item, status
             )
-            status.finish()
-            if _near_bottom(message_container):  # pragma: no branch
-                self.call_after_refresh(message_container.scroll_end)
 
             store = await Store.get_store()
 
@@ -443,23 +799,26 @@ class ChatContainer(Widget):
                 chat_id=chat_id,
                 role="user",
                 text=message,
-                images=[img for _, img in self.images],
+                images=await self._save_images([img for _, img in self.images]),
             )
             id = await store.save_message(user_message)
             user_message.id = id
             self.messages.append(user_message)
 
+            images = await self._save_images(assistant_images)
             assistant_message = MessageModel(
                 id=None,
                 chat_id=chat_id,
                 role="assistant",
-                text=text,
-                images=assistant_images,
+                text=response_chat_item.text,
+                images=images,
+                history=dump_turn(self._turn_messages, images),
             )
             id = await store.save_message(assistant_message)
             assistant_message.id = id
             self.messages.append(assistant_message)
             self.images = []
+            self._maybe_compact()
 
         except asyncio.CancelledError:
             response_chat_item.cancel_streams()
@@ -516,19 +875,22 @@ class ChatContainer(Widget):
 
         store = await Store.get_store()
         await store.edit_chat(self.chat_model)
+        await self._fetch_messages()
 
-        self.pydantic_history = self._build_pydantic_history(self.messages)
+        self.pydantic_history = await self._load_pydantic_history()
 
         self.model = self.chat_model.model
         self.system = self.chat_model.system
 
-        self._rebuild_agent()
+        await fetch_capabilities(self.chat_model.provider, self.chat_model.model)
+        self.rebuild_agent()
 
-    def action_toggle_thinking(self) -> None:
+    async def action_toggle_thinking(self) -> None:
         """Toggle thinking for the current session only; not persisted."""
-        if not get_capabilities(
+        capabilities = await fetch_capabilities(
             self.chat_model.provider, self.chat_model.model
-        ).supports_thinking:
+        )
+        if not capabilities.supports_thinking:
             self.app.notify(
                 f"{self.chat_model.model} does not support thinking.",
                 severity="warning",
@@ -536,7 +898,7 @@ class ChatContainer(Widget):
             return
 
         self.chat_model.thinking = not self.chat_model.thinking
-        self._rebuild_agent()
+        self.rebuild_agent()
         self.app.notify(f"Thinking {'on' if self.chat_model.thinking else 'off'}.")
 
     @work
@@ -557,13 +919,14 @@ class ChatContainer(Widget):
         chat_id = self.chat_model.id
         assert chat_id is not None
         self.messages = []
+        self._messages_fetched = True
         self.images = []
         self.pydantic_history = []
+        self.summary = None
+        self._history_epoch += 1
 
-        self._rebuild_agent()
-        msg_container = self.query_one("#messageContainer")
-        for child in msg_container.children:
-            child.remove()
+        self.rebuild_agent()
+        await self.query_one("#messageContainer", MessageList).clear()
         store = await Store.get_store()
         await store.clear_chat(chat_id)
 
@@ -571,6 +934,7 @@ class ChatContainer(Widget):
         if self.agent is None:
             self.app.notify(f"Cannot regenerate: {self._agent_error}", severity="error")
             return
+        await self._fetch_messages()
         if len(self.messages) < 2:
             return
         in_flight = getattr(self, "inference_task", None)
@@ -580,8 +944,8 @@ class ChatContainer(Widget):
         assert chat_id is not None
         response_message_id = self.messages[-1].id
         popped_message = self.messages.pop()
-        message_container = self.query_one("#messageContainer")
-        message_container.children[-1].remove()
+        message_container = self.query_one("#messageContainer", MessageList)
+        await message_container.remove_last()
         response_chat_item = ChatItem()
         response_chat_item.author = "assistant"
         message_container.mount(response_chat_item)
@@ -597,59 +961,32 @@ class ChatContainer(Widget):
         def restore_state() -> None:
             self.messages.append(popped_message)
             self.pydantic_history = self.pydantic_history + popped_history
+            response_chat_item.cancel_streams()
             response_chat_item.remove()
             status.remove()
 
         async def response_task() -> None:
             try:
-                thinking = ""
-                text = ""
-                assistant_images: list[str] = []
-                user_prompt, skipped = build_user_prompt(message.text, message.images)
+                user_prompt, skipped = build_user_prompt(
+                    message.text, await self._load_images(message.images)
+                )
                 if skipped:
                     self.app.notify(
                         f"Skipped {skipped} malformed image(s)", severity="warning"
                     )
-                async for piece in self.stream_agent(user_prompt):
-                    follow = _near_bottom(message_container)
-                    match piece:
-                        case ThinkingPartDelta(content_delta=delta):
-                            thinking += delta or ""
-                            response_chat_item.thinking = thinking
-                        case TextPartDelta(content_delta=delta):
-                            text += delta or ""
-                            response_chat_item.text = text
-                        case ToolCallPart() | NativeToolCallPart():
-                            await response_chat_item.add_tool_call(piece)
-                        case ToolReturnPart() | NativeToolReturnPart():
-                            response_chat_item.update_tool_result(
-                                piece.tool_call_id, piece.content
-                            )
-                        case FilePart(content=BinaryImage(data=data)):
-                            await response_chat_item.add_image(data)
-                            assistant_images.append(base64.b64encode(data).decode())
-                    status.update_usage(
-                        self._stream_usage.input_tokens,
-                        self._stream_usage.output_tokens,
-                    )
-                    if follow:  # pragma: no branch
-                        message_container.scroll_end()
-
-                status.update_usage(
-                    self._stream_usage.input_tokens,
-                    self._stream_usage.output_tokens,
+                assistant_images = await self._stream_response(
+                    user_prompt, response_chat_item, status
                 )
-                status.finish()
-                if _near_bottom(message_container):  # pragma: no branch
-                    self.call_after_refresh(message_container.scroll_end)
 
                 store = await Store.get_store()
+                images = await self._save_images(assistant_images)
                 regenerated_message = MessageModel(
                     id=response_message_id,
                     chat_id=chat_id,
                     role="assistant",
-                    text=text,
-                    images=assistant_images,
+                    text=response_chat_item.text,
+                    images=images,
+                    history=dump_turn(self._turn_messages, images),
                 )
                 await store.save_message(regenerated_message)
                 regenerated_message.id = response_message_id
@@ -677,11 +1014,44 @@ class ChatContainer(Widget):
             prompt.text = text
             prompt.focus()
 
+        await self._fetch_messages()
         prompts = [message.text for message in self.messages if message.role == "user"]
         prompts.reverse()
         screen = PromptHistory(prompts)
         self.app.push_screen(screen, on_history_selected)
 
+    @on(ImageSelected)
+    def on_image_selected(self, ev: ImageSelected) -> None:
+        self.prepare_image(ev.path)
+
+    @work(group="images")
+    async def prepare_image(self, path: Path) -> None:
+        """Read, downscale and re-encode the image at ``path`` in a thread.
+
+        How is up to the `images` settings for the chat's provider and model.
+        """
+        settings = image_settings(self.chat_model.provider, self.chat_model.model)
+        try:
+            prepared = await asyncio.to_thread(
+                lambda: prepare_image(
+                    path.read_bytes(),
+                    max_dimension=settings["maxDimension"],
+                    quality=settings["quality"],
+                    format=settings["format"],
+                )
+            )
+        except (OSError, PILImage.DecompressionBombError) as e:
+            self.app.notify(f"Could not read image {path}: {e}", severity="error")
+            return
+        log.info(
+            f"Prepared image {path.name}: {format_size(prepared.original_size)} → "
+            f"{format_size(len(prepared.data))}, {prepared.width}×{prepared.height} "
+            f"{prepared.media_type}"
+        )
+        self.post_message(
+            ImageAdded(path, base64.b64encode(prepared.data).decode(), prepared)
+        )
+
     @on(ImageAdded)
     def on_image_added(self, ev: ImageAdded) -> None:
         self.images.append((ev.path, ev.image))
@@ -692,11 +1062,16 @@ class ChatContainer(Widget):
             textarea.focus()
         except NoMatches:  # pragma: no cover
             pass
-        self.app.notify(f"Image {ev.path} added.")
+        if ev.prepared is None:
+            self.app.notify(f"Image {ev.path} added.")
+        else:
+            before = format_size(ev.prepared.original_size)
+            after = format_size(len(ev.prepared.data))
+            self.app.notify(f"Image {ev.path} added ({before} → {after}).")
 
     def compose(self) -> ComposeResult:
         yield Static(f"model: {self.model}", id="info")
-        yield VerticalScroll(id="messageContainer")
+        yield MessageList(id="messageContainer")
         yield FlexibleInput("", id="prompt")
 
 
@@ -736,13 +1111,18 @@ class AssistantImage(
     TerminalImage,  # ty: ignore[unsupported-base]
     Renderable=TerminalImage._Renderable,
 ):
-    """Inline image emitted by the assistant, retaining its source bytes so
-    a click can later write them to disk."""
+    """Inline image emitted by the assistant, shown as a thumbnail.
+
+    A click writes the full image to disk: its source bytes for images
+    received in this session, else read from the store by ``image_hash``.
+    """
 
-    def __init__(self, pil_image: PILImage.Image, data: bytes) -> None:
-        super().__init__(pil_image, classes="assistantImage")
+    def __init__(
+        self, thumbnail: PILImage.Image, image_hash: str, data: bytes | None = None
+    ) -> None:
+        super().__init__(thumbnail, classes="assistantImage")
+        self.image_hash = image_hash
         self.image_bytes = data
-        self.image_format = (pil_image.format or "PNG").lower()
 
 
 class ToolCallItem(Widget):
@@ -807,10 +1187,14 @@ class ChatItem(Widget):
         super().__init__(**kwargs)
         self._response_stream: MarkdownStream | None = None
         self._thinking_stream: MarkdownStream | None = None
+        # Deltas streamed since ``text``/``thinking`` were last materialized.
+        self._text_chunks: list[str] = []
+        self._thinking_chunks: list[str] = []
         self._tool_calls: dict[str, ToolCallItem] = {}
 
     @on(Click)
     async def on_click(self, event: Click) -> None:
+        self._materialize()
         cur: Widget | None = event.widget
         while cur is not None and cur is not self:
             if cur.has_class("thinking-label"):
@@ -839,12 +1223,12 @@ class ChatItem(Widget):
             body = self.query_one(".thinking-body", Markdown)
         except NoMatches:  # pragma: no cover
             return
-        has_thinking = bool(self.thinking)
+        has_thinking = bool(self.thinking or self._thinking_chunks)
         label.display = has_thinking
         if not has_thinking:
             body.display = False
             return
-        if not self.text:
+        if not (self.text or self._text_chunks):
             label.update("thinking…")
             body.display = True
         elif self.thoughts_collapsed:
@@ -880,9 +1264,9 @@ class ChatItem(Widget):
 
         Writes the delta via Textual's ``MarkdownStream`` (which batches and
         appends incrementally) instead of re-parsing the whole document each
-        token through ``watch_text``. ``self.text`` is kept in sync via
-        ``set_reactive`` so click-to-copy and chrome logic see live state
-        without firing the watcher's full re-render.
+        token through ``watch_text``. Deltas are buffered rather than
+        concatenated onto ``self.text``, which would copy the whole answer per
+        token; ``_materialize`` joins them when the full text is needed.
         """
         if self.author == "user" or not delta:
             return
@@ -892,7 +1276,7 @@ class ChatItem(Widget):
             except NoMatches:  # pragma: no cover
                 return
             self._response_stream = Markdown.get_stream(response)
-        self.set_reactive(ChatItem.text, self.text + delta)
+        self._text_chunks.append(delta)
         if not self.thoughts_collapsed:
             self.thoughts_collapsed = True
         await self._response_stream.write(delta)
@@ -908,7 +1292,7 @@ class ChatItem(Widget):
             except NoMatches:  # pragma: no cover
                 return
             self._thinking_stream = Markdown.get_stream(body)
-        self.set_reactive(ChatItem.thinking, self.thinking + delta)
+        self._thinking_chunks.append(delta)
         if first_chunk:
             self._refresh_thinking_chrome()
         await self._thinking_stream.write(delta)
@@ -933,28 +1317,82 @@ class ChatItem(Widget):
         item.set_result(content)
 
     async def add_image(self, data: bytes) -> None:
-        """Source bytes are retained on the widget so a later click in
+        """Show an image received in this session.
+
+        Source bytes are retained on the widget so a later click in
         ``on_click`` can dispatch to ``_save_assistant_image``."""
         if self.author == "user":
             return
+        hash = image_hash(data)
+        thumbnails = await asyncio.to_thread(make_thumbnails, {hash: data})
+        if hash in thumbnails:  # pragma: no branch
+            await self._mount_image(AssistantImage(thumbnails[hash], hash, data))
+
+    async def add_thumbnail(self, hash: str, thumbnail: PILImage.Image) -> None:
+        """Show the stored image ``hash`` by its thumbnail."""
+        if self.author == "user":  # pragma: no cover
+            return
+        await self._mount_image(AssistantImage(thumbnail, hash))
+
+    async def _mount_image(self, image: AssistantImage) -> None:
         try:
             response = self.query_one(".response", Markdown)
         except NoMatches:  # pragma: no cover
             return
-        try:
-            pil_image = PILImage.open(BytesIO(data))
-        except UnidentifiedImageError:  # pragma: no cover
-            return
-        await self.mount(AssistantImage(pil_image, data), before=response)
+        await self.mount(image, before=response)
 
     async def _save_assistant_image(self, image: AssistantImage) -> None:
-        fmt = "jpg" if image.image_format == "jpeg" else image.image_format
+        data = image.image_bytes
+        if data is None:
+            store = await Store.get_store()
+            data = await store.get_image(image.image_hash)
+        if data is None:
+            self.app.notify("Image is no longer stored.", severity="error")
+            return
+        try:
+            # Reads the header only.
+            fmt = (PILImage.open(BytesIO(data)).format or "PNG").lower()
+        except UnidentifiedImageError:  # pragma: no cover
+            fmt = "png"
+        fmt = "jpg" if fmt == "jpeg" else fmt
         dest_dir = envConfig.OTERM_DATA_DIR / "downloads"
         dest_dir.mkdir(parents=True, exist_ok=True)
         path = dest_dir / f"oterm-image-{int(time.time() * 1000)}.{fmt}"
-        path.write_bytes(image.image_bytes)
+        path.write_bytes(data)
         self.app.notify(f"Image saved to {path}")
 
+    async def show_message(
+        self, message: MessageModel, thumbnails: list[tuple[str, PILImage.Image]]
+    ) -> None:
+        """Rebind a mounted item to another stored message by the same author.
+
+        ``MessageList`` recycles items scrolled out of range this way instead
+        of mounting a fresh ``ChatItem`` for each row that scrolls in.
+        """
+        self.set_reactive(ChatItem.text, message.text)
+        if self.author == "user":
+            self.query_one(".text", Static).update(message.text)
+            return
+        await self.query(AssistantImage).remove()
+        await self.query_one(".response", Markdown).update(message.text)
+        for hash, thumbnail in thumbnails:
+            await self.add_thumbnail(hash, thumbnail)
+
+    def _materialize(self) -> None:
+        """Join buffered deltas into ``text`` and ``thinking``.
+
+        Uses ``set_reactive`` so the watchers' full re-render doesn't fire;
+        the Markdown widgets already show the streamed content.
+        """
+        if self._text_chunks:
+            self.set_reactive(ChatItem.text, "".join([self.text, *self._text_chunks]))
+            self._text_chunks.clear()
+        if self._thinking_chunks:
+            self.set_reactive(
+                ChatItem.thinking, "".join([self.thinking, *self._thinking_chunks])
+            )
+            self._thinking_chunks.clear()
+
     async def finish_stream(self) -> None:
         """Drain and stop any active streams started by ``append_*``.
 
@@ -965,6 +1403,7 @@ class ChatItem(Widget):
         full ``Markdown.update`` with the accumulated text after stopping
         each stream to reset the widget to a clean re-parsed state.
         """
+        self._materialize()
         if self._response_stream is not None:
             await self._response_stream.stop()
             self._response_stream = None
@@ -1015,12 +1454,378 @@ class ChatItem(Widget):
                     yield Markdown(classes="response")
 
 
+class MessageList(VerticalScroll):
+    """Chat transcript that only mounts stored messages near the viewport.
+
+    Stored messages are rows. A ``ChatItem`` is mounted for every row within
+    ``OVERSCAN`` viewport heights of the visible region; items that scroll
+    out of range are rebound to the rows scrolling in. Two spacers stand in
+    for the rows above and below, sized from each row's measured height once
+    it has been shown (or an estimate from its text until then) so the
+    scrollbar stays proportional. Widgets mounted directly, i.e. the turns of
+    the current session, follow the rows and are never virtualized.
+
+    The rows may be only the latest part of the transcript: when there are
+    older ones, reaching the first row posts `OlderNeeded`, and the owner
+    adds the rows before it with `prepend`.
+    """
+
+    class OlderNeeded(Message):
+        """The first rows are in range and there are older ones to prepend."""
+
+    OVERSCAN = 1.0
+    # `.assistantImage` height plus its vertical margin.
+    IMAGE_HEIGHT = 32
+    # Seconds a message jumped to with `show_message` stays highlighted.
+    HIGHLIGHT_DURATION = 2.0
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._rows: list[MessageModel] = []
+        self._items: dict[int, ChatItem] = {}
+        self._heights: dict[int, int] = {}
+        self._width = 0
+        self._top = Widget(classes="spacer")
+        self._bottom = Widget(classes="spacer")
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        self._syncing = False
+        # Keep to the end while rows settle after `load`, until the user
+        # scrolls up.
+        self._pinned = False
+        # Where `show_message` is scrolling to until the spacers are laid out,
+        # and the row it highlights.
+        self._target: int | None = None
+        self._found: int | None = None
+        # Whether rows older than the first exist, and if `OlderNeeded` has
+        # been posted for the current first row.
+        self._older = False
+        self._older_requested = False
+
+    def compose(self) -> ComposeResult:
+        yield self._top
+        yield self._bottom
+
+    async def load(self, messages: list[MessageModel], older: bool = False) -> None:
+        """Replace the transcript with ``messages``, showing the last ones.
+
+        ``older`` tells whether messages before them are left to `prepend`.
+        """
+        await self.clear()
+        self._rows = list(messages)
+        self._older = older
+        self._pinned = True
+        await self._sync(at_end=True)
+
+    @property
+    def first_row(self) -> MessageModel | None:
+        return self._rows[0] if self._rows else None
+
+    @property
+    def has_older(self) -> bool:
+        return self._older
+
+    async def prepend(self, messages: list[MessageModel], older: bool) -> None:
+        """Add ``messages`` before the first row, keeping the view in place.
+
+        ``older`` tells whether there are messages before these as well.
+        """
+        async with self._lock:
+            count = len(messages)
+            self._older = older
+            self._older_requested = False
+            if not count:
+                return
+            self._rows[:0] = messages
+            self._items = {index + count: item for index, item in self._items.items()}
+            self._heights = {
+                index + count: height for index, height in self._heights.items()
+            }
+            if self._found is not None:
+                self._found += count
+            if not self._pinned:
+                # The new rows push everything down by their estimated height;
+                # scroll by as much once the top spacer has grown.
+                shift = sum(self._estimate(message) for message in messages)
+                self._target = (
+                    self._target if self._target is not None else round(self.scroll_y)
+                ) + shift
+                self.call_after_refresh(self._scroll_to_target)
+        await self._sync()
+
+    async def clear(self) -> None:
+        """Drop every row and every directly mounted widget."""
+        async with self._lock:
+            self._rows = []
+            self._pinned = False
+            self._target = self._found = None
+            self._older = self._older_requested = False
+            self._items.clear()
+            self._heights.clear()
+            await self.remove_children(
+                [child for child in self.children if child not in self._spacers]
+            )
+            self._top.styles.height = 0
+            self._bottom.styles.height = 0
+
+    async def remove_last(self) -> None:
+        """Remove the last message, along with anything mounted after it."""
+        live = list(self.children[self.children.index(self._bottom) + 1 :])
+        items = [i for i, widget in enumerate(live) if isinstance(widget, ChatItem)]
+        if items:
+            await self.remove_children(live[items[-1] :])
+            return
+        if not self._rows:  # pragma: no cover
+            return
+        async with self._lock:
+            self._rows.pop()
+            index = len(self._rows)
+            self._heights.pop(index, None)
+            item = self._items.pop(index, None)
+            if item is not None:  # pragma: no branch
+                await item.remove()
+        await self._sync()
+
+    async def show_message(self, message_id: int) -> bool:
+        """Scroll the stored message ``message_id`` to the top and highlight it.
+
+        Returns whether the message is one of the rows.
+        """
+        index = next(
+            (i for i, message in enumerate(self._rows) if message.id == message_id),
+            None,
+        )
+        if index is None:
+            return False
+        self._pinned = False
+        self._found = index
+        await self._sync(at_row=index)
+        self.set_timer(self.HIGHLIGHT_DURATION, lambda: self._unhighlight(index))
+        return True
+
+    def _unhighlight(self, index: int) -> None:
+        if self._found != index:
+            return
+        self._found = None
+        item = self._items.get(index)
+        if item is not None:
+            item.remove_class("-found")
+
+    @property
+    def _spacers(self) -> tuple[Widget, Widget]:
+        return self._top, self._bottom
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if new_value < old_value and self.max_scroll_y - new_value > 1:
+            self._pinned = False
+        if round(old_value) != round(new_value):
+            self._request_sync()
+
+    def watch_virtual_size(self) -> None:
+        if self._pinned:
+            self.call_after_refresh(self._follow_end)
+
+    def _follow_end(self) -> None:
+        # Checked again once laid out: the user may have scrolled up since.
+        if self._pinned:
+            self.scroll_end(animate=False, immediate=True)
+
+    def on_resize(self) -> None:
+        self._request_sync()
+
+    def _request_sync(self) -> None:
+        """Coalesce scroll and resize events into one window update at a time."""
+        if not self._rows:
+            return
+        self._dirty = True
+        if not self._syncing:
+            self._syncing = True
+            self.call_later(self._drain)
+
+    async def _drain(self) -> None:
+        try:
+            while self._dirty:
+                self._dirty = False
+                await self._sync()
+        finally:
+            self._syncing = False
+
+    def _estimate(self, message: MessageModel) -> int:
+        """Rows a message is expected to take before it has been measured."""
+        # Item padding and the prompt marker take four columns.
+        columns = max(self._width - 4, 1)
+        lines = sum(
+            max(1, -(-len(line) // columns)) for line in message.text.splitlines()
+        )
+        images = len(message.images) if message.role == "assistant" else 0
+        # One for the item's top margin.
+        return 1 + max(lines, 1) + images * self.IMAGE_HEIGHT
+
+    def _height(self, index: int) -> int:
+        height = self._heights.get(index)
+        return height if height is not None else self._estimate(self._rows[index])
+
+    async def _thumbnails(
+        self, message: MessageModel
+    ) -> list[tuple[str, PILImage.Image]]:
+        """Thumbnails of an assistant message's images.
+
+        Made from the stored images, off the event loop, the first time they
+        are shown; the full images are only read again to save them.
+        """
+        if message.role != "assistant" or not message.images:
+            return []
+        hashes = message.images
+        thumbnails = await asyncio.to_thread(cached_thumbnails, hashes)
+        missing = [hash for hash in hashes if hash not in thumbnails]
+        if missing:
+            store = await Store.get_store()
+            images = await store.get_images(missing)
+            thumbnails |= await asyncio.to_thread(make_thumbnails, images)
+        return [(hash, thumbnails[hash]) for hash in hashes if hash in thumbnails]
+
+    async def _sync(self, at_end: bool = False, at_row: int | None = None) -> None:
+        """Mount the rows in range, recycle the rest and resize the spacers.
+
+        With ``at_end`` or ``at_row``, the range is that of the last rows or of
+        the rows from ``at_row``, which is then scrolled to the top.
+        """
+        async with self._lock:
+            region = self.scrollable_content_region
+            width = region.width or self.app.size.width
+            if width != self._width:
+                # Wrapping changed, so every measurement is stale.
+                self._width = width
+                self._heights.clear()
+            viewport = region.height or self.app.size.height
+            # Markdown can re-flow after the first measurement; rows not yet
+            # measured are left to `_measure`, which compensates the scroll.
+            for index, item in self._items.items():
+                if index in self._heights and item.outer_size.height:
+                    self._heights[index] = item.outer_size.height
+
+            offsets = [0]
+            for index in range(len(self._rows)):
+                offsets.append(offsets[-1] + self._height(index))
+            total = offsets[-1]
+            if at_row is not None:
+                top = offsets[at_row]
+            elif at_end or self._pinned:
+                top = max(total - viewport, 0)
+            elif self._target is not None:
+                top = self._target
+            else:
+                top = round(self.scroll_y)
+            margin = int(viewport * self.OVERSCAN)
+            first = max(bisect_right(offsets, top - margin) - 1, 0)
+            last = min(bisect_left(offsets, top + viewport + margin), len(self._rows))
+
+            stale = [
+                self._items.pop(index)
+                for index in list(self._items)
+                if not first <= index < last
+            ]
+            if first == 0 and self._older and not self._older_requested:
+                self._older_requested = True
+                self.post_message(self.OlderNeeded())
+
+            # New items are mounted in runs, one layout pass per run rather
+            # than per item (e.g. a whole page when the transcript loads).
+            previous: Widget = self._top
+            run: list[ChatItem] = []
+            run_after = previous
+            new_images: list[tuple[ChatItem, list[tuple[str, PILImage.Image]]]] = []
+            for index in range(first, last):
+                item = self._items.get(index)
+                if item is None:
+                    message = self._rows[index]
+                    images = await self._thumbnails(message)
+                    item = next((i for i in stale if i.author == message.role), None)
+                    if item is None:
+                        item = ChatItem()
+                        item.author = message.role
+                        item.text = message.text
+                        if not run:
+                            run_after = previous
+                        run.append(item)
+                        new_images.append((item, images))
+                    else:
+                        stale.remove(item)
+                        if run:
+                            await self.mount_all(run, after=run_after)
+                            run = []
+                        self.move_child(item, after=previous)
+                        await item.show_message(message, images)
+                    self._items[index] = item
+                elif run:
+                    await self.mount_all(run, after=run_after)
+                    run = []
+                item.set_class(index == self._found, "-found")
+                previous = item
+            if run:
+                await self.mount_all(run, after=run_after)
+            for item, images in new_images:
+                for hash, thumbnail in images:
+                    await item.add_thumbnail(hash, thumbnail)
+            if stale:
+                await self.remove_children(stale)
+
+            self._top.styles.height = offsets[first]
+            self._bottom.styles.height = total - offsets[last]
+            anchor = max(bisect_right(offsets, top) - 1, 0)
+            if at_row is not None:
+                # Once the spacers are laid out; `_measure` then keeps the
+                # row in place as the rows above it are measured.
+                self._target = top
+                self.call_after_refresh(self._scroll_to_target)
+            self.call_after_refresh(self._measure, anchor)
+
+    def _scroll_to_target(self) -> None:
+        if self._target is not None:
+            self.scroll_to(y=self._target, animate=False, immediate=True)
+            self._target = None
+
+    def _measure(self, anchor: int) -> None:
+        """Cache the real heights of mounted rows.
+
+        Rows above ``anchor`` (the first visible row) were laid out with an
+        estimate; scroll by the difference so the visible content stays put.
+        Items not laid out yet are measured after the next refresh.
+        """
+        shift = 0
+        pending = False
+        for index, item in self._items.items():
+            height = item.outer_size.height
+            if not height:
+                pending = True
+                continue
+            if index < anchor:
+                shift += height - self._height(index)
+            self._heights[index] = height
+        if shift and not self._pinned:
+            self.scroll_to(y=self.scroll_y + shift, animate=False, immediate=True)
+        if pending:
+            self.call_after_refresh(self._measure, anchor)
+
+
+def _compact(count: int) -> str:
+    """``12345`` -> ``12.3k``."""
+    if count < 1000:
+        return str(count)
+    return f"{count / 1000:.1f}k".replace(".0k", "k")
+
+
 class UsageStatus(Static):
     """Spinner-and-usage line shown below the active assistant response.
 
     While streaming, cycles a braille glyph and surfaces token counts and
-    elapsed time as soon as the model reports them. After `finish()`, the
-    glyph drops and the line stays in place as a dimmed footer for the turn.
+    elapsed time as soon as the model reports them (with the input tokens read
+    from and written to the provider's prompt cache), plus the output rate
+    measured from the first streamed delta and, when the model's context
+    window is known, the estimated context sent out of its budget. After
+    `finish()`, the glyph drops and the line stays in place as a dimmed
+    footer for the turn.
     """
 
     SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
@@ -1032,7 +1837,12 @@ class UsageStatus(Static):
         self._streaming = True
         self._input_tokens = 0
         self._output_tokens = 0
+        self._cache_read_tokens = 0
+        self._cache_write_tokens = 0
+        self._context_used = 0
+        self._context_budget: int | None = None
         self._started_at = time.monotonic()
+        self._output_started_at: float | None = None
         self._elapsed = 0.0
         self._timer: Any = None
 
@@ -1046,13 +1856,51 @@ class UsageStatus(Static):
             self._elapsed = time.monotonic() - self._started_at
         self._refresh_text()
 
-    def update_usage(self, input_tokens: int, output_tokens: int) -> None:
-        if input_tokens == self._input_tokens and output_tokens == self._output_tokens:
+    def update_usage(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ) -> None:
+        usage = (input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+        if usage == (
+            self._input_tokens,
+            self._output_tokens,
+            self._cache_read_tokens,
+            self._cache_write_tokens,
+        ):
+            return
+        (
+            self._input_tokens,
+            self._output_tokens,
+            self._cache_read_tokens,
+            self._cache_write_tokens,
+        ) = usage
+        self._refresh_text()
+
+    def update_context(self, used: int, budget: int | None) -> None:
+        """Show the estimated tokens sent out of the model's context budget."""
+        if (used, budget) == (self._context_used, self._context_budget):
             return
-        self._input_tokens = input_tokens
-        self._output_tokens = output_tokens
+        self._context_used = used
+        self._context_budget = budget
         self._refresh_text()
 
+    def start_output(self) -> None:
+        """Mark the first streamed delta; the output rate is timed from here."""
+        if self._output_started_at is None:
+            self._output_started_at = time.monotonic()
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if self._output_started_at is None or not self._output_tokens:
+            return None
+        duration = self._started_at + self._elapsed - self._output_started_at
+        if duration <= 0:
+            return None
+        return self._output_tokens / duration
+
     def finish(self) -> None:
         if not self._streaming:
             return
@@ -1068,8 +1916,22 @@ class UsageStatus(Static):
         if self._streaming:
             parts.append(self.SPINNER_FRAMES[self._frame])
         if self._input_tokens:
-            parts.append(f"↑ {self._input_tokens}")
+            cache: list[str] = []
+            if self._cache_read_tokens:
+                cache.append(f"{self._cache_read_tokens} cached")
+            if self._cache_write_tokens:
+                cache.append(f"{self._cache_write_tokens} to cache")
+            parts.append(
+                f"↑ {self._input_tokens}" + (f" ({', '.join(cache)})" if cache else "")
+            )
         if self._output_tokens:
             parts.append(f"↓ {self._output_tokens}")
+        rate = self.tokens_per_second
+        if rate is not None:
+            parts.append(f"{rate:.0f} tok/s")
+        if self._context_budget is not None:
+            parts.append(
+                f"ctx {_compact(self._context_used)}/{_compact(self._context_budget)}"
+            )
         parts.append(f"{self._elapsed:.1f}s")
         self.update("  ".join(parts))
@@ -5,14 +5,27 @@ from PIL import Image as PILImage
 from textual.message import Message
 from textual.widgets import DirectoryTree
 
+from oterm.images import PreparedImage
+
 IMG_MAX_SIZE = 80
 IMAGE_EXTENSIONS = PILImage.registered_extensions()
 
 
+class ImageSelected(Message):
+    """An image file was picked; it is read and prepared by the chat."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        super().__init__()
+
+
 class ImageAdded(Message):
-    def __init__(self, path: Path, image: str) -> None:
+    def __init__(
+        self, path: Path, image: str, prepared: PreparedImage | None = None
+    ) -> None:
         self.path = path
         self.image = image
+        self.prepared = prepared
         super().__init__()
 
 
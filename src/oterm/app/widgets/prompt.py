@@ -14,7 +14,7 @@ from textual.widget import Widget
 from textual.widgets import Static, TextArea
 
 from oterm.app.image_browser import ImageSelect
-from oterm.app.widgets.image import ImageAdded
+from oterm.app.widgets.image import ImageSelected
 
 MAX_PROMPT_LINES = 10
 
@@ -166,11 +166,10 @@ class FlexibleInput(Widget):
             pass
 
     def action_add_image(self) -> None:
-        async def on_image_selected(image) -> None:
-            if image is None:
+        async def on_image_selected(path) -> None:
+            if path is None:
                 return
-            path, b64 = image
-            self.post_message(ImageAdded(path, b64))
+            self.post_message(ImageSelected(path))
 
         screen = ImageSelect()
         self.app.push_screen(screen, on_image_selected)
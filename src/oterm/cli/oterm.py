@@ -5,14 +5,15 @@ import typer
 from rich.pretty import pprint
 
 from oterm.config import envConfig
-from oterm.log import supress_logging
+from oterm.log import configure_logging, supress_logging
 from oterm.store.store import Store
 
 cli = typer.Typer(context_settings={"help_option_names": ["-h", "--help"]})
 
 
 async def upgrade_db():
-    await Store.get_store()
+    store = await Store.get_store()
+    await store.close()
 
 
 @cli.command()
@@ -45,6 +46,7 @@ def oterm(
     # Delay import to avoid sixel detection running unless necessary
     from oterm.app.oterm import app
 
+    configure_logging()
     app.run()
 
 
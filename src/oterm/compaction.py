@@ -0,0 +1,151 @@
+from functools import lru_cache
+from typing import Any
+
+from pydantic_ai.messages import (
+    BaseToolCallPart,
+    BaseToolReturnPart,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    UserPromptPart,
+)
+
+from oterm.agent import get_agent
+from oterm.config import appConfig
+from oterm.context import estimate_tokens
+from oterm.types import SummaryModel
+
+# Defaults for the `compaction` config block: estimated tokens of history not
+# yet summarized before older turns are summarized, and how many recent turns
+# are always sent as they are.
+COMPACTION_THRESHOLD = 8000
+KEEP_TURNS = 4
+
+# Tool results are cut to this many characters in the transcript that is
+# summarized.
+_TOOL_RESULT_CHARS = 500
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Given the summary so far (if any) and the turns that follow "
+    "it, write an updated summary that preserves the facts, decisions, open "
+    "questions, names, numbers and code the rest of the conversation may rely "
+    "on. Write it as plain prose notes, in the conversation's language, "
+    "without addressing either party. Reply with the summary only."
+)
+
+
+def compaction_settings() -> dict[str, Any] | None:
+    """The `compaction` config block, or ``None`` if compaction is off.
+
+    Compaction is opt-in: it is on once the block names a `model`.
+    """
+    settings = appConfig.get("compaction")
+    if not isinstance(settings, dict) or not settings.get("model"):
+        return None
+    return {
+        "provider": settings.get("provider", "ollama"),
+        "model": settings["model"],
+        "threshold": settings.get("threshold", COMPACTION_THRESHOLD),
+        "keepTurns": max(int(settings.get("keepTurns", KEEP_TURNS)), 1),
+    }
+
+
+def turn_starts(history: list[ModelMessage]) -> list[int]:
+    """Indices of the messages in ``history`` that open a turn (a user prompt)."""
+    return [
+        i
+        for i, message in enumerate(history)
+        if isinstance(message, ModelRequest)
+        and any(isinstance(p, UserPromptPart) for p in message.parts)
+    ]
+
+
+def with_summary(
+    history: list[ModelMessage], summary: SummaryModel | None
+) -> list[ModelMessage]:
+    """``history`` with the turns ``summary`` covers replaced by the summary."""
+    if summary is None or summary.turns == 0:
+        return history
+    starts = turn_starts(history)
+    if summary.turns >= len(starts):
+        return history
+    return [summary_message(summary.text), *history[starts[summary.turns] :]]
+
+
+# Cached so each request reuses the same message for a summary, which keeps
+# `ContextWindow`'s per-message estimates valid across turns.
+@lru_cache(maxsize=64)
+def summary_message(text: str) -> ModelRequest:
+    return ModelRequest(
+        parts=[
+            SystemPromptPart(
+                content=f"Summary of the earlier part of this conversation:\n\n{text}"
+            )
+        ]
+    )
+
+
+def turns_to_summarize(
+    history: list[ModelMessage],
+    summary: SummaryModel | None,
+    threshold: int,
+    keep_turns: int,
+) -> int:
+    """How many leading turns of ``history`` the summary should cover.
+
+    Zero unless the turns not yet summarized are estimated past ``threshold``
+    tokens; the last ``keep_turns`` turns are never summarized.
+    """
+    starts = turn_starts(history)
+    summarized = summary.turns if summary is not None else 0
+    target = len(starts) - keep_turns
+    if target <= summarized:
+        return 0
+    pending = sum(estimate_tokens(m) for m in history[starts[summarized] :])
+    return target if pending > threshold else 0
+
+
+def transcript(messages: list[ModelMessage]) -> str:
+    """A plain-text rendering of ``messages`` for the summarizing model."""
+    lines: list[str] = []
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, UserPromptPart):
+                content = part.content
+                if not isinstance(content, str):
+                    content = " ".join(
+                        item if isinstance(item, str) else "[image]" for item in content
+                    )
+                lines.append(f"User: {content}")
+            elif isinstance(part, TextPart):
+                lines.append(f"Assistant: {part.content}")
+            elif isinstance(part, BaseToolCallPart):
+                lines.append(
+                    f"Assistant called {part.tool_name}({part.args_as_json_str()})"
+                )
+            elif isinstance(part, BaseToolReturnPart):
+                result = part.model_response_str()
+                if len(result) > _TOOL_RESULT_CHARS:
+                    result = result[:_TOOL_RESULT_CHARS] + "…"
+                lines.append(f"{part.tool_name} returned: {result}")
+        if isinstance(message, ModelResponse):
+            lines.append("")
+    return "\n".join(lines).strip()
+
+
+async def summarize(
+    provider: str,
+    model: str,
+    previous: str | None,
+    messages: list[ModelMessage],
+) -> str:
+    """Fold ``messages`` into the ``previous`` summary with ``provider``/``model``."""
+    agent = get_agent(provider=provider, model=model, system=SUMMARY_INSTRUCTIONS)
+    prompt = f"Conversation:\n\n{transcript(messages)}"
+    if previous:
+        prompt = f"Summary so far:\n\n{previous}\n\n{prompt}"
+    result = await agent.run(prompt)
+    return result.output.strip()
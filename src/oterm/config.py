@@ -15,6 +15,9 @@ class EnvConfig(BaseModel):
     OLLAMA_URL: str = ""
     # API key required for 'ollama.com' cloud models
     OLLAMA_API_KEY: str | None = None
+    # Context Ollama runs models with unless their Modelfile or the chat sets
+    # `num_ctx`; set it to match the server's when that is changed.
+    OLLAMA_CONTEXT_LENGTH: int = 4096
     OTERM_VERIFY_SSL: bool = True
     OTERM_DATA_DIR: Path = get_default_data_dir()
     OTERM_OLLAMA_IMAGE_MODEL: str = "x/z-image-turbo"
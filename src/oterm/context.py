@@ -0,0 +1,172 @@
+from collections.abc import Sequence
+from typing import Any
+
+from pydantic_ai.messages import (
+    BaseToolCallPart,
+    BaseToolReturnPart,
+    FilePart,
+    ModelMessage,
+    ModelRequest,
+    RetryPromptPart,
+    UserContent,
+    UserPromptPart,
+)
+
+from oterm.config import appConfig, envConfig
+from oterm.providers.capabilities import cached_capabilities
+
+# Rough characters per token across common tokenizers.
+CHARS_PER_TOKEN = 4
+# Rough cost of one image; providers charge anywhere from ~250 to ~1500.
+IMAGE_TOKENS = 1000
+# Per-message framing (role markers and the like).
+MESSAGE_TOKENS = 4
+# Share of the context window kept free for the response when the chat
+# doesn't set `max_tokens`.
+RESPONSE_SHARE = 0.25
+
+
+def _content_size(content: str | Sequence[UserContent]) -> tuple[int, int]:
+    """Characters and images in a user prompt's content."""
+    if isinstance(content, str):
+        return len(content), 0
+    chars = images = 0
+    for item in content:
+        if isinstance(item, str):
+            chars += len(item)
+        else:
+            images += 1
+    return chars, images
+
+
+def estimate_tokens(message: ModelMessage) -> int:
+    """A provider-independent estimate of the tokens ``message`` takes up."""
+    chars = images = 0
+    for part in message.parts:
+        if isinstance(part, UserPromptPart):
+            c, i = _content_size(part.content)
+            chars += c
+            images += i
+        elif isinstance(part, BaseToolCallPart):
+            chars += len(part.tool_name) + len(part.args_as_json_str())
+        elif isinstance(part, BaseToolReturnPart):
+            chars += len(part.model_response_str())
+        elif isinstance(part, RetryPromptPart):
+            chars += len(part.model_response())
+        elif isinstance(part, FilePart):
+            images += 1
+        else:
+            chars += len(getattr(part, "content", "") or "")
+    return MESSAGE_TOKENS + chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS
+
+
+def _starts_turn(message: ModelMessage) -> bool:
+    return isinstance(message, ModelRequest) and any(
+        isinstance(p, UserPromptPart) for p in message.parts
+    )
+
+
+def _chat_num_ctx(parameters: dict[str, Any] | None) -> int | None:
+    """The chat's own ``num_ctx`` Ollama option, if set."""
+    extra_body = (parameters or {}).get("extra_body")
+    options = extra_body.get("options") if isinstance(extra_body, dict) else None
+    num_ctx = options.get("num_ctx") if isinstance(options, dict) else None
+    return num_ctx if isinstance(num_ctx, int) and num_ctx > 0 else None
+
+
+def context_window_for(
+    provider: str, model: str, parameters: dict[str, Any] | None = None
+) -> int | None:
+    """The context window, in tokens, of ``model``.
+
+    Taken from the `contextWindows` entry for the model in `config.json`,
+    else from what the provider reports (Ollama only, once its capabilities
+    are fetched); ``None`` if unknown. Ollama runs a model with the chat's
+    ``num_ctx`` option, else its Modelfile's, else its default, never more
+    than the model was trained with.
+    """
+    configured = appConfig.get("contextWindows") or {}
+    window = configured.get(model)
+    if isinstance(window, int) and window > 0:
+        return window
+    capabilities = cached_capabilities(provider, model)
+    if capabilities is None:
+        return None
+    if provider != "ollama":
+        return capabilities.context_length
+    window = (
+        _chat_num_ctx(parameters)
+        or capabilities.num_ctx
+        or envConfig.OLLAMA_CONTEXT_LENGTH
+    )
+    if capabilities.context_length is not None:
+        window = min(window, capabilities.context_length)
+    return window
+
+
+class ContextWindow:
+    """Fits a chat's history into a model's context window.
+
+    Token counts are estimated once per message and kept alongside the
+    history they were computed for, so each turn only estimates the messages
+    added since the last one. When the history and the new prompt don't fit
+    the budget (the window minus room for the response), whole turns are
+    dropped from the start; a turn's tool calls and returns stay together.
+    """
+
+    def __init__(self, window: int | None = None, max_tokens: int | None = None):
+        self.window = window
+        self.budget: int | None = None
+        if window is not None:
+            reserve = max_tokens or int(window * RESPONSE_SHARE)
+            self.budget = max(window - reserve, 0)
+        # What the last `fit` sent, in estimated tokens, and how many turns it
+        # left out.
+        self.used = 0
+        self.dropped_turns = 0
+        self._messages: list[ModelMessage] = []
+        self._tokens: list[int] = []
+
+    @classmethod
+    def for_chat(
+        cls, provider: str, model: str, parameters: dict[str, Any] | None = None
+    ) -> "ContextWindow":
+        max_tokens = (parameters or {}).get("max_tokens")
+        return cls(
+            context_window_for(provider, model, parameters),
+            max_tokens if isinstance(max_tokens, int) else None,
+        )
+
+    def _estimate(self, history: list[ModelMessage]) -> list[int]:
+        """Token estimates for ``history``, reusing those of its known prefix."""
+        common = 0
+        for known, message in zip(self._messages, history, strict=False):
+            if known is not message:
+                break
+            common += 1
+        self._messages = list(history)
+        self._tokens = self._tokens[:common] + [
+            estimate_tokens(m) for m in history[common:]
+        ]
+        return self._tokens
+
+    def fit(
+        self, history: list[ModelMessage], prompt: str | Sequence[UserContent]
+    ) -> list[ModelMessage]:
+        """The most recent part of ``history`` that fits alongside ``prompt``."""
+        tokens = self._estimate(history)
+        total = sum(tokens) + estimate_tokens(
+            ModelRequest(parts=[UserPromptPart(content=prompt)])
+        )
+        start = 0
+        self.dropped_turns = 0
+        if self.budget is not None:
+            while total > self.budget and start < len(history):
+                end = start + 1
+                while end < len(history) and not _starts_turn(history[end]):
+                    end += 1
+                total -= sum(tokens[start:end])
+                start = end
+                self.dropped_turns += 1
+        self.used = total
+        return history[start:]
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+import PIL.Image as PILImage
+from PIL import ImageOps
+
+from oterm.config import appConfig
+
+# Longest side, in pixels, images are downscaled to before they are sent.
+# Providers downscale larger images themselves, so the extra pixels only cost
+# upload time and latency: Anthropic resizes past 1568 px, OpenAI fits images
+# into 2048 px.
+MAX_DIMENSION = 1568
+PROVIDER_MAX_DIMENSIONS = {
+    "openai-chat": 2048,
+    "openai-responses": 2048,
+}
+# Quality of the JPEG and WebP images sent.
+QUALITY = 85
+
+# Formats images can be sent as: PIL's name and the media type for each.
+FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+# Modes each format can store as they are.
+MODES = {
+    "jpeg": ("L", "RGB"),
+    "png": ("1", "L", "LA", "P", "RGB", "RGBA"),
+    "webp": ("RGB", "RGBA"),
+}
+_EXIF_ORIENTATION = 0x0112
+# Metadata, in `Image.info`, that may say where, when and with what a photo
+# was taken; re-encoding leaves it out.
+_METADATA = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """An image ready to be sent, and what it took to get there."""
+
+    data: bytes
+    media_type: str
+    original_size: int
+    width: int
+    height: int
+
+
+def image_settings(provider: str, model: str) -> dict[str, Any]:
+    """How images sent to ``model`` are prepared.
+
+    Built from the `images` block in `config.json`, whose `maxDimension`,
+    `quality` and `format` can be overridden per provider (`providers`) and
+    per model (`models`), on top of the defaults for ``provider``.
+    """
+    settings = appConfig.get("images")
+    if not isinstance(settings, dict):
+        settings = {}
+    merged: dict[str, Any] = {
+        "maxDimension": PROVIDER_MAX_DIMENSIONS.get(provider, MAX_DIMENSION),
+        "quality": QUALITY,
+        "format": "auto",
+    }
+    for layer in (
+        settings,
+        (settings.get("providers") or {}).get(provider),
+        (settings.get("models") or {}).get(model),
+    ):
+        if isinstance(layer, dict):
+            merged |= {key: layer[key] for key in merged if key in layer}
+    if merged["format"] not in FORMATS:
+        merged["format"] = "auto"
+    return merged
+
+
+def prepare_image(
+    data: bytes,
+    max_dimension: int | None = MAX_DIMENSION,
+    quality: int = QUALITY,
+    format: str = "auto",
+) -> PreparedImage:
+    """Downscale and re-encode the image ``data`` for sending.
+
+    Images are fitted into ``max_dimension`` pixels (not at all if falsy),
+    turned upright per their EXIF orientation and encoded as ``format``;
+    `"auto"` picks PNG for images with transparency and JPEG for the rest.
+    A JPEG or PNG that needs none of this and carries no EXIF, XMP or text
+    metadata is sent as it is, when ``format`` allows it. Raises ``OSError`` (``UnidentifiedImageError``) if ``data``
+    isn't an image PIL can read.
+    """
+    with PILImage.open(BytesIO(data)) as image:
+        original = (image.format or "").lower()
+        fits = not max_dimension or max(image.size) <= max_dimension
+        upright = image.getexif().get(_EXIF_ORIENTATION, 1) == 1
+        keep = ("jpeg", "png") if format == "auto" else (format,)
+        if fits and upright and original in keep and not _has_metadata(image):
+            return PreparedImage(
+                data, FORMATS[original][1], len(data), image.width, image.height
+            )
+        if max_dimension:
+            # Lets JPEGs decode straight at a reduced scale.
+            image.draft("RGB", (max_dimension, max_dimension))
+        prepared = ImageOps.exif_transpose(image)
+    if max_dimension:
+        prepared.thumbnail((max_dimension, max_dimension))
+    if format == "auto":
+        format = "png" if prepared.has_transparency_data else "jpeg"
+    if prepared.mode not in MODES[format]:
+        alpha = format != "jpeg" and prepared.has_transparency_data
+        prepared = prepared.convert("RGBA" if alpha else "RGB")
+    name, media_type = FORMATS[format]
+    buffer = BytesIO()
+    if format == "png":
+        prepared.save(buffer, format=name)
+    else:
+        prepared.save(buffer, format=name, quality=quality, optimize=True)
+    return PreparedImage(
+        buffer.getvalue(), media_type, len(data), prepared.width, prepared.height
+    )
+
+
+def _has_metadata(image: PILImage.Image) -> bool:
+    """Whether ``image`` carries EXIF, XMP or text chunks."""
+    if any(key in image.info for key in _METADATA) or image.getexif():
+        return True
+    return bool(getattr(image, "text", None))
+
+
+def image_media_type(data: bytes) -> str:
+    """The media type of the image ``data``, from its signature."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def format_size(size: int) -> str:
+    """``size`` bytes, for people."""
+    if size < 1000:
+        return f"{size} B"
+    if size < 1_000_000:
+        return f"{size / 1000:.0f} KB"
+    return f"{size / 1_000_000:.1f} MB"
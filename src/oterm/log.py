@@ -1,9 +1,136 @@
+import atexit
 import logging
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
 
 import rich.repr
 from textual import Logger, LogGroup
 
-log_lines: list[tuple[LogGroup, str]] = []
+from oterm.config import appConfig, envConfig
+
+# Log lines kept in memory, for the log viewer.
+LOG_CAPACITY = 5000
+# Size, in bytes, at which the log file is rotated, and rotated files kept.
+LOG_FILE_SIZE = 1_000_000
+LOG_FILE_COUNT = 3
+# Log lines waiting to be written to file; more are dropped from the file.
+LOG_FILE_BACKLOG = 10_000
+
+# The severity of each log group; groups not listed count as INFO.
+_LEVELS = {
+    LogGroup.DEBUG: logging.DEBUG,
+    LogGroup.INFO: logging.INFO,
+    LogGroup.WARNING: logging.WARNING,
+    LogGroup.ERROR: logging.ERROR,
+}
+
+
+def severity(group: LogGroup) -> int:
+    """The `logging` level of the log group ``group``."""
+    return _LEVELS.get(group, logging.INFO)
+
+
+class LogBuffer:
+    """The most recent log lines at or above a minimum level, oldest first.
+
+    Holds at most ``capacity`` lines; older ones are dropped as new ones
+    arrive. ``total`` counts every line ever kept, so readers can ask for the
+    lines added since they last looked (`since`) however many were dropped.
+    Subscribers are called whenever a line is kept, from whichever thread
+    logged it, and are expected to do no more than schedule a read.
+    """
+
+    def __init__(self, capacity: int = LOG_CAPACITY, level: int = logging.DEBUG):
+        self._lines: deque[tuple[LogGroup, str]] = deque(maxlen=capacity)
+        # Lines are kept from any thread; keeps them and `total` in step.
+        self._lock = threading.Lock()
+        # Replaced rather than changed, so threads logging can iterate it.
+        self._subscribers: tuple[Callable[[], None], ...] = ()
+        self.level = level
+        self.total = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._lines.maxlen or 0
+
+    def configure(self, capacity: int, level: int) -> None:
+        with self._lock:
+            self._lines = deque(self._lines, maxlen=capacity)
+        self.level = level
+
+    def keeps(self, group: LogGroup) -> bool:
+        return severity(group) >= self.level
+
+    def subscribe(self, subscriber: Callable[[], None]) -> None:
+        self._subscribers = (*self._subscribers, subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[], None]) -> None:
+        self._subscribers = tuple(s for s in self._subscribers if s != subscriber)
+
+    def append(self, line: tuple[LogGroup, str]) -> None:
+        if self.keeps(line[0]):
+            with self._lock:
+                self._lines.append(line)
+                self.total += 1
+            for subscriber in self._subscribers:
+                subscriber()
+
+    def since(self, position: int) -> list[tuple[LogGroup, str]]:
+        """The lines kept after the first ``position``, as far as still held."""
+        with self._lock:
+            count = min(self.total - position, len(self._lines))
+            if count <= 0:
+                return []
+            return list(islice(self._lines, len(self._lines) - count, None))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[tuple[LogGroup, str]]:
+        # A copy: lines may be kept from other threads while it is iterated.
+        with self._lock:
+            return iter(list(self._lines))
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                # Deques can't be sliced; copy only the lines asked for.
+                start, stop, step = index.indices(len(self._lines))
+                if step < 0:
+                    return list(self._lines)[index]
+                return list(islice(self._lines, start, stop, step))
+            return self._lines[index]
+
+
+log_lines = LogBuffer()
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Drops records while the queue is full, rather than blocking or growing."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+# Mirrors log lines to rotating files once `configure_logging` enables it.
+# Lines are queued and written by a listener thread, off the event loop.
+_file_logger = logging.getLogger("oterm.file")
+_file_logger.propagate = False
+# Lines are filtered by `log_lines.level`, not by the logging hierarchy.
+_file_logger.setLevel(logging.DEBUG)
+_file_listener: QueueListener | None = None
 
 
 def supress_logging() -> None:
@@ -19,6 +146,72 @@ def supress_logging() -> None:
     root.setLevel(logging.ERROR)
 
 
+def start_file_sink(
+    path: Path, max_bytes: int = LOG_FILE_SIZE, backups: int = LOG_FILE_COUNT
+) -> None:
+    """Also write log lines to ``path``, rotated at ``max_bytes``."""
+    global _file_listener
+    stop_file_sink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    records: queue.Queue[logging.LogRecord] = queue.Queue(LOG_FILE_BACKLOG)
+    _file_logger.addHandler(_BoundedQueueHandler(records))
+    _file_listener = QueueListener(records, handler)
+    _file_listener.start()
+
+
+def stop_file_sink() -> None:
+    """Stop writing log lines to file, flushing those queued."""
+    global _file_listener
+    for handler in _file_logger.handlers[:]:
+        _file_logger.removeHandler(handler)
+    if _file_listener is not None:
+        _file_listener.stop()
+        for handler in _file_listener.handlers:
+            handler.close()
+        _file_listener = None
+
+
+def _count(settings: dict, key: str, default: int, minimum: int) -> int:
+    """``settings[key]`` as a whole number of at least ``minimum``, else
+    ``default``."""
+    value = settings.get(key, default)
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        count = minimum - 1
+    if count < minimum:
+        log.warning(f"Invalid logs.{key} {value!r} in config, using {default}")
+        return default
+    return count
+
+
+def configure_logging() -> None:
+    """Apply the `logs` block of `config.json`.
+
+    Sets the size and minimum level of the in-memory log, and with `file`
+    set, mirrors the log to `logs/oterm.log` in the data directory.
+    """
+    settings = appConfig.get("logs")
+    if not isinstance(settings, dict):
+        return
+    level = logging.getLevelName(str(settings.get("level", "debug")).upper())
+    log_lines.configure(
+        _count(settings, "lines", LOG_CAPACITY, 1),
+        level if isinstance(level, int) else logging.DEBUG,
+    )
+    if settings.get("file"):
+        start_file_sink(
+            envConfig.OTERM_DATA_DIR / "logs" / "oterm.log",
+            _count(settings, "fileSize", LOG_FILE_SIZE, 1),
+            _count(settings, "fileCount", LOG_FILE_COUNT, 0),
+        )
+        atexit.register(stop_file_sink)
+
+
 @rich.repr.auto
 class OtermLogger(Logger):
     @property
@@ -48,6 +241,8 @@ class OtermLogger(Logger):
             key_values = " ".join(f"{key}={value!r}" for key, value in kwargs.items())
             output = f"{output} {key_values}" if output else key_values
         log_lines.append((self._group, output))
+        if _file_listener is not None and log_lines.keeps(self._group):
+            _file_logger.log(severity(self._group), output)
         super().__call__(*args, **kwargs)
 
 
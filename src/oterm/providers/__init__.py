@@ -100,6 +100,10 @@ def get_available_providers() -> list[str]:
     return available
 
 
+# Listing uses each SDK's own sync client rather than the shared clients of
+# `oterm.providers.http`: it runs in a worker thread, where the shared async
+# clients can't be used, and the catalogue asks each provider about once per
+# `MODEL_LIST_TTL`, so there are no connections worth keeping alive.
 def _list_via_openai_client(base_url: str, api_key: str) -> list[str]:
     from openai import OpenAI
 
@@ -221,9 +225,24 @@ def _list_models_from_known(provider: str) -> list[str]:
     ]
 
 
-def list_models(provider: str) -> list[str]:
+def fetch_models(provider: str) -> list[str] | None:
+    """The chat models ``provider``'s API lists, or ``None`` if it can't be asked."""
     from oterm.providers.capabilities import is_chat_model
 
+    models = _list_models_from_api(provider)
+    if models is None:
+        return None
+    return [m for m in models if is_chat_model(provider, m)]
+
+
+def known_models(provider: str) -> list[str]:
+    """The chat models pydantic-ai knows ``provider`` by, without asking it."""
+    from oterm.providers.capabilities import is_chat_model
+
+    return [m for m in _list_models_from_known(provider) if is_chat_model(provider, m)]
+
+
+def list_models(provider: str) -> list[str]:
     if provider == "ollama":
         from oterm.log import log
         from oterm.providers import ollama
@@ -235,5 +254,4 @@ def list_models(provider: str) -> list[str]:
             log.warning(f"Failed to list Ollama models: {e}")
             return []
 
-    models = _list_models_from_api(provider) or _list_models_from_known(provider)
-    return [m for m in models if is_chat_model(provider, m)]
+    return fetch_models(provider) or known_models(provider)
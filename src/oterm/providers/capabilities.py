@@ -1,6 +1,13 @@
+import asyncio
+import json
 import re
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
 
+from oterm.config import envConfig
 from oterm.log import log
 
 
@@ -9,6 +16,11 @@ class ModelCapabilities:
     supports_tools: bool = False
     supports_thinking: bool = False
     supports_vision: bool = False
+    # Tokens of context the model was trained with, when the provider reports
+    # it.
+    context_length: int | None = None
+    # Ollama only: the context size the model's Modelfile runs it with, if set.
+    num_ctx: int | None = None
 
 
 _NON_CHAT_PATTERNS: list[re.Pattern[str]] = [
@@ -108,19 +120,170 @@ def _supports_vision(provider: str, model: str) -> bool:
     return False
 
 
+# Ollama capabilities by model name, with the digest of the model they were
+# read from. Mirrored to `capabilities.json` in the data dir so a model's
+# capabilities are fetched once, then again only when its digest changes.
+_ollama_cache: dict[str, tuple[str | None, ModelCapabilities]] | None = None
+# Digests from the latest model listing.
+_ollama_digests: dict[str, str] = {}
+# Capabilities are fetched from worker threads, several at a time at startup.
+_ollama_lock = threading.Lock()
+# Seconds a model whose capabilities could not be fetched is given the default
+# ones before Ollama is asked again, and when each such model failed.
+FAILED_LOOKUP_TTL = 60.0
+_ollama_failures: dict[str, float] = {}
+
+
+def _cache_path() -> Path:
+    return envConfig.OTERM_DATA_DIR / "capabilities.json"
+
+
+def _load_ollama_cache() -> dict[str, tuple[str | None, ModelCapabilities]]:
+    """The in-memory cache, read from disk on first use. Hold ``_ollama_lock``."""
+    global _ollama_cache
+    if _ollama_cache is None:
+        _ollama_cache = {}
+        try:
+            saved = json.loads(_cache_path().read_text())
+            for model, entry in saved.items():
+                digest = entry.pop("digest", None)
+                _ollama_cache[model] = (digest, ModelCapabilities(**entry))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            log.warning(f"Ignoring unreadable capability cache: {e}")
+    return _ollama_cache
+
+
+def _save_ollama_cache() -> None:
+    cache = _load_ollama_cache()
+    data = {
+        model: {"digest": digest, **asdict(caps)}
+        for model, (digest, caps) in cache.items()
+    }
+    try:
+        path = _cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+    except OSError as e:
+        log.warning(f"Failed to save capability cache: {e}")
+
+
+def _ollama_num_ctx(info: Any) -> int | None:
+    """``num_ctx`` from the model's Modelfile, if set."""
+    match = re.search(r"^num_ctx\s+(\d+)", info.get("parameters") or "", re.M)
+    return int(match.group(1)) if match else None
+
+
+def _ollama_context_length(info: Any) -> int | None:
+    """The context length the model was trained with."""
+    model_info = info.get("modelinfo") or info.get("model_info") or {}
+    for key, value in model_info.items():
+        if key.endswith(".context_length") and isinstance(value, int):
+            return value
+    return None
+
+
+def remember_ollama_capabilities(model: str, info: Any) -> ModelCapabilities:
+    """Cache the capabilities reported by an Ollama ``show`` response."""
+    capabilities: list[str] = info.get("capabilities", []) or []
+    caps = ModelCapabilities(
+        supports_tools="tools" in capabilities,
+        supports_thinking="thinking" in capabilities,
+        supports_vision="vision" in capabilities,
+        context_length=_ollama_context_length(info),
+        num_ctx=_ollama_num_ctx(info),
+    )
+    with _ollama_lock:
+        _ollama_failures.pop(model, None)
+        cache = _load_ollama_cache()
+        entry = (_ollama_digests.get(model), caps)
+        if cache.get(model) != entry:
+            cache[model] = entry
+            _save_ollama_cache()
+    return caps
+
+
+def note_ollama_models(models: Any) -> None:
+    """Record digests from an Ollama model listing and drop stale capabilities.
+
+    Cached capabilities of a model that was re-pulled, or removed, are
+    forgotten; entries saved before any digest was known adopt the listed one.
+    """
+    with _ollama_lock:
+        _ollama_digests.clear()
+        for m in models:
+            if m.model and m.digest:
+                _ollama_digests[m.model] = m.digest
+        cache = _load_ollama_cache()
+        changed = False
+        for model, (digest, caps) in list(cache.items()):
+            current = _ollama_digests.get(model)
+            if current is None or (digest is not None and digest != current):
+                del cache[model]
+                changed = True
+            elif digest is None:
+                cache[model] = (current, caps)
+                changed = True
+        if changed:
+            _save_ollama_cache()
+
+
+async def refresh_ollama_models() -> None:
+    """List Ollama's models off the event loop and drop stale capabilities."""
+    from oterm.providers import ollama
+
+    try:
+        response = await asyncio.to_thread(ollama.list_models)
+    except Exception as e:
+        log.warning(f"Failed to list Ollama models: {e}")
+        return
+    note_ollama_models(response.models)
+
+
+def cached_capabilities(provider: str, model: str) -> ModelCapabilities | None:
+    """``get_capabilities`` if known without asking Ollama, else ``None``.
+
+    Safe to call on the event loop; `fetch_capabilities` fills the gaps.
+    """
+    if provider == "ollama":
+        return _cached_ollama_capabilities(model)
+    return get_capabilities(provider, model)
+
+
+async def fetch_capabilities(provider: str, model: str) -> ModelCapabilities:
+    """``get_capabilities`` without blocking the event loop on Ollama."""
+    cached = cached_capabilities(provider, model)
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(_get_ollama_capabilities, model)
+
+
+def _cached_ollama_capabilities(model: str) -> ModelCapabilities | None:
+    """Cached capabilities, the default ones if the model's lookup failed
+    recently, else ``None``."""
+    with _ollama_lock:
+        cached = _load_ollama_cache().get(model)
+        failed = _ollama_failures.get(model)
+    if cached is not None:
+        return cached[1]
+    if failed is not None and time.monotonic() - failed < FAILED_LOOKUP_TTL:
+        return ModelCapabilities()
+    return None
+
+
 def _get_ollama_capabilities(model: str) -> ModelCapabilities:
-    """Get capabilities from Ollama's show API."""
+    """Get capabilities from the cache, or else from Ollama's show API."""
     from oterm.providers import ollama
 
+    cached = _cached_ollama_capabilities(model)
+    if cached is not None:
+        return cached
     try:
         info = ollama.show_model(model)
     except Exception as e:
         log.warning(f"Ollama show_model({model!r}) failed: {e}")
+        with _ollama_lock:
+            _ollama_failures[model] = time.monotonic()
         return ModelCapabilities()
-
-    capabilities: list[str] = info.get("capabilities", [])
-    return ModelCapabilities(
-        supports_tools="tools" in capabilities,
-        supports_thinking="thinking" in capabilities,
-        supports_vision="vision" in capabilities,
-    )
+    return remember_ollama_capabilities(model, info)
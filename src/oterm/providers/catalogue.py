@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from oterm import providers
+from oterm.config import envConfig
+from oterm.log import log
+
+# Seconds a provider's model list is served from the catalogue before it is
+# refreshed in the background.
+MODEL_LIST_TTL = 6 * 3600.0
+
+# Catalogue key -> (time fetched, models), read from disk on first use.
+_catalogue: dict[str, tuple[float, list[str]]] | None = None
+# Fetches in flight, so concurrent callers share one request per provider.
+_fetches: dict[str, asyncio.Task[list[str] | None]] = {}
+
+
+def _cache_path() -> Path:
+    return envConfig.OTERM_DATA_DIR / "models.json"
+
+
+def _key(provider: str) -> str:
+    """Catalogue key for ``provider``; endpoints are keyed by their URL too."""
+    if provider.startswith("openai-compat/"):
+        name = provider.removeprefix("openai-compat/")
+        config = providers.get_openai_compatible_providers().get(name) or {}
+        return f"{provider}@{config.get('base_url', '')}"
+    return provider
+
+
+def _load() -> dict[str, tuple[float, list[str]]]:
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = {}
+        try:
+            saved = json.loads(_cache_path().read_text())
+            for key, entry in saved.items():
+                _catalogue[key] = (float(entry["fetched"]), list(entry["models"]))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            log.warning(f"Ignoring unreadable model catalogue: {e}")
+    return _catalogue
+
+
+def _save() -> None:
+    data = {
+        key: {"fetched": fetched, "models": models}
+        for key, (fetched, models) in _load().items()
+    }
+    try:
+        path = _cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+    except OSError as e:
+        log.warning(f"Failed to save model catalogue: {e}")
+
+
+def _start_fetch(provider: str) -> asyncio.Task[list[str] | None]:
+    """Ask ``provider`` for its models off the event loop and catalogue them.
+
+    Returns the fetch already in flight for ``provider``, if there is one.
+    """
+    key = _key(provider)
+    task = _fetches.get(key)
+    if task is not None:
+        return task
+
+    async def fetch() -> list[str] | None:
+        try:
+            models = await asyncio.to_thread(providers.fetch_models, provider)
+        finally:
+            _fetches.pop(key, None)
+        if models:
+            _load()[key] = (time.time(), models)
+            _save()
+        return models
+
+    task = _fetches[key] = asyncio.create_task(fetch())
+    return task
+
+
+async def get_models(provider: str) -> list[str]:
+    """The chat models for ``provider``, from the catalogue when possible.
+
+    A catalogued list is returned straight away, and refreshed in the
+    background once it is older than `MODEL_LIST_TTL`. Otherwise the provider
+    is asked; when it can't be, pydantic-ai's known models are returned (and
+    not catalogued). Ollama is always asked: it is local, and listing it is
+    cheap.
+    """
+    if provider == "ollama":
+        return await asyncio.to_thread(providers.list_models, provider)
+    cached = _load().get(_key(provider))
+    if cached is not None:
+        fetched, models = cached
+        if time.time() - fetched > MODEL_LIST_TTL:
+            _start_fetch(provider)
+        return models
+    models = await asyncio.shield(_start_fetch(provider))
+    return models or providers.known_models(provider)
+
+
+async def prefetch_models(names: Iterable[str] | None = None) -> None:
+    """Catalogue the model lists of ``names`` concurrently.
+
+    ``names`` defaults to every available provider. Run ahead of time so that
+    opening the model picker doesn't wait on providers.
+    """
+    if names is None:
+        names = providers.get_available_providers()
+    await asyncio.gather(
+        *(get_models(name) for name in names if name != "ollama"),
+        return_exceptions=True,
+    )
@@ -0,0 +1,72 @@
+import inspect
+from collections.abc import Callable
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic_ai.models import DEFAULT_HTTP_TIMEOUT
+
+from oterm.config import envConfig
+
+T = TypeVar("T")
+
+# Seconds an idle pooled connection is kept open for reuse.
+KEEPALIVE_EXPIRY = 60.0
+
+# Clients shared process-wide, keyed by kind, server and SSL verification, so
+# requests to the same server reuse its connections.
+_clients: dict[tuple[str, str, bool], Any] = {}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def shared_client(kind: str, server: str, build: Callable[[bool], T]) -> T:
+    """The shared client of ``kind`` for ``server``, built on first use.
+
+    ``build`` receives the SSL verification setting (``OTERM_VERIFY_SSL``) and
+    must return a client with a ``close`` or ``aclose`` method.
+    """
+    key = (kind, server, envConfig.OTERM_VERIFY_SSL)
+    client = _clients.get(key)
+    if client is None or getattr(client, "is_closed", False):
+        client = _clients[key] = build(envConfig.OTERM_VERIFY_SSL)
+    return client
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """The shared async HTTP client for requests to ``url``'s server.
+
+    Clients are created on first use and kept, with their keep-alive
+    connections, until `close_http_clients`.
+    """
+
+    def build(verify: bool) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            verify=verify,
+            timeout=httpx.Timeout(timeout=DEFAULT_HTTP_TIMEOUT, connect=5),
+            limits=httpx.Limits(keepalive_expiry=KEEPALIVE_EXPIRY),
+        )
+
+    return shared_client("httpx", _origin(url), build)
+
+
+def clear_http_clients() -> None:
+    """Forget the shared clients without closing them.
+
+    For tests, whose event loops (and the clients bound to them) are gone
+    by the time the next test runs.
+    """
+    _clients.clear()
+
+
+async def close_http_clients() -> None:
+    """Close every shared client and its connections."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        closed = client.aclose() if hasattr(client, "aclose") else client.close()
+        if inspect.isawaitable(closed):
+            await closed
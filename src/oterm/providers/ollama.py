@@ -1,6 +1,7 @@
 from ollama import Client, ListResponse, ShowResponse
 
 from oterm.config import envConfig
+from oterm.providers.http import shared_client
 
 
 def openai_compat_base_url() -> str:
@@ -25,11 +26,17 @@ def ollama_client_host() -> str:
     return base
 
 
+def ollama_client() -> Client:
+    """The shared Ollama client, reusing its connections across calls."""
+    host = ollama_client_host()
+    return shared_client(
+        "ollama", host, lambda verify: Client(host=host, verify=verify)
+    )
+
+
 def list_models() -> ListResponse:
-    client = Client(host=ollama_client_host(), verify=envConfig.OTERM_VERIFY_SSL)
-    return client.list()
+    return ollama_client().list()
 
 
 def show_model(model: str) -> ShowResponse:
-    client = Client(host=ollama_client_host(), verify=envConfig.OTERM_VERIFY_SSL)
-    return client.show(model)
+    return ollama_client().show(model)
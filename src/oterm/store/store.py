@@ -1,18 +1,192 @@
+import base64
+import hashlib
 import json
+import re
+import zlib
+from collections.abc import Callable, Collection, Mapping
 from importlib import metadata
 from pathlib import Path
+from typing import Any
 
 import aiosqlite
 from packaging.version import parse
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
 
 from oterm.config import envConfig
 from oterm.store.upgrades import upgrades
-from oterm.types import ChatModel, MessageModel
+from oterm.thumbnails import discard_thumbnails
+from oterm.types import ChatModel, MessageModel, SearchResultModel, SummaryModel
 from oterm.utils import int_to_semantic_version, semantic_version_to_int
 
+# Applied to every connection the store opens. WAL lets readers proceed while
+# a message is being written; with WAL, `synchronous = NORMAL` is still
+# crash-safe and avoids an fsync per commit. `cache_size` is negative, so it
+# is in KiB (32 MiB); `mmap_size` maps up to 256 MiB of the file for reads.
+_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,
+    "mmap_size": 268435456,
+    "foreign_keys": "ON",
+}
+
+# Wrap the matched terms in search snippets; control characters, so they can't
+# clash with message text.
+SEARCH_MATCH_START = "\x02"
+SEARCH_MATCH_END = "\x03"
+# Scoring every match of a common word is slow on large stores, so searches
+# rank only the most recent matches. Shorter prefixes expand to too many terms
+# to be worth matching while typing.
+SEARCH_CANDIDATES = 500
+SEARCH_MIN_PREFIX = 2
+
+# Full-text index of message text. It is an external-content FTS5 table (the
+# text lives only in `message`), kept in sync by triggers.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS "message_search" USING fts5(
+    text,
+    content = 'message',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS "message_search_insert" AFTER INSERT ON "message"
+BEGIN
+    INSERT INTO message_search(rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "message_search_delete" AFTER DELETE ON "message"
+BEGIN
+    INSERT INTO message_search(message_search, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "message_search_update" AFTER UPDATE OF text ON "message"
+BEGIN
+    INSERT INTO message_search(message_search, rowid, text)
+    VALUES ('delete', old.id, old.text);
+    INSERT INTO message_search(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+# The images each message references, indexed by hash, so deleting messages
+# can tell which of their images nothing else references without reading
+# every message's `images`. Kept in sync with `message.images` by triggers.
+IMAGE_REFS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "message_image" (
+    "message_id"    INTEGER NOT NULL,
+    "hash"          TEXT NOT NULL,
+    PRIMARY KEY("message_id", "hash")
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS "message_image_hash" ON "message_image"("hash");
+
+CREATE TRIGGER IF NOT EXISTS "message_image_insert" AFTER INSERT ON "message"
+BEGIN
+    INSERT OR IGNORE INTO message_image(message_id, hash)
+    SELECT new.id, value FROM json_each(new.images);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "message_image_delete" AFTER DELETE ON "message"
+BEGIN
+    DELETE FROM message_image WHERE message_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS "message_image_update" AFTER UPDATE OF images ON "message"
+BEGIN
+    DELETE FROM message_image WHERE message_id = old.id;
+    INSERT OR IGNORE INTO message_image(message_id, hash)
+    SELECT new.id, value FROM json_each(new.images);
+END;
+"""
+
+
+def _match_expression(query: str) -> str:
+    """An FTS5 query matching messages containing every word of ``query``.
+
+    Words are quoted, so FTS5 syntax in ``query`` is matched literally; the
+    last word also matches as a prefix while it is still being typed, once
+    it is `SEARCH_MIN_PREFIX` characters long.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    if not query[-1].isspace() and len(words[-1]) >= SEARCH_MIN_PREFIX:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+# Marks binary content in a dumped turn whose bytes are in the `image` table,
+# under this hash, rather than inline.
+_IMAGE_REFERENCE = "oterm_image"
+
+
+def image_hash(data: bytes) -> str:
+    """The key images are stored under."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _map_binary(value: Any, replace: Callable[[dict], dict]) -> Any:
+    """Dumped messages ``value`` with ``replace`` applied to binary content."""
+    if isinstance(value, list):
+        return [_map_binary(item, replace) for item in value]
+    if isinstance(value, dict):
+        if value.get("kind") == "binary" and isinstance(value.get("data"), str):
+            return replace(value)
+        return {key: _map_binary(item, replace) for key, item in value.items()}
+    return value
+
+
+def dump_turn(messages: list[ModelMessage], images: Collection[str] = ()) -> bytes:
+    """Encode a turn's pydantic-ai messages as compressed JSON.
+
+    Binary content stored as one of ``images`` (hashes in the `image` table)
+    is written as a reference to it rather than inline, so it isn't stored
+    twice; `load_turn` reads it back from there.
+    """
+    stored = set(images)
+
+    def to_reference(content: dict) -> dict:
+        hash = image_hash(base64.urlsafe_b64decode(content["data"]))
+        if hash not in stored:
+            return content
+        return {**content, "data": "", _IMAGE_REFERENCE: hash}
+
+    dumped = ModelMessagesTypeAdapter.dump_python(messages, mode="json")
+    return zlib.compress(json.dumps(_map_binary(dumped, to_reference)).encode())
+
+
+def load_turn(
+    data: bytes, images: Mapping[str, bytes] | None = None
+) -> list[ModelMessage] | None:
+    """Decode messages encoded by `dump_turn`; ``None`` if they can't be read.
+
+    ``images`` maps the hashes the turn references to their bytes; a turn
+    referencing an image missing from it can't be read either.
+    """
+
+    def from_reference(content: dict) -> dict:
+        hash = content.pop(_IMAGE_REFERENCE, None)
+        if hash is None:
+            return content
+        image = (images or {}).get(hash)
+        if image is None:
+            raise KeyError(hash)
+        return {**content, "data": base64.urlsafe_b64encode(image).decode()}
+
+    try:
+        dumped = json.loads(zlib.decompress(data))
+        return ModelMessagesTypeAdapter.validate_json(
+            json.dumps(_map_binary(dumped, from_reference))
+        )
+    except (zlib.error, ValueError, KeyError):
+        return None
+
 
 class Store:
     db_path: Path
+    connection: aiosqlite.Connection
 
     _store: "Store | None" = None
 
@@ -25,35 +199,60 @@ class Store:
         data_path.mkdir(parents=True, exist_ok=True)
         self.db_path = data_path / "store.db"
 
-        if not self.db_path.exists():
+        exists = self.db_path.exists()
+        self.connection = await self._connect()
+        if not exists:
             # Create tables and set user_version
-            async with aiosqlite.connect(self.db_path) as connection:
-                await connection.executescript(
-                    """
-                    CREATE TABLE IF NOT EXISTS "chat" (
-                        "id"            INTEGER,
-                        "name"          TEXT,
-                        "model"         TEXT NOT NULL,
-                        "system"        TEXT,
-                        "provider"      TEXT DEFAULT "ollama",
-                        "parameters"    TEXT DEFAULT "{}",
-                        "tools"         TEXT DEFAULT "[]",
-                        "thinking"      BOOLEAN DEFAULT 0,
-                        PRIMARY KEY("id" AUTOINCREMENT)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS "message" (
-                        "id"		INTEGER,
-                        "chat_id"	INTEGER NOT NULL,
-                        "author"	TEXT NOT NULL,
-                        "text"		TEXT NOT NULL,
-                        "images"    TEXT DEFAULT "[]",
-                        PRIMARY KEY("id" AUTOINCREMENT),
-                        FOREIGN KEY("chat_id") REFERENCES "chat"("id") ON DELETE CASCADE
-                    );
+            await self.connection.executescript(
                 """
+                CREATE TABLE IF NOT EXISTS "chat" (
+                    "id"            INTEGER,
+                    "name"          TEXT,
+                    "model"         TEXT NOT NULL,
+                    "system"        TEXT,
+                    "provider"      TEXT DEFAULT "ollama",
+                    "parameters"    TEXT DEFAULT "{}",
+                    "tools"         TEXT DEFAULT "[]",
+                    "thinking"      BOOLEAN DEFAULT 0,
+                    PRIMARY KEY("id" AUTOINCREMENT)
+                );
+
+                CREATE TABLE IF NOT EXISTS "message" (
+                    "id"		INTEGER,
+                    "chat_id"	INTEGER NOT NULL,
+                    "author"	TEXT NOT NULL,
+                    "text"		TEXT NOT NULL,
+                    "images"    TEXT DEFAULT "[]",
+                    "history"   BLOB,
+                    PRIMARY KEY("id" AUTOINCREMENT),
+                    FOREIGN KEY("chat_id") REFERENCES "chat"("id") ON DELETE CASCADE
+                );
+
+                CREATE INDEX IF NOT EXISTS "message_chat_id" ON "message"("chat_id", "id");
+
+                CREATE TABLE IF NOT EXISTS "image" (
+                    "hash"  TEXT PRIMARY KEY,
+                    "data"  BLOB NOT NULL
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS "summary" (
+                    "chat_id"   INTEGER PRIMARY KEY,
+                    "turns"     INTEGER NOT NULL,
+                    "text"      TEXT NOT NULL,
+                    FOREIGN KEY("chat_id") REFERENCES "chat"("id") ON DELETE CASCADE
+                );
+            """
+                + SEARCH_SCHEMA
+                + IMAGE_REFS_SCHEMA
+            )
+            # The schema is that of the latest upgrade, whichever version of
+            # oterm is installed, so none of the upgrades run on it again.
+            await self.set_user_version(
+                max(
+                    [metadata.version("oterm"), *(version for version, _ in upgrades)],
+                    key=parse,
                 )
-                await self.set_user_version(metadata.version("oterm"))
+            )
         else:
             # Upgrade database
             current_version: str = metadata.version("oterm")
@@ -68,182 +267,372 @@ class Store:
         cls._store = self
         return self
 
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open the long-lived connection every query goes through.
+
+        aiosqlite runs each connection on its own worker thread; opening one
+        per call meant a new thread and a re-opened file on every query.
+        """
+        connection = await aiosqlite.connect(self.db_path)
+        for pragma, value in _PRAGMAS.items():
+            await connection.execute(f"PRAGMA {pragma} = {value};")
+        return connection
+
+    @classmethod
+    async def close_store(cls) -> None:
+        """Close the shared store, if it was opened.
+
+        Its connection runs on a non-daemon thread, so a store left open
+        keeps the process alive after the app exits.
+        """
+        if cls._store is not None:
+            await cls._store.close()
+
+    async def close(self) -> None:
+        """Close the shared connection and drop the process-wide singleton."""
+        await self.connection.close()
+        if Store._store is self:
+            Store._store = None
+
     async def get_user_version(self) -> str:
-        async with aiosqlite.connect(self.db_path) as connection:
-            res = await connection.execute("PRAGMA user_version;")
-            res = await res.fetchone()
-            return int_to_semantic_version(res[0] if res else 0)
+        res = await self.connection.execute("PRAGMA user_version;")
+        res = await res.fetchone()
+        return int_to_semantic_version(res[0] if res else 0)
 
     async def set_user_version(self, version: str) -> None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            await connection.execute(
-                f"PRAGMA user_version = {semantic_version_to_int(version)};"
-            )
+        await self.connection.execute(
+            f"PRAGMA user_version = {semantic_version_to_int(version)};"
+        )
 
     async def save_chat(self, chat_model: ChatModel) -> int:
-        # `INSERT OR REPLACE`: callers pass `id=None` for a new row (sqlite
-        # autoincrements) or a real id to overwrite an existing chat.
-        async with aiosqlite.connect(self.db_path) as connection:
-            res = await connection.execute_insert(
-                """
-                INSERT OR REPLACE
-                INTO chat(id, name, model, system, provider, parameters, tools, thinking)
-                VALUES(:id, :name, :model, :system, :provider, :parameters, :tools, :thinking) RETURNING id;""",
-                {
-                    "id": chat_model.id,
-                    "name": chat_model.name,
-                    "model": chat_model.model,
-                    "system": chat_model.system,
-                    "provider": chat_model.provider,
-                    "parameters": json.dumps(chat_model.parameters),
-                    "tools": json.dumps(chat_model.tools),
-                    "thinking": chat_model.thinking,
-                },
-            )
-            await connection.commit()
-
-        return res[0] if res else 0
+        # Upsert: callers pass `id=None` for a new row (sqlite autoincrements)
+        # or a real id to overwrite an existing chat. `INSERT OR REPLACE`
+        # would delete the old row first, cascading to its messages now that
+        # foreign keys are enforced on the shared connection.
+        rows = await self.connection.execute_fetchall(
+            """
+            INSERT INTO chat(id, name, model, system, provider, parameters, tools, thinking)
+            VALUES(:id, :name, :model, :system, :provider, :parameters, :tools, :thinking)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                model = excluded.model,
+                system = excluded.system,
+                provider = excluded.provider,
+                parameters = excluded.parameters,
+                tools = excluded.tools,
+                thinking = excluded.thinking
+            RETURNING id;""",
+            {
+                "id": chat_model.id,
+                "name": chat_model.name,
+                "model": chat_model.model,
+                "system": chat_model.system,
+                "provider": chat_model.provider,
+                "parameters": json.dumps(chat_model.parameters),
+                "tools": json.dumps(chat_model.tools),
+                "thinking": chat_model.thinking,
+            },
+        )
+        await self.connection.commit()
+        row = next(iter(rows), None)
+        return row[0] if row else 0
 
     async def rename_chat(self, id: int, name: str) -> None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            await connection.execute(
-                "UPDATE chat SET name = :name WHERE id = :id;", {"id": id, "name": name}
-            )
-            await connection.commit()
+        await self.connection.execute(
+            "UPDATE chat SET name = :name WHERE id = :id;", {"id": id, "name": name}
+        )
+        await self.connection.commit()
 
     async def edit_chat(self, chat_model: ChatModel) -> None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            await connection.execute(
-                """
-                UPDATE chat
-                SET name = :name,
-                    system = :system,
-                    provider = :provider,
-                    parameters = :parameters,
-                    tools = :tools,
-                    thinking = :thinking
-                WHERE id = :id;
-                """,
-                {
-                    "id": chat_model.id,
-                    "name": chat_model.name,
-                    "system": chat_model.system,
-                    "provider": chat_model.provider,
-                    "parameters": json.dumps(chat_model.parameters),
-                    "tools": json.dumps(chat_model.tools),
-                    "thinking": chat_model.thinking,
-                },
-            )
-            await connection.commit()
+        await self.connection.execute(
+            """
+            UPDATE chat
+            SET name = :name,
+                system = :system,
+                provider = :provider,
+                parameters = :parameters,
+                tools = :tools,
+                thinking = :thinking
+            WHERE id = :id;
+            """,
+            {
+                "id": chat_model.id,
+                "name": chat_model.name,
+                "system": chat_model.system,
+                "provider": chat_model.provider,
+                "parameters": json.dumps(chat_model.parameters),
+                "tools": json.dumps(chat_model.tools),
+                "thinking": chat_model.thinking,
+            },
+        )
+        await self.connection.commit()
 
     async def get_chats(self) -> list[ChatModel]:
-        async with aiosqlite.connect(self.db_path) as connection:
-            chats = await connection.execute_fetchall(
-                """
-                SELECT id, name, model, system, provider, parameters, tools, thinking
-                FROM chat;
-                """
-            )
+        chats = await self.connection.execute_fetchall(
+            """
+            SELECT id, name, model, system, provider, parameters, tools, thinking
+            FROM chat;
+            """
+        )
 
-            return [
-                ChatModel(
-                    id=id,
-                    name=name,
-                    model=model,
-                    system=system,
-                    provider=provider,
-                    parameters=json.loads(parameters),
-                    tools=json.loads(tools),
-                    thinking=thinking,
-                )
-                for id, name, model, system, provider, parameters, tools, thinking in chats
-            ]
+        return [
+            ChatModel(
+                id=id,
+                name=name,
+                model=model,
+                system=system,
+                provider=provider,
+                parameters=json.loads(parameters),
+                tools=json.loads(tools),
+                thinking=thinking,
+            )
+            for id, name, model, system, provider, parameters, tools, thinking in chats
+        ]
 
     async def get_chat(self, id: int) -> ChatModel | None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            chat = await connection.execute_fetchall(
-                """
-                SELECT id, name, model, system, provider, parameters, tools, thinking
-                FROM chat
-                WHERE id = :id;
-                """,
-                {"id": id},
+        chat = await self.connection.execute_fetchall(
+            """
+            SELECT id, name, model, system, provider, parameters, tools, thinking
+            FROM chat
+            WHERE id = :id;
+            """,
+            {"id": id},
+        )
+        chat = next(iter(chat), None)
+        if chat:
+            (
+                id,
+                name,
+                model,
+                system,
+                provider,
+                parameters,
+                tools,
+                thinking,
+            ) = chat
+            return ChatModel(
+                id=id,
+                name=name,
+                model=model,
+                system=system,
+                provider=provider,
+                parameters=json.loads(parameters),
+                tools=json.loads(tools),
+                thinking=thinking,
             )
-            chat = next(iter(chat), None)
-            if chat:
-                (
-                    id,
-                    name,
-                    model,
-                    system,
-                    provider,
-                    parameters,
-                    tools,
-                    thinking,
-                ) = chat
-                return ChatModel(
-                    id=id,
-                    name=name,
-                    model=model,
-                    system=system,
-                    provider=provider,
-                    parameters=json.loads(parameters),
-                    tools=json.loads(tools),
-                    thinking=thinking,
-                )
-            return None
+        return None
 
     async def delete_chat(self, id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            await connection.execute("PRAGMA foreign_keys = on;")
-            await connection.execute("DELETE FROM chat WHERE id = :id;", {"id": id})
-            await connection.commit()
+        hashes = await self._chat_images(id)
+        await self.connection.execute("DELETE FROM chat WHERE id = :id;", {"id": id})
+        await self._prune_images(hashes)
+        await self.connection.commit()
 
     async def save_message(self, message_model: MessageModel) -> int:
-        # `INSERT OR REPLACE`: regenerate reuses an existing message id to
-        # overwrite; new messages pass `id=None`.
-        async with aiosqlite.connect(self.db_path) as connection:
-            res = await connection.execute_insert(
-                """
-                INSERT OR REPLACE
-                INTO message(id, chat_id, author, text, images)
-                VALUES(:id, :chat_id, :author, :text, :images) RETURNING id;
-                """,
-                {
-                    "id": message_model.id,
-                    "chat_id": message_model.chat_id,
-                    "author": message_model.role,
-                    "text": message_model.text,
-                    "images": json.dumps(message_model.images),
-                },
-            )
-            await connection.commit()
-            return res[0] if res else 0
+        # Upsert: regenerate reuses an existing message id to overwrite; new
+        # messages pass `id=None`. Not `INSERT OR REPLACE`, whose implicit
+        # delete would skip the trigger keeping the search index in sync.
+        res = await self.connection.execute_insert(
+            """
+            INSERT INTO message(id, chat_id, author, text, images, history)
+            VALUES(:id, :chat_id, :author, :text, :images, :history)
+            ON CONFLICT(id) DO UPDATE SET
+                chat_id = excluded.chat_id,
+                author = excluded.author,
+                text = excluded.text,
+                images = excluded.images,
+                history = excluded.history
+            RETURNING id;
+            """,
+            {
+                "id": message_model.id,
+                "chat_id": message_model.chat_id,
+                "author": message_model.role,
+                "text": message_model.text,
+                "images": json.dumps(message_model.images),
+                "history": message_model.history,
+            },
+        )
+        await self.connection.commit()
+        return res[0] if res else 0
 
-    async def get_messages(self, chat_id: int) -> list[MessageModel]:
-        async with aiosqlite.connect(self.db_path) as connection:
-            messages = await connection.execute_fetchall(
-                """
-                SELECT id, author, text, images
+    async def get_messages(
+        self, chat_id: int, before_id: int | None = None, limit: int | None = None
+    ) -> list[MessageModel]:
+        """The chat's messages, oldest first.
+
+        With ``before_id`` only those stored before that message, and with
+        ``limit`` only the last ``limit`` of them, so a transcript can be read
+        a page at a time from the end.
+        """
+        messages = await self.connection.execute_fetchall(
+            """
+            SELECT id, author, text, images, history FROM (
+                SELECT id, author, text, images, history
                 FROM message
-                WHERE chat_id = :chat_id;
-                """,
-                {"chat_id": chat_id},
+                WHERE chat_id = :chat_id
+                  AND (:before_id IS NULL OR id < :before_id)
+                ORDER BY id DESC
+                LIMIT :limit
             )
-            return [
-                MessageModel(
-                    id=id,
-                    chat_id=chat_id,
-                    role=author,
-                    text=text,
-                    images=json.loads(images),
-                )
-                for id, author, text, images in messages
-            ]
+            ORDER BY id;
+            """,
+            {
+                "chat_id": chat_id,
+                "before_id": before_id,
+                "limit": -1 if limit is None else limit,
+            },
+        )
+        return [
+            MessageModel(
+                id=id,
+                chat_id=chat_id,
+                role=author,
+                text=text,
+                images=json.loads(images),
+                history=history,
+            )
+            for id, author, text, images, history in messages
+        ]
+
+    async def search_messages(
+        self, query: str, limit: int = 50, candidates: int = SEARCH_CANDIDATES
+    ) -> list[SearchResultModel]:
+        """The messages of every chat that best match ``query``, best first.
+
+        Every word of ``query`` must appear; the ``candidates`` most recent
+        matches are ranked with FTS5's BM25.
+        """
+        expression = _match_expression(query)
+        if not expression:
+            return []
+        rows = await self.connection.execute_fetchall(
+            """
+            SELECT chat_id, name, id, author, snippet FROM (
+                SELECT message.chat_id, chat.name, message.id, message.author,
+                       bm25(message_search) AS score,
+                       snippet(message_search, 0, :start, :end, '…', 16)
+                           AS snippet
+                FROM message_search
+                JOIN message ON message.id = message_search.rowid
+                JOIN chat ON chat.id = message.chat_id
+                WHERE message_search MATCH :expression
+                ORDER BY message_search.rowid DESC
+                LIMIT :candidates
+            )
+            ORDER BY score
+            LIMIT :limit;
+            """,
+            {
+                "expression": expression,
+                "start": SEARCH_MATCH_START,
+                "end": SEARCH_MATCH_END,
+                "candidates": candidates,
+                "limit": limit,
+            },
+        )
+        return [
+            SearchResultModel(
+                chat_id=chat_id,
+                chat_name=chat_name,
+                message_id=message_id,
+                role=author,
+                snippet=snippet,
+            )
+            for chat_id, chat_name, message_id, author, snippet in rows
+        ]
 
     async def clear_chat(self, chat_id: int) -> None:
-        async with aiosqlite.connect(self.db_path) as connection:
-            await connection.execute(
-                "DELETE FROM message WHERE chat_id = :chat_id;", {"chat_id": chat_id}
+        hashes = await self._chat_images(chat_id)
+        await self.connection.execute(
+            "DELETE FROM message WHERE chat_id = :chat_id;", {"chat_id": chat_id}
+        )
+        await self.connection.execute(
+            "DELETE FROM summary WHERE chat_id = :chat_id;", {"chat_id": chat_id}
+        )
+        await self._prune_images(hashes)
+        await self.connection.commit()
+
+    async def save_summary(self, summary: SummaryModel) -> None:
+        """Store ``summary`` as the chat's summary, replacing any earlier one."""
+        await self.connection.execute(
+            """
+            INSERT INTO summary(chat_id, turns, text)
+            VALUES(:chat_id, :turns, :text)
+            ON CONFLICT(chat_id) DO UPDATE SET
+                turns = excluded.turns,
+                text = excluded.text;
+            """,
+            summary.model_dump(),
+        )
+        await self.connection.commit()
+
+    async def get_summary(self, chat_id: int) -> SummaryModel | None:
+        rows = await self.connection.execute_fetchall(
+            "SELECT turns, text FROM summary WHERE chat_id = :chat_id;",
+            {"chat_id": chat_id},
+        )
+        row = next(iter(rows), None)
+        if row is None:
+            return None
+        turns, text = row
+        return SummaryModel(chat_id=chat_id, turns=turns, text=text)
+
+    async def save_image(self, data: bytes) -> str:
+        """Store image bytes once, keyed by their SHA-256; returns the hash.
+
+        Messages reference images by this hash (``MessageModel.images``), so
+        an image re-sent in several messages is only stored once.
+        """
+        digest = image_hash(data)
+        await self.connection.execute(
+            "INSERT OR IGNORE INTO image(hash, data) VALUES(:hash, :data);",
+            {"hash": digest, "data": data},
+        )
+        await self.connection.commit()
+        return digest
+
+    async def get_image(self, hash: str) -> bytes | None:
+        images = await self.get_images([hash])
+        return images.get(hash)
+
+    async def get_images(self, hashes: list[str]) -> dict[str, bytes]:
+        """Bytes of the stored images among ``hashes``; unknown hashes are omitted."""
+        unique = list(dict.fromkeys(hashes))
+        if not unique:
+            return {}
+        placeholders = ", ".join("?" for _ in unique)
+        rows = await self.connection.execute_fetchall(
+            f"SELECT hash, data FROM image WHERE hash IN ({placeholders});", unique
+        )
+        return {hash: data for hash, data in rows}
+
+    async def _chat_images(self, chat_id: int) -> list[str]:
+        """Hashes of the images the chat's messages reference."""
+        rows = await self.connection.execute_fetchall(
+            """
+            SELECT DISTINCT message_image.hash
+            FROM message JOIN message_image ON message_image.message_id = message.id
+            WHERE message.chat_id = :chat_id;
+            """,
+            {"chat_id": chat_id},
+        )
+        return [hash for (hash,) in rows]
+
+    async def _prune_images(self, hashes: list[str]) -> None:
+        """Drop the images among ``hashes`` no message references any more, and
+        their thumbnails. Left to the caller to commit."""
+        if not hashes:
+            return
+        pruned = await self.connection.execute_fetchall(
+            """
+            DELETE FROM image
+            WHERE hash IN (SELECT value FROM json_each(:hashes))
+            AND NOT EXISTS (
+                SELECT 1 FROM message_image WHERE message_image.hash = image.hash
             )
-            await connection.commit()
+            RETURNING hash;
+            """,
+            {"hashes": json.dumps(hashes)},
+        )
+        discard_thumbnails([hash for (hash,) in pruned])
@@ -1,4 +1,5 @@
 from oterm.store.upgrades.v0_15_0 import upgrades as v0_15_0_upgrades
 from oterm.store.upgrades.v0_18_0 import upgrades as v0_18_0_upgrades
+from oterm.store.upgrades.v0_20_0 import upgrades as v0_20_0_upgrades
 
-upgrades = v0_15_0_upgrades + v0_18_0_upgrades
+upgrades = v0_15_0_upgrades + v0_18_0_upgrades + v0_20_0_upgrades
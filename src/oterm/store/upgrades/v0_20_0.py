@@ -0,0 +1,186 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import aiosqlite
+
+
+async def add_message_chat_index(db_path: Path) -> None:
+    """Index messages by chat so per-chat reads and deletes stop scanning the table."""
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.execute(
+            'CREATE INDEX IF NOT EXISTS "message_chat_id" ON "message"("chat_id", "id");'
+        )
+        await connection.commit()
+
+
+async def move_images_to_image_table(db_path: Path) -> None:
+    """Move base64 images out of message rows into the content-addressed
+    ``image`` table, leaving their SHA-256 hashes in ``message.images``.
+
+    Entries that are not valid base64 are left in place, so ``[Image #N]``
+    tokens keep pointing at the right slot; they never resolve to an image.
+    Entries that are already the hash of a stored image are kept as they are,
+    so running the step again changes nothing.
+    """
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "image" (
+                "hash"  TEXT PRIMARY KEY,
+                "data"  BLOB NOT NULL
+            ) WITHOUT ROWID;
+            """
+        )
+        rows = await connection.execute_fetchall(
+            "SELECT id, images FROM message WHERE images IS NOT NULL AND images != '[]'"
+        )
+        stored = {
+            hash
+            for (hash,) in await connection.execute_fetchall("SELECT hash FROM image")
+        }
+        for id, images in rows:
+            hashes = []
+            for image in json.loads(images):
+                if image in stored:
+                    # A hex digest is valid base64 too.
+                    hashes.append(image)
+                    continue
+                try:
+                    data = base64.b64decode(image, validate=True)
+                except (binascii.Error, ValueError):
+                    hashes.append(image)
+                    continue
+                digest = hashlib.sha256(data).hexdigest()
+                await connection.execute(
+                    "INSERT OR IGNORE INTO image(hash, data) VALUES(?, ?)",
+                    (digest, data),
+                )
+                stored.add(digest)
+                hashes.append(digest)
+            await connection.execute(
+                "UPDATE message SET images = ? WHERE id = ?", (json.dumps(hashes), id)
+            )
+        await connection.commit()
+
+
+async def add_summary_table(db_path: Path) -> None:
+    """Add the table holding each chat's rolling summary of its earliest turns."""
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "summary" (
+                "chat_id"   INTEGER PRIMARY KEY,
+                "turns"     INTEGER NOT NULL,
+                "text"      TEXT NOT NULL,
+                FOREIGN KEY("chat_id") REFERENCES "chat"("id") ON DELETE CASCADE
+            );
+            """
+        )
+        await connection.commit()
+
+
+async def add_message_history_column(db_path: Path) -> None:
+    """Add the column keeping each turn's full pydantic-ai messages."""
+    async with aiosqlite.connect(db_path) as connection:
+        columns = await connection.execute_fetchall("PRAGMA table_info(message);")
+        if "history" not in [column[1] for column in columns]:
+            await connection.execute('ALTER TABLE message ADD COLUMN "history" BLOB;')
+            await connection.commit()
+
+
+async def add_message_search_index(db_path: Path) -> None:
+    """Create the full-text index of message text and index existing messages."""
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS "message_search" USING fts5(
+                text,
+                content = 'message',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS "message_search_insert" AFTER INSERT ON "message"
+            BEGIN
+                INSERT INTO message_search(rowid, text) VALUES (new.id, new.text);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS "message_search_delete" AFTER DELETE ON "message"
+            BEGIN
+                INSERT INTO message_search(message_search, rowid, text)
+                VALUES ('delete', old.id, old.text);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS "message_search_update" AFTER UPDATE OF text ON "message"
+            BEGIN
+                INSERT INTO message_search(message_search, rowid, text)
+                VALUES ('delete', old.id, old.text);
+                INSERT INTO message_search(rowid, text) VALUES (new.id, new.text);
+            END;
+            """
+        )
+        await connection.execute(
+            "INSERT INTO message_search(message_search) VALUES ('rebuild');"
+        )
+        await connection.commit()
+
+
+async def add_message_image_index(db_path: Path) -> None:
+    """Index the images each message references and fill the index from the
+    existing messages."""
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS "message_image" (
+                "message_id"    INTEGER NOT NULL,
+                "hash"          TEXT NOT NULL,
+                PRIMARY KEY("message_id", "hash")
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS "message_image_hash" ON "message_image"("hash");
+
+            CREATE TRIGGER IF NOT EXISTS "message_image_insert" AFTER INSERT ON "message"
+            BEGIN
+                INSERT OR IGNORE INTO message_image(message_id, hash)
+                SELECT new.id, value FROM json_each(new.images);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS "message_image_delete" AFTER DELETE ON "message"
+            BEGIN
+                DELETE FROM message_image WHERE message_id = old.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS "message_image_update" AFTER UPDATE OF images ON "message"
+            BEGIN
+                DELETE FROM message_image WHERE message_id = old.id;
+                INSERT OR IGNORE INTO message_image(message_id, hash)
+                SELECT new.id, value FROM json_each(new.images);
+            END;
+            """
+        )
+        await connection.execute(
+            """
+            INSERT OR IGNORE INTO message_image(message_id, hash)
+            SELECT message.id, value FROM message, json_each(message.images);
+            """
+        )
+        await connection.commit()
+
+
+upgrades: list[tuple[str, list[Callable[[Path], Awaitable[None]]]]] = [
+    (
+        "0.20.0",
+        [
+            add_message_chat_index,
+            move_images_to_image_table,
+            add_summary_table,
+            add_message_history_column,
+            add_message_search_index,
+            add_message_image_index,
+        ],
+    ),
+]
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+
+import PIL.Image as PILImage
+from PIL import UnidentifiedImageError
+
+from oterm.config import envConfig
+from oterm.images import MODES
+from oterm.log import log
+
+# Longest side, in pixels, of the thumbnails shown in chats. An
+# `.assistantImage` is 30 rows tall, a few hundred pixels at most.
+THUMBNAIL_SIZE = 512
+# Thumbnails kept decoded in memory, most recently used last.
+MEMORY_CACHE_SIZE = 32
+
+# Thumbnails by the SHA-256 of the image they were made from (the hash the
+# store keys images by). Mirrored as PNGs to `thumbnails/` in the data dir so
+# an image is only decoded at full size once. Used from worker threads.
+_memory: OrderedDict[str, PILImage.Image] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    return envConfig.OTERM_DATA_DIR / "thumbnails"
+
+
+def _remember(hash: str, thumbnail: PILImage.Image) -> None:
+    with _lock:
+        _memory[hash] = thumbnail
+        _memory.move_to_end(hash)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def cached_thumbnail(hash: str) -> PILImage.Image | None:
+    """The thumbnail of the image ``hash`` if cached, in memory or on disk."""
+    with _lock:
+        thumbnail = _memory.get(hash)
+        if thumbnail is not None:
+            _memory.move_to_end(hash)
+            return thumbnail
+    path = _cache_dir() / f"{hash}.png"
+    try:
+        with PILImage.open(path) as image:
+            image.load()
+            thumbnail = image
+    except FileNotFoundError:
+        return None
+    except (OSError, UnidentifiedImageError) as e:
+        log.warning(f"Ignoring unreadable thumbnail {path.name}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+    _remember(hash, thumbnail)
+    return thumbnail
+
+
+def make_thumbnail(hash: str, data: bytes) -> PILImage.Image | None:
+    """Downscale the image ``data`` (whose hash is ``hash``) and cache it.
+
+    Returns ``None`` if ``data`` isn't an image PIL can read.
+    """
+    try:
+        with PILImage.open(BytesIO(data)) as image:
+            # See `prepare_image`.
+            image.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            image.load()
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            thumbnail = image if image.mode in MODES["png"] else image.convert("RGBA")
+    except (OSError, UnidentifiedImageError, PILImage.DecompressionBombError) as e:
+        log.warning(f"Could not read image {hash[:12]}: {e}")
+        return None
+    _remember(hash, thumbnail)
+    path = _cache_dir() / f"{hash}.png"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so readers never see a partial file.
+        partial = path.with_suffix(".part")
+        thumbnail.save(partial, format="PNG")
+        partial.replace(path)
+    except OSError as e:
+        log.warning(f"Failed to save thumbnail: {e}")
+    return thumbnail
+
+
+def cached_thumbnails(hashes: list[str]) -> dict[str, PILImage.Image]:
+    """The cached thumbnails of the images among ``hashes``."""
+    thumbnails = {hash: cached_thumbnail(hash) for hash in dict.fromkeys(hashes)}
+    return {hash: t for hash, t in thumbnails.items() if t is not None}
+
+
+def make_thumbnails(images: dict[str, bytes]) -> dict[str, PILImage.Image]:
+    """Thumbnails of ``images`` (bytes by hash), cached or made and cached.
+
+    Images PIL can't read are left out.
+    """
+    thumbnails = {
+        hash: cached_thumbnail(hash) or make_thumbnail(hash, data)
+        for hash, data in images.items()
+    }
+    return {hash: t for hash, t in thumbnails.items() if t is not None}
+
+
+def discard_thumbnails(hashes: list[str]) -> None:
+    """Forget the thumbnails of the images ``hashes``."""
+    with _lock:
+        for hash in hashes:
+            _memory.pop(hash, None)
+    for hash in hashes:
+        try:
+            (_cache_dir() / f"{hash}.png").unlink(missing_ok=True)
+        except OSError as e:  # pragma: no cover
+            log.warning(f"Failed to remove thumbnail: {e}")
@@ -1,9 +1,22 @@
-import contextlib
+import asyncio
+import hashlib
+import json
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
 
+import mcp.types as mcp_types
+from fastmcp.client.messages import MessageHandlerT
 from fastmcp.client.transports import StdioTransport
+from pydantic import ValidationError
+from pydantic_ai import RunContext
 from pydantic_ai.mcp import MCPToolset
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import AbstractToolset, ToolsetTool
 
-from oterm.config import appConfig
+from oterm.config import appConfig, envConfig
 from oterm.log import log
 from oterm.tools.mcp.logging import log_handler
 from oterm.utils import expand_env_vars
@@ -16,14 +29,219 @@ _STDIO_LOG_ENV = {
     "FASTMCP_LOG_LEVEL": "ERROR",
 }
 
+# Config keys oterm reads itself; they don't affect what a server offers.
+_OTERM_KEYS = ("lazy", "idleTimeout", "startupTimeout")
+
 
 class ToolMeta(dict):
     """Typed shape stored in `mcp_tool_meta`: {name, description}."""
 
 
-mcp_servers: dict[str, MCPToolset] = {}
+# Seconds `setup_mcp_servers` waits for a server before carrying on without
+# it. Override per server with a `startupTimeout` entry.
+MCP_STARTUP_TIMEOUT = 10.0
+# Seconds a lazy server may sit unused before it is stopped. Override per
+# server with an `idleTimeout` entry.
+MCP_IDLE_TIMEOUT = 300.0
+
+
+@dataclass
+class _Server:
+    """A configured server and the task that keeps its toolset entered."""
+
+    name: str
+    toolset: MCPToolset
+    fingerprint: str
+    # Lazy servers are stopped after `idle` seconds without a tool call.
+    idle: float | None = None
+    # Registered in place of `toolset` when the server's tools are offered
+    # before it runs: lazy servers, and servers served from the snapshot.
+    proxy: "LazyMCPToolset | None" = None
+    task: asyncio.Task[None] | None = None
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    users: int = 0
+    last_used: float = 0.0
+    stopping: bool = False
+
+
+mcp_servers: dict[str, AbstractToolset[Any]] = {}
 mcp_tool_meta: dict[str, list[ToolMeta]] = {}
-_exit_stack: contextlib.AsyncExitStack | None = None
+# Each server's task keeps its toolset entered until `_stop` is set (or, for
+# lazy servers, until it has been idle), so the toolset is entered and exited
+# from the same task.
+_servers: dict[str, _Server] = {}
+_stop: asyncio.Event | None = None
+# Servers still starting when `setup_mcp_servers` stopped waiting on them.
+_late: set[str] = set()
+# Tool list refreshes triggered by `notifications/tools/list_changed`.
+_refreshes: set[asyncio.Task[None]] = set()
+# The snapshot is written from worker threads, one per server coming up.
+_snapshot_lock = threading.Lock()
+
+
+class LazyMCPToolset(AbstractToolset[Any]):
+    """Offers a server's tools before it runs and starts it on the first call.
+
+    Until the server is running, tool definitions come from the snapshot
+    saved the last time it was. Entering the toolset (as every agent run does)
+    does not start the server; calling one of its tools starts it, or waits
+    for it if it is already starting.
+    """
+
+    def __init__(self, name: str, tools: list[mcp_types.Tool]):
+        self.name = name
+        self.tools = tools
+
+    @property
+    def id(self) -> str | None:
+        return self.name
+
+    @property
+    def label(self) -> str:
+        return f"MCP server {self.name!r}"
+
+    async def __aenter__(self) -> "LazyMCPToolset":
+        return self
+
+    async def __aexit__(self, *args: Any) -> bool | None:
+        return None
+
+    def _server(self) -> _Server:
+        server = _servers.get(self.name)
+        if server is None:
+            raise RuntimeError(f"MCP server {self.name!r} has been shut down")
+        return server
+
+    async def get_tools(self, ctx: RunContext[Any]) -> dict[str, ToolsetTool[Any]]:
+        toolset = self._server().toolset
+        if toolset.is_running:
+            tools = await toolset.get_tools(ctx)
+        else:
+            max_retries = (
+                toolset.max_retries
+                if toolset.max_retries is not None
+                else ctx.max_retries
+            )
+            tools = {
+                t.name: replace(
+                    toolset.tool_for_tool_def(_tool_def(toolset, t)),
+                    max_retries=max_retries,
+                )
+                for t in self.tools
+            }
+        return {name: replace(tool, toolset=self) for name, tool in tools.items()}
+
+    async def call_tool(
+        self,
+        name: str,
+        tool_args: dict[str, Any],
+        ctx: RunContext[Any],
+        tool: ToolsetTool[Any],
+    ) -> Any:
+        server = self._server()
+        await _acquire(server)
+        try:
+            return await server.toolset.call_tool(
+                name, tool_args, ctx, replace(tool, toolset=server.toolset)
+            )
+        finally:
+            _release(server)
+
+
+def _tool_def(toolset: MCPToolset, tool: mcp_types.Tool) -> ToolDefinition:
+    """The definition ``toolset.get_tools`` would give ``tool``."""
+    return ToolDefinition(
+        name=tool.name,
+        description=tool.description,
+        parameters_json_schema=tool.inputSchema,
+        metadata={
+            "meta": tool.meta,
+            "annotations": tool.annotations.model_dump() if tool.annotations else None,
+        },
+        return_schema=tool.outputSchema or None,
+        include_return_schema=toolset.include_return_schema,
+    )
+
+
+def _snapshot_path() -> Path:
+    return envConfig.OTERM_DATA_DIR / "mcp_tools.json"
+
+
+def _fingerprint(entry: dict) -> str:
+    """Identify a server's config without writing its secrets to disk.
+
+    ``entry`` is the config as written, before `${VAR}` references are
+    expanded, so values taken from the environment never reach the hash.
+    """
+    relevant = {k: v for k, v in entry.items() if k not in _OTERM_KEYS}
+    return hashlib.sha256(
+        json.dumps(relevant, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _load_snapshot() -> dict[str, Any]:
+    try:
+        saved = json.loads(_snapshot_path().read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring unreadable MCP tool snapshot: {e}")
+        return {}
+    return saved if isinstance(saved, dict) else {}
+
+
+def _snapshot_tools(
+    snapshot: dict[str, Any], name: str, fingerprint: str
+) -> list[mcp_types.Tool] | None:
+    """The tools ``name`` listed when it last ran with this config, if known."""
+    entry = snapshot.get(name)
+    if not isinstance(entry, dict) or entry.get("config") != fingerprint:
+        return None
+    try:
+        return [mcp_types.Tool.model_validate(t) for t in entry["tools"]]
+    except (KeyError, TypeError, ValidationError):
+        return None
+
+
+def _save_snapshot(name: str, fingerprint: str, tools: list[mcp_types.Tool]) -> None:
+    """Record ``tools`` as ``name``'s in the snapshot. Blocks on file I/O."""
+    with _snapshot_lock:
+        saved = _load_snapshot()
+        saved[name] = {
+            "config": fingerprint,
+            "tools": [
+                t.model_dump(mode="json", by_alias=True, exclude_none=True)
+                for t in tools
+            ],
+        }
+        try:
+            path = _snapshot_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(saved))
+        except OSError as e:
+            log.warning(f"Failed to save MCP tool snapshot: {e}")
+
+
+def _tools_changed_handler(name: str) -> MessageHandlerT:
+    """Refresh ``name``'s tools when it reports that they have changed.
+
+    The refresh runs in its own task: listing tools from inside the handler
+    would wait on the very session that is delivering the notification.
+    """
+
+    async def handler(message: Any) -> None:
+        if not isinstance(message, mcp_types.ServerNotification):
+            return
+        if not isinstance(message.root, mcp_types.ToolListChangedNotification):
+            return
+        server = _servers.get(name)
+        if server is None:  # pragma: no cover
+            return
+        task = asyncio.create_task(_refresh(server))
+        _refreshes.add(task)
+        task.add_done_callback(_refreshes.discard)
+
+    return handler
 
 
 def _build_toolset(name: str, entry: dict) -> MCPToolset:
@@ -45,6 +263,7 @@ def _build_toolset(name: str, entry: dict) -> MCPToolset:
             id=name,
             headers=entry.get("headers"),
             log_handler=log_handler,
+            message_handler=_tools_changed_handler(name),
         )
     transport = StdioTransport(
         command=entry["command"],
@@ -52,7 +271,12 @@ def _build_toolset(name: str, entry: dict) -> MCPToolset:
         env={**_STDIO_LOG_ENV, **(entry.get("env") or {})},
         cwd=entry.get("cwd"),
     )
-    return MCPToolset(transport, id=name, log_handler=log_handler)
+    return MCPToolset(
+        transport,
+        id=name,
+        log_handler=log_handler,
+        message_handler=_tools_changed_handler(name),
+    )
 
 
 def _build_toolsets(raw: dict[str, dict]) -> dict[str, MCPToolset]:
@@ -67,18 +291,157 @@ def _build_toolsets(raw: dict[str, dict]) -> dict[str, MCPToolset]:
     return {name: _build_toolset(name, entry) for name, entry in expanded.items()}
 
 
-async def setup_mcp_servers() -> dict[str, list[ToolMeta]]:
-    """Build, enter, and probe each configured MCP server.
+async def _register(server: _Server, tools: list[mcp_types.Tool]) -> None:
+    """Offer ``tools`` as ``server``'s and save them to the snapshot."""
+    if server.proxy is not None:
+        server.proxy.tools = tools
+    mcp_servers[server.name] = server.proxy or server.toolset
+    mcp_tool_meta[server.name] = [
+        ToolMeta(name=t.name, description=t.description or "") for t in tools
+    ]
+    await asyncio.to_thread(_save_snapshot, server.name, server.fingerprint, tools)
+
+
+async def _refresh(server: _Server) -> None:
+    if not server.toolset.is_running:  # pragma: no cover
+        return
+    try:
+        tools = await server.toolset.list_tools()
+    except Exception as e:
+        log.warning(f"Failed to refresh MCP server {server.name!r} tools: {e}")
+        return
+    await _register(server, tools)
+    log.info(f"MCP server {server.name} now has {len(tools)} tool(s)")
+
+
+async def _serve(
+    server: _Server,
+    stop: asyncio.Event,
+    on_ready: Callable[[str], None] | None,
+) -> None:
+    """Enter the server's toolset, register its tools and keep it open.
+
+    Eager servers stay open until ``stop``; lazy ones also close once idle.
+    """
+    name = server.name
+    started = False
+    try:
+        async with server.toolset:
+            tools = await server.toolset.list_tools()
+            await _register(server, tools)
+            started = True
+            log.info(f"Loaded MCP server {name} with {len(tools)} tool(s)")
+            server.ready.set()
+            if name in _late and on_ready is not None:
+                _late.discard(name)
+                on_ready(name)
+            if server.idle is None:
+                await stop.wait()
+            else:
+                await _wait_idle(server, stop)
+    except Exception as e:
+        if started:
+            log.error(f"MCP server {name!r} failed to shut down: {e}")
+        else:
+            log.error(f"MCP server {name!r} failed to initialize: {e}")
+    finally:
+        # Tools offered through a proxy stay offered: calling one retries the
+        # server, and a failed start or refresh keeps the list known so far.
+        if server.proxy is None:
+            mcp_servers.pop(name, None)
+            mcp_tool_meta.pop(name, None)
+        server.ready.set()
+
+
+async def _wait_idle(server: _Server, stop: asyncio.Event) -> None:
+    """Return once ``stop`` is set or ``server`` has been unused for its idle time."""
+    assert server.idle is not None
+    loop = asyncio.get_running_loop()
+    server.last_used = loop.time()
+    while not stop.is_set():
+        remaining = server.last_used + server.idle - loop.time()
+        if server.users == 0 and remaining <= 0:
+            log.info(f"Stopping idle MCP server {server.name}")
+            server.stopping = True
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), max(remaining, 0) or server.idle)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _start(server: _Server, on_ready: Callable[[str], None] | None = None) -> None:
+    assert _stop is not None
+    server.ready = asyncio.Event()
+    server.stopping = False
+    server.task = asyncio.create_task(_serve(server, _stop, on_ready))
+
+
+async def _acquire(server: _Server) -> None:
+    """Make sure ``server`` is running, starting it if need be."""
+    server.users += 1
+    if server.stopping and server.task is not None:
+        await asyncio.gather(server.task, return_exceptions=True)
+    if server.task is None or server.task.done():
+        if _stop is None or _stop.is_set():
+            server.users -= 1
+            raise RuntimeError(f"MCP server {server.name!r} has been shut down")
+        log.info(f"Starting MCP server {server.name} on first use")
+        _start(server)
+    await server.ready.wait()
+    if not server.toolset.is_running:
+        server.users -= 1
+        raise RuntimeError(f"MCP server {server.name!r} could not be started")
+
+
+def _release(server: _Server) -> None:
+    server.users -= 1
+    server.last_used = asyncio.get_running_loop().time()
+
+
+async def _wait_ready(name: str, ready: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(ready.wait(), timeout)
+    except asyncio.TimeoutError:
+        if ready.is_set():  # pragma: no cover
+            return
+        _late.add(name)
+        log.warning(
+            f"MCP server {name!r} did not start within {timeout}s; "
+            "its tools will be added once it is ready"
+        )
+
+
+async def setup_mcp_servers(
+    on_ready: Callable[[str], None] | None = None,
+) -> dict[str, list[ToolMeta]]:
+    """Build and start every configured MCP server concurrently.
+
+    Waits for each server up to its `startupTimeout` (default
+    `MCP_STARTUP_TIMEOUT`) seconds; failed servers are logged and skipped.
+    Servers still starting after that keep starting in the background, and
+    are registered, then reported to ``on_ready`` with their name, once they
+    are up.
+
+    Servers whose tools are known from an earlier run with the same config
+    are not waited for: a `LazyMCPToolset` offers the saved tools right away
+    while the server starts in the background, and the saved list is
+    refreshed once it is up and whenever it reports a change. Servers
+    configured with `lazy` are not started at all until one of their tools
+    is called, and are stopped again after `idleTimeout` (default
+    `MCP_IDLE_TIMEOUT`) seconds without a call.
 
     Returns a registry of tool metadata per server name. The toolset instances
-    themselves are stored in module-global `mcp_servers` and kept entered for
-    the app lifetime via `_exit_stack`.
+    themselves are stored in module-global `mcp_servers` and kept entered
+    until `teardown_mcp_servers`.
     """
-    global _exit_stack
+    global _stop
     configured = appConfig.get("mcpServers") or {}
     mcp_servers.clear()
     mcp_tool_meta.clear()
-    _exit_stack = contextlib.AsyncExitStack()
+    _servers.clear()
+    _late.clear()
+    _stop = asyncio.Event()
 
     try:
         built = _build_toolsets(configured)
@@ -88,40 +451,52 @@ async def setup_mcp_servers() -> dict[str, list[ToolMeta]]:
     except Exception as e:
         log.error(f"MCP config could not be parsed: {e}")
         return mcp_tool_meta
+    snapshot = await asyncio.to_thread(_load_snapshot) if built else {}
 
+    waits = []
     for name, toolset in built.items():
-        try:
-            await _exit_stack.enter_async_context(toolset)
-            tools = await toolset.list_tools()
-        except Exception as e:
-            log.error(f"MCP server {name!r} failed to initialize: {e}")
+        entry = configured[name]
+        server = _servers[name] = _Server(name, toolset, _fingerprint(entry))
+        lazy = bool(entry.get("lazy"))
+        if lazy:
+            server.idle = entry.get("idleTimeout", MCP_IDLE_TIMEOUT)
+            server.proxy = LazyMCPToolset(name, [])
+        tools = _snapshot_tools(snapshot, name, server.fingerprint)
+        if tools is not None:
+            server.proxy = LazyMCPToolset(name, tools)
+            mcp_servers[name] = server.proxy
+            mcp_tool_meta[name] = [
+                ToolMeta(name=t.name, description=t.description or "") for t in tools
+            ]
+            if not lazy:
+                _start(server, on_ready)
             continue
-        mcp_servers[name] = toolset
-        mcp_tool_meta[name] = [
-            ToolMeta(name=t.name, description=t.description or "") for t in tools
-        ]
-        log.info(f"Loaded MCP server {name} with {len(tools)} tool(s)")
+        _start(server, on_ready)
+        timeout = entry.get("startupTimeout", MCP_STARTUP_TIMEOUT)
+        waits.append(_wait_ready(name, server.ready, timeout))
+    await asyncio.gather(*waits)
 
     return mcp_tool_meta
 
 
 async def teardown_mcp_servers() -> None:
-    global _exit_stack
-    if _exit_stack is None:  # pragma: no cover
+    global _stop
+    if _stop is None:  # pragma: no cover
         return
     log.info("Tearing down MCP servers")
+    _stop.set()
+    for refresh in _refreshes:
+        refresh.cancel()
+    tasks = [server.task for server in _servers.values() if server.task is not None]
+    # Servers that never came up are abandoned rather than waited for.
+    for server in _servers.values():
+        if server.task is not None and not server.ready.is_set():
+            server.task.cancel()
     try:
-        await _exit_stack.aclose()
+        await asyncio.gather(*tasks, return_exceptions=True)
     finally:
-        _exit_stack = None
+        _servers.clear()
+        _late.clear()
+        _stop = None
         mcp_servers.clear()
         mcp_tool_meta.clear()
-
-
-__all__ = [
-    "ToolMeta",
-    "mcp_servers",
-    "mcp_tool_meta",
-    "setup_mcp_servers",
-    "teardown_mcp_servers",
-]
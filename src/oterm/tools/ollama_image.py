@@ -6,6 +6,7 @@ from pydantic_ai.messages import BinaryImage
 
 from oterm.config import envConfig
 from oterm.log import log
+from oterm.providers.http import shared_client
 from oterm.providers.ollama import ollama_client_host
 
 
@@ -19,7 +20,10 @@ async def generate_image(prompt: str, model: str | None = None) -> BinaryImage:
         model: Optional Ollama image model name. Defaults to OTERM_OLLAMA_IMAGE_MODEL.
     """
     chosen = model or envConfig.OTERM_OLLAMA_IMAGE_MODEL
-    client = AsyncClient(host=ollama_client_host(), verify=envConfig.OTERM_VERIFY_SSL)
+    host = ollama_client_host()
+    client = shared_client(
+        "ollama-async", host, lambda verify: AsyncClient(host=host, verify=verify)
+    )
     try:
         response = await client.generate(model=chosen, prompt=prompt)
     except ResponseError as exc:
@@ -30,4 +30,30 @@ class MessageModel(BaseModel):
     chat_id: int
     role: Literal["user", "assistant"]
     text: str
+    # SHA-256 hashes of the images, whose bytes live in the store's image table.
     images: list[str] = Field(default_factory=list)
+    # For assistant messages, the pydantic-ai messages of the turn after the
+    # user's prompt (tool calls and returns included), encoded by
+    # `oterm.store.store.dump_turn`. None for messages saved without it.
+    history: bytes | None = None
+
+
+class SearchResultModel(BaseModel):
+    """A message matching a full-text search"""
+
+    chat_id: int
+    chat_name: str
+    message_id: int
+    role: Literal["user", "assistant"]
+    # Excerpt of the message with the matched terms wrapped in
+    # `SEARCH_MATCH_START`/`SEARCH_MATCH_END` (see `oterm.store.store`).
+    snippet: str
+
+
+class SummaryModel(BaseModel):
+    """Rolling summary standing in for a chat's earliest turns"""
+
+    chat_id: int
+    # Number of leading turns (user prompts and their responses) it covers.
+    turns: int
+    text: str
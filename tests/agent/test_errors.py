@@ -63,6 +63,56 @@ class TestResolveTools:
         assert predicate(None, SimpleNamespace(name="ask_oracle")) is True
         assert predicate(None, SimpleNamespace(name="other")) is False
 
+    def test_same_selection_reuses_filtered_toolset(self, monkeypatch):
+        class _FakeServer:
+            def filtered(self, predicate):
+                return object()
+
+        monkeypatch.setattr("oterm.app.widgets.chat.builtin_tools", [])
+        monkeypatch.setattr(
+            "oterm.app.widgets.chat.mcp_tool_meta",
+            {"oracle": [{"name": "ask_oracle", "description": ""}]},
+        )
+        monkeypatch.setattr(
+            "oterm.app.widgets.chat.mcp_servers", {"oracle": _FakeServer()}
+        )
+        _, first = _resolve_tools(["ask_oracle"])
+        _, second = _resolve_tools(["ask_oracle", "ghost"])
+        assert first == second
+
+        # A reconnected server gets a fresh filtered toolset.
+        monkeypatch.setattr(
+            "oterm.app.widgets.chat.mcp_servers", {"oracle": _FakeServer()}
+        )
+        _, third = _resolve_tools(["ask_oracle"])
+        assert third[0] is not first[0]
+
+    def test_least_recently_used_filtered_toolset_is_evicted(self, monkeypatch):
+        import oterm.app.widgets.chat as chat_mod
+
+        class _FakeServer:
+            def filtered(self, predicate):
+                return object()
+
+        monkeypatch.setattr(chat_mod, "AGENT_CACHE_SIZE", 2)
+        monkeypatch.setattr(
+            chat_mod, "_filtered_toolsets", type(chat_mod._filtered_toolsets)()
+        )
+        monkeypatch.setattr(chat_mod, "builtin_tools", [])
+        monkeypatch.setattr(
+            chat_mod,
+            "mcp_tool_meta",
+            {"oracle": [{"name": name, "description": ""} for name in "abc"]},
+        )
+        monkeypatch.setattr(chat_mod, "mcp_servers", {"oracle": _FakeServer()})
+        _, a = _resolve_tools(["a"])
+        _, b = _resolve_tools(["b"])
+        assert _resolve_tools(["a"])[1] == a
+        _resolve_tools(["c"])
+        assert _resolve_tools(["a"])[1] == a
+        assert _resolve_tools(["b"])[1] != b
+        assert len(chat_mod._filtered_toolsets) == 2
+
 
 class TestRebuildAgent:
     def test_success_populates_agent(self):
@@ -156,6 +156,48 @@ class TestRegenerateHappyPath:
             )
             assert container.messages[-1].text == "redo answer"
 
+    async def test_deltas_stream_without_full_rerender(
+        self, store, chat_model, monkeypatch
+    ):
+        from textual.widgets import Markdown
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        user_msg = MessageModel(chat_id=chat_id, role="user", text="ask")
+        user_msg.id = await store.save_message(user_msg)
+        old_assistant = MessageModel(chat_id=chat_id, role="assistant", text="old")
+        old_assistant.id = await store.save_message(old_assistant)
+        words = [f"word{i} " for i in range(20)]
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str | dict[int, DeltaThinkingPart]]:
+            yield {0: DeltaThinkingPart(content="hmm ")}
+            yield {0: DeltaThinkingPart(content="ok")}
+            for word in words:
+                yield word
+
+        app = _Host(chat_model, [user_msg, old_assistant])
+        async with app.run_test():
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+            updates: list[str] = []
+            original = Markdown.update
+
+            def _track(self, markdown):
+                updates.append(markdown)
+                return original(self, markdown)
+
+            monkeypatch.setattr(Markdown, "update", _track)
+            await container.action_regenerate_llm_message()
+            await container.inference_task
+
+            full = "".join(words)
+            assert container.messages[-1].text == full
+            # Only finish_stream re-renders, once per widget, with the full text.
+            assert sorted(u for u in updates if u) == sorted([full, "hmm ok"])
+
 
 class TestRegenerateErrorRestore:
     async def test_exception_restores_state_and_notifies(self, store, chat_model):
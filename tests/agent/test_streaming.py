@@ -1,6 +1,9 @@
+import asyncio
 import base64
+import time
 from collections.abc import AsyncIterator
 
+import pytest
 from pydantic_ai import Agent, Tool
 from pydantic_ai.messages import (
     BinaryImage,
@@ -17,7 +20,7 @@ from pydantic_ai.models.function import (
     FunctionModel,
 )
 
-from oterm.app.widgets.chat import ChatContainer
+from oterm.app.widgets.chat import ChatContainer, coalesce
 from oterm.types import ChatModel
 from tests._stream_helpers import make_file_aware_agent
 
@@ -255,3 +258,75 @@ class TestImagePrompt:
         chunks = await _collect(c.stream_agent(user_prompt))
         text = "".join(p.content_delta for p in chunks if isinstance(p, TextPartDelta))
         assert text == "see this"
+
+
+class TestCoalesce:
+    async def test_deltas_arriving_together_are_merged(self):
+        async def pieces():
+            yield TextPartDelta(content_delta="a")
+            yield TextPartDelta(content_delta="b")
+            yield ThinkingPartDelta(content_delta="t")
+            yield ThinkingPartDelta(content_delta=None)
+            yield ThinkingPartDelta(content_delta="u")
+            yield TextPartDelta(content_delta="c")
+
+        # The producer never yields to the loop, so it is drained before the
+        # first batch is cut.
+        batches = await _collect(coalesce(pieces(), 0.05))
+        assert batches == [
+            [
+                TextPartDelta(content_delta="ab"),
+                ThinkingPartDelta(content_delta="tu"),
+                TextPartDelta(content_delta="c"),
+            ]
+        ]
+
+    async def test_non_delta_pieces_are_kept_in_order(self):
+        call = ToolCallPart(tool_name="t", args={}, tool_call_id="1")
+
+        async def pieces():
+            yield TextPartDelta(content_delta="a")
+            yield TextPartDelta(content_delta="b")
+            yield call
+            yield TextPartDelta(content_delta="c")
+
+        batches = await _collect(coalesce(pieces(), 0.05))
+        assert batches == [
+            [TextPartDelta(content_delta="ab"), call, TextPartDelta(content_delta="c")]
+        ]
+
+    async def test_flushes_at_most_once_per_interval(self):
+        async def pieces():
+            for _ in range(20):
+                await asyncio.sleep(0.005)
+                yield TextPartDelta(content_delta="x")
+
+        flushed: list[float] = []
+        text = ""
+        async for batch in coalesce(pieces(), 0.05):
+            flushed.append(time.monotonic())
+            text += "".join(p.content_delta for p in batch)
+        assert text == "x" * 20
+        assert len(flushed) < 20
+        gaps = [b - a for a, b in zip(flushed, flushed[1:], strict=False)]
+        assert all(gap >= 0.04 for gap in gaps)
+
+    async def test_error_is_raised_after_preceding_pieces(self):
+        async def pieces():
+            yield TextPartDelta(content_delta="a")
+            raise RuntimeError("boom")
+
+        seen: list = []
+        with pytest.raises(RuntimeError, match="boom"):
+            async for batch in coalesce(pieces(), 0):
+                seen.extend(batch)
+        assert seen == [TextPartDelta(content_delta="a")]
+
+    async def test_cancellation_is_raised_to_the_consumer(self):
+        async def pieces():
+            yield TextPartDelta(content_delta="a")
+            raise asyncio.CancelledError()
+
+        with pytest.raises(asyncio.CancelledError):
+            async for _ in coalesce(pieces(), 0):
+                pass
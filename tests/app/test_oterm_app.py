@@ -2,6 +2,7 @@ import pytest
 from textual.widgets import TabbedContent, TabPane
 
 from oterm.types import ChatModel, MessageModel
+from tests._helpers import wait_until
 
 
 @pytest.fixture(autouse=True)
@@ -18,7 +19,7 @@ def stub_network(monkeypatch):
         v = parse(metadata.version("oterm"))
         return True, v, v
 
-    async def _no_mcp():
+    async def _no_mcp(on_ready=None):
         return {}
 
     monkeypatch.setattr(utils_mod, "is_up_to_date", _up_to_date)
@@ -30,6 +31,12 @@ def stub_network(monkeypatch):
 
     monkeypatch.setattr(oterm_mod, "teardown_mcp_servers", _no_teardown)
 
+    async def _no_refresh():
+        return None
+
+    monkeypatch.setattr(oterm_mod, "refresh_ollama_models", _no_refresh)
+    monkeypatch.setattr(oterm_mod, "prefetch_models", _no_refresh)
+
 
 @pytest.fixture
 def fresh_app(tmp_data_dir, app_config, stub_network, monkeypatch):
@@ -86,6 +93,45 @@ class TestStartup:
             assert app.query_one(EmptyState).display is False
             assert tabs.display is True
 
+    async def test_messages_load_when_tab_is_first_activated(
+        self, tmp_data_dir, app_config, stub_network, store
+    ):
+        app_config.set("splash-screen", False)
+        ids = []
+        for name in ("first", "middle", "last"):
+            cm = ChatModel(name=name, model="m")
+            cm.id = await store.save_chat(cm)
+            ids.append(cm.id)
+            await store.save_message(
+                MessageModel(chat_id=cm.id, role="user", text=f"{name} q")
+            )
+            await store.save_message(
+                MessageModel(chat_id=cm.id, role="assistant", text=f"{name} a")
+            )
+
+        from oterm.app.oterm import OTerm
+        from oterm.app.widgets.chat import ChatContainer, ChatItem
+        from tests._helpers import wait_until
+
+        app = OTerm()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            tabs = app.query_one(TabbedContent)
+            middle = app.query_one(f"#chat-{ids[1]}").query_one(ChatContainer)
+            await wait_until(pilot, lambda: tabs.active == f"chat-{ids[2]}")
+
+            # A tab that was never activated is built from metadata only.
+            assert middle.messages == []
+            assert middle.pydantic_history == []
+            assert list(middle.query(ChatItem)) == []
+
+            tabs.active = f"chat-{ids[1]}"
+            await wait_until(pilot, lambda: len(middle.query(ChatItem)) == 2)
+            texts = [item.text for item in middle.query(ChatItem)]
+            assert texts == ["middle q", "middle a"]
+            # Its full history is only read once a message is sent.
+            assert middle.pydantic_history == []
+
 
 class TestCycleChat:
     async def test_cycle_forward_and_back(
@@ -246,7 +292,7 @@ class TestLoadTools:
         def fake_discover():
             return [make_tool_def(fake_tool)]
 
-        async def fake_mcp_setup():
+        async def fake_mcp_setup(on_ready=None):
             called.append(("mcp",))
             return {}
 
@@ -267,6 +313,43 @@ class TestLoadTools:
             tools_mod.discover_tools = original_discover
             tools_mod.builtin_tools = original_builtins
 
+    async def test_late_mcp_server_rebuilds_the_chats_using_it(
+        self, tmp_data_dir, app_config, stub_network, store, monkeypatch
+    ):
+        import oterm.app.oterm as oterm_mod
+        from oterm.app.oterm import OTerm
+        from oterm.app.widgets.chat import ChatContainer
+
+        app_config.set("splash-screen", False)
+        using = ChatModel(name="using", model="m", tools=["late_tool"])
+        using.id = await store.save_chat(using)
+        other = ChatModel(name="other", model="m", tools=["other_tool"])
+        other.id = await store.save_chat(other)
+
+        app = OTerm()
+        async with app.run_test() as pilot:
+            await wait_until(pilot, lambda: len(app.query(ChatContainer)) == 2)
+            # The server's tools are registered once it comes up.
+            monkeypatch.setitem(
+                oterm_mod.mcp_tool_meta,
+                "srv",
+                [{"name": "late_tool", "description": ""}],
+            )
+            rebuilt: list[str] = []
+            monkeypatch.setattr(
+                ChatContainer,
+                "rebuild_agent",
+                lambda self: rebuilt.append(self.chat_model.name),
+            )
+            notified: list[str] = []
+            monkeypatch.setattr(
+                app, "notify", lambda message, **kw: notified.append(message)
+            )
+
+            app.on_mcp_server_ready("srv")
+            assert rebuilt == ["using"]
+            assert notified == ["MCP server srv is ready."]
+
 
 class TestNewChat:
     async def test_new_chat_from_modal_creates_tab(
@@ -285,6 +368,11 @@ class TestNewChat:
             return chat_json
 
         monkeypatch.setattr(OTerm, "push_screen_wait", fake_push_screen_wait)
+        from oterm.providers import ollama as ollama_mod
+
+        monkeypatch.setattr(
+            ollama_mod, "show_model", lambda model: {"parameters": "num_ctx 8192"}
+        )
 
         app = OTerm()
         async with app.run_test() as pilot:
@@ -300,6 +388,11 @@ class TestNewChat:
             assert app.query_one(TabbedContent).tab_count == initial + 1
             chats = await store.get_chats()
             assert any(c.model == "llama3" for c in chats)
+            # Built with the capabilities fetched for the new chat's model.
+            from oterm.app.widgets.chat import ChatContainer
+
+            container = app.query_one(ChatContainer)
+            assert container.context_window.window == 8192
 
             from oterm.app.widgets.empty_state import EmptyState
 
@@ -338,6 +431,24 @@ class TestQuit:
                     break
             assert not app.is_running
 
+        from oterm.store.store import Store
+
+        assert Store._store is None
+
+    async def test_exiting_any_other_way_closes_the_store(self, fresh_app):
+        from oterm.store.store import Store
+
+        app = fresh_app
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            store = await Store.get_store()
+            app.exit()
+            await pilot.pause()
+
+        assert Store._store is None
+        with pytest.raises(ValueError):
+            await store.connection.execute("SELECT 1;")
+
 
 class TestActionDelegates:
     """OTerm.action_* methods that just forward to ChatContainer.action_*."""
@@ -406,7 +517,7 @@ class TestActionDelegates:
 
             called: list[bool] = []
 
-            def spy(self):
+            async def spy(self):
                 called.append(True)
 
             monkeypatch.setattr(ChatContainer, "action_toggle_thinking", spy)
@@ -482,6 +593,108 @@ class TestActionDelegates:
             await pilot.pause()
             assert called == [True]
 
+    async def test_search_jumps_to_the_chosen_message(
+        self, tmp_data_dir, app_config, stub_network, store, monkeypatch
+    ):
+        from oterm.app.chat_search import ChatSearch
+        from oterm.app.oterm import OTerm
+        from oterm.app.widgets.chat import ChatContainer, ChatItem, MessageList
+
+        app_config.set("splash-screen", False)
+        first = ChatModel(name="first", model="m")
+        first.id = await store.save_chat(first)
+        second = ChatModel(name="second", model="m")
+        second.id = await store.save_chat(second)
+        ids = []
+        for i in range(60):
+            ids.append(
+                await store.save_message(
+                    MessageModel(
+                        chat_id=second.id,
+                        role="user" if i % 2 == 0 else "assistant",
+                        text=f"message {i}\n\nwith a few lines",
+                    )
+                )
+            )
+
+        async def pick(self, screen):
+            assert isinstance(screen, ChatSearch)
+            return second.id, ids[5]
+
+        monkeypatch.setattr(OTerm, "push_screen_wait", pick)
+
+        app = OTerm()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            tabs = app.query_one(TabbedContent)
+            tabs.active = f"chat-{first.id}"
+            await pilot.pause()
+
+            app.action_search_chats()
+            await wait_until(pilot, lambda: bool(app.query("ChatItem.-found")))
+            assert tabs.active == f"chat-{second.id}"
+            container = tabs.get_pane(f"chat-{second.id}").query_one(ChatContainer)
+            [found] = container.query("ChatItem.-found").results(ChatItem)
+            assert found.text.startswith("message 5\n")
+            await pilot.pause()
+            message_list = container.query_one(MessageList)
+            assert 0 < message_list.scroll_y < message_list.max_scroll_y
+            assert found.region.y == message_list.region.y
+
+    async def test_search_within_the_active_chat(
+        self, tmp_data_dir, app_config, stub_network, store, monkeypatch
+    ):
+        from oterm.app.oterm import OTerm
+        from oterm.app.widgets.chat import ChatContainer, ChatItem, MessageList
+
+        app_config.set("splash-screen", False)
+        chat = ChatModel(name="chat", model="m")
+        chat.id = await store.save_chat(chat)
+        ids = [
+            await store.save_message(
+                MessageModel(
+                    chat_id=chat.id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    text=f"message {i}\n\nwith a few lines",
+                )
+            )
+            for i in range(60)
+        ]
+        picked = [ids[5]]
+
+        async def pick(self, screen):
+            return chat.id, picked.pop()
+
+        monkeypatch.setattr(OTerm, "push_screen_wait", pick)
+
+        app = OTerm()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            container = app.query_one(ChatContainer)
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: container.loaded)
+
+            app.action_search_chats()
+            await wait_until(pilot, lambda: bool(app.query("ChatItem.-found")))
+            [found] = container.query("ChatItem.-found").results(ChatItem)
+            assert found.text.startswith("message 5\n")
+
+            # A message deleted since it was found lands at the end instead.
+            picked.append(max(ids) + 1)
+            app.action_search_chats()
+            await wait_until(
+                pilot, lambda: message_list.scroll_y == message_list.max_scroll_y
+            )
+            assert not picked
+
+    async def test_search_cancelled_leaves_tabs_alone(self, fresh_app):
+        app = fresh_app
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.action_search_chats()
+            await pilot.pause()
+            assert app.query_one(TabbedContent).tab_count == 0
+
 
 class TestNoneIdGuards:
     """Chats lacking a database id (e.g. from a failed save) are skipped."""
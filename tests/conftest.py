@@ -9,21 +9,58 @@ from PIL import Image
 setattr(pydantic_ai.models, "ALLOW_MODEL_REQUESTS", False)
 
 
+@pytest.fixture(autouse=True)
+def _fresh_caches(tmp_path, monkeypatch):
+    """Reset oterm's module-level caches and keep their files under tmp.
+
+    Agents, shared HTTP clients, Ollama capabilities, the model catalogue and
+    thumbnails are all cached across calls; the on-disk ones live in
+    ``OTERM_DATA_DIR``, pointed at ``tmp_path`` here.
+    """
+    from collections import OrderedDict
+
+    import oterm.config
+    import oterm.providers.capabilities as capabilities
+    import oterm.providers.catalogue as catalogue
+    import oterm.thumbnails as thumbnails
+    from oterm.agent import clear_agent_cache
+    from oterm.providers.http import clear_http_clients
+
+    monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
+    monkeypatch.setattr(capabilities, "_ollama_cache", None)
+    monkeypatch.setattr(capabilities, "_ollama_digests", {})
+    monkeypatch.setattr(capabilities, "_ollama_failures", {})
+    monkeypatch.setattr(catalogue, "_catalogue", None)
+    monkeypatch.setattr(catalogue, "_fetches", {})
+    monkeypatch.setattr(thumbnails, "_memory", OrderedDict())
+    clear_agent_cache()
+    clear_http_clients()
+    yield
+    clear_agent_cache()
+    clear_http_clients()
+
+
 @pytest.fixture
 def allow_model_requests():
     with pydantic_ai.models.override_allow_model_requests(True):
         yield
 
 
-@pytest.fixture
-def tmp_data_dir(tmp_path, monkeypatch) -> Path:
-    """Isolate OTERM_DATA_DIR per test and reset the Store singleton."""
+@pytest_asyncio.fixture
+async def tmp_data_dir(tmp_path, monkeypatch):
+    """Isolate OTERM_DATA_DIR per test and reset the Store singleton.
+
+    Closes whichever Store the test opened so its connection thread doesn't
+    outlive the test.
+    """
     import oterm.config
     import oterm.store.store
 
     monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
     monkeypatch.setattr(oterm.store.store.Store, "_store", None)
-    return tmp_path
+    yield tmp_path
+    if oterm.store.store.Store._store is not None:
+        await oterm.store.store.Store._store.close()
 
 
 @pytest.fixture
@@ -71,6 +108,27 @@ def test_model():
     return TestModel
 
 
+@pytest.fixture(scope="session")
+def make_image():
+    """Factory for the bytes of a plain image of ``size``, encoded as ``format``."""
+
+    def make(
+        size: tuple[int, int],
+        format: str = "PNG",
+        mode: str = "RGB",
+        exif: Image.Exif | None = None,
+    ) -> bytes:
+        buffered = BytesIO()
+        image = Image.new(mode, size, "red")
+        if exif is None:
+            image.save(buffered, format=format)
+        else:
+            image.save(buffered, format=format, exif=exif)
+        return buffered.getvalue()
+
+    return make
+
+
 @pytest.fixture(scope="session")
 def llama_image() -> bytes:
     buffered = BytesIO()
@@ -16,6 +16,7 @@ def stub_providers(monkeypatch):
 
     class _M:
         model = "llama3"
+        digest = "sha256:llama3"
 
         def __getitem__(self, key):
             return 1_000_000_000 if key == "size" else None
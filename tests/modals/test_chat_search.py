@@ -0,0 +1,112 @@
+import pytest
+from textual.app import App
+from textual.widgets import Input, OptionList
+
+import oterm.app.chat_search as chat_search_mod
+from oterm.app.chat_search import ChatSearch, _snippet
+from oterm.store.store import SEARCH_MATCH_END, SEARCH_MATCH_START
+from oterm.types import ChatModel, MessageModel, SearchResultModel
+from tests._helpers import wait_until
+
+
+class _Host(App):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def no_search_delay(monkeypatch):
+    monkeypatch.setattr(chat_search_mod, "SEARCH_DELAY", 0)
+
+
+@pytest.fixture
+async def chats(store):
+    ids = {}
+    for name, text in [
+        ("cooking", "knead the bread dough"),
+        ("travel", "bread in Paris"),
+    ]:
+        chat_id = await store.save_chat(ChatModel(name=name, model="m"))
+        message_id = await store.save_message(
+            MessageModel(chat_id=chat_id, role="user", text=text)
+        )
+        ids[name] = (chat_id, message_id)
+    return ids
+
+
+def test_snippet_highlights_matches():
+    result = SearchResultModel(
+        chat_id=1,
+        chat_name="cooking",
+        message_id=2,
+        role="assistant",
+        snippet=f"…the {SEARCH_MATCH_START}bread{SEARCH_MATCH_END}\n\nis {SEARCH_MATCH_START}good{SEARCH_MATCH_END}",
+    )
+    text = _snippet(result)
+    assert text.plain == "cooking  assistant\n…the bread is good"
+    highlighted = [
+        text.plain[s.start : s.end] for s in text.spans if s.style == "reverse"
+    ]
+    assert highlighted == ["bread", "good"]
+
+
+async def test_typing_lists_results_and_enter_picks_the_best(chats):
+    app = _Host()
+    async with app.run_test() as pilot:
+        received: list = []
+        screen = ChatSearch()
+        app.push_screen(screen, received.append)
+        await pilot.pause()
+
+        results = screen.query_one("#search-results", OptionList)
+        screen.query_one("#search-input", Input).value = "knead"
+        await wait_until(pilot, lambda: results.option_count == 1)
+        assert results.option_count == 1
+
+        screen.query_one("#search-input", Input).value = "bread"
+        await wait_until(pilot, lambda: results.option_count == 2)
+        assert results.option_count == 2
+
+        await pilot.press("enter")
+        await pilot.pause()
+        assert received == [(screen.results[0].chat_id, screen.results[0].message_id)]
+
+
+async def test_choosing_a_result_from_the_list(chats):
+    app = _Host()
+    async with app.run_test() as pilot:
+        received: list = []
+        screen = ChatSearch()
+        app.push_screen(screen, received.append)
+        await pilot.pause()
+
+        results = screen.query_one("#search-results", OptionList)
+        screen.query_one("#search-input", Input).value = "paris"
+        await wait_until(pilot, lambda: results.option_count == 1)
+
+        await pilot.press("down")
+        assert results.has_focus
+        await pilot.press("enter")
+        await pilot.pause()
+        assert received == [chats["travel"]]
+
+
+async def test_enter_without_results_does_nothing(store):
+    app = _Host()
+    async with app.run_test() as pilot:
+        received: list = []
+        app.push_screen(ChatSearch(), received.append)
+        await pilot.pause()
+        await pilot.press("enter", "down")
+        await pilot.pause()
+        assert received == []
+
+
+async def test_escape_cancels_with_none(store):
+    app = _Host()
+    async with app.run_test() as pilot:
+        received: list = []
+        app.push_screen(ChatSearch(), received.append)
+        await pilot.pause()
+        await pilot.press("escape")
+        await pilot.pause()
+        assert received == [None]
@@ -8,6 +8,15 @@ class _Host(App):
     pass
 
 
+def _buffer(*lines):
+    from oterm.log import LogBuffer
+
+    buffer = LogBuffer()
+    for line in lines:
+        buffer.append(line)
+    return buffer
+
+
 async def test_escape_cancels():
     app = _Host()
     async with app.run_test() as pilot:
@@ -27,13 +36,13 @@ async def test_new_log_lines_are_written(monkeypatch):
         (LogGroup.INFO, "hello"),
         (LogGroup.ERROR, "kaboom"),
     ]
-    monkeypatch.setattr(lv, "log_lines", fake_lines)
+    monkeypatch.setattr(lv, "log_lines", _buffer(*fake_lines))
 
     app = _Host()
     async with app.run_test() as pilot:
         screen = LogViewer()
         app.push_screen(screen)
-        await pilot.pause(0.6)  # let debounce fire
+        await pilot.pause()
 
         widget = screen.query_one(RichLog)
         assert screen.line_count == 2
@@ -41,6 +50,31 @@ async def test_new_log_lines_are_written(monkeypatch):
         assert len(widget.lines) >= 2
 
 
+async def test_only_lines_since_the_last_update_are_written(monkeypatch):
+    import oterm.app.log_viewer as lv
+    from oterm.log import LogBuffer, LogGroup
+
+    buffer = LogBuffer(capacity=2)
+    monkeypatch.setattr(lv, "log_lines", buffer)
+
+    app = _Host()
+    async with app.run_test() as pilot:
+        screen = LogViewer()
+        app.push_screen(screen)
+        await pilot.pause()
+        # More lines than the buffer holds arrive between two updates.
+        for i in range(5):
+            buffer.append((LogGroup.INFO, f"line {i}"))
+        await pilot.pause()
+
+        widget = screen.query_one(RichLog)
+        assert screen.line_count == 5
+        assert [line.text for line in widget.lines] == [
+            "INFO - line 3",
+            "INFO - line 4",
+        ]
+
+
 async def test_log_viewer_shows_save_hint():
     from textual.widgets import Label
 
@@ -64,7 +98,7 @@ async def test_save_logs_writes_log_file(monkeypatch, tmp_path):
         (LogGroup.INFO, "hello"),
         (LogGroup.ERROR, "boom"),
     ]
-    monkeypatch.setattr(lv, "log_lines", fake_lines)
+    monkeypatch.setattr(lv, "log_lines", _buffer(*fake_lines))
     monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
 
     app = _Host()
@@ -85,7 +119,7 @@ async def test_save_logs_emits_notification(monkeypatch, tmp_path):
     from oterm.log import LogGroup
 
     fake_lines = [(LogGroup.INFO, "hi")]
-    monkeypatch.setattr(lv, "log_lines", fake_lines)
+    monkeypatch.setattr(lv, "log_lines", _buffer(*fake_lines))
     monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
 
     notifications: list[str] = []
@@ -110,7 +144,7 @@ async def test_rapid_double_save_creates_two_files(monkeypatch, tmp_path):
     import oterm.config
     from oterm.log import LogGroup
 
-    monkeypatch.setattr(lv, "log_lines", [(LogGroup.INFO, "x")])
+    monkeypatch.setattr(lv, "log_lines", _buffer((LogGroup.INFO, "x")))
     monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
 
     app = _Host()
@@ -133,7 +167,7 @@ async def test_save_logs_handles_oserror(monkeypatch, tmp_path):
     import oterm.config
     from oterm.log import LogGroup
 
-    monkeypatch.setattr(lv, "log_lines", [(LogGroup.INFO, "x")])
+    monkeypatch.setattr(lv, "log_lines", _buffer((LogGroup.INFO, "x")))
     monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
 
     def _raise(*args, **kwargs):
@@ -163,3 +197,124 @@ async def test_save_logs_handles_oserror(monkeypatch, tmp_path):
         f"expected one error notification, got {notifications}"
     )
     assert "Failed to export" in error_notifs[0][0]
+
+
+def _shown(screen: LogViewer) -> list[str]:
+    return [line.text for line in screen.query_one(RichLog).lines]
+
+
+async def test_lines_are_pushed_once_per_burst(monkeypatch):
+    import oterm.app.log_viewer as lv
+    from oterm.log import LogBuffer, LogGroup
+
+    buffer = LogBuffer()
+    monkeypatch.setattr(lv, "log_lines", buffer)
+
+    app = _Host()
+    async with app.run_test() as pilot:
+        screen = LogViewer()
+        app.push_screen(screen)
+        await pilot.pause()
+        posted: list = []
+        original = screen.post_message
+
+        def record(message):
+            posted.append(message)
+            return original(message)
+
+        screen.post_message = record  # ty: ignore[invalid-assignment]
+        for i in range(50):
+            buffer.append((LogGroup.INFO, f"line {i}"))
+        await pilot.pause()
+
+        assert len([m for m in posted if isinstance(m, LogViewer.LinesAdded)]) == 1
+        assert len(_shown(screen)) == 50
+
+
+async def test_lines_logged_from_other_threads_are_shown(monkeypatch):
+    import asyncio
+
+    import oterm.app.log_viewer as lv
+    from oterm.log import LogBuffer, LogGroup
+    from tests._helpers import wait_until
+
+    buffer = LogBuffer()
+    monkeypatch.setattr(lv, "log_lines", buffer)
+
+    app = _Host()
+    async with app.run_test() as pilot:
+        screen = LogViewer()
+        app.push_screen(screen)
+        await pilot.pause()
+        await asyncio.to_thread(buffer.append, (LogGroup.INFO, "from a thread"))
+        await wait_until(pilot, lambda: _shown(screen) == ["INFO - from a thread"])
+
+
+async def test_filters_by_level_and_text(monkeypatch):
+    import logging
+
+    from textual.widgets import Input, Select
+
+    import oterm.app.log_viewer as lv
+    from oterm.log import LogGroup
+
+    buffer = _buffer(
+        (LogGroup.DEBUG, "connecting"),
+        (LogGroup.INFO, "boot done"),
+        (LogGroup.WARNING, "slow boot"),
+        (LogGroup.ERROR, "boom"),
+    )
+    monkeypatch.setattr(lv, "log_lines", buffer)
+
+    app = _Host()
+    async with app.run_test() as pilot:
+        screen = LogViewer()
+        app.push_screen(screen)
+        await pilot.pause()
+        assert len(_shown(screen)) == 4
+
+        screen.query_one("#log-level", Select).value = logging.INFO
+        await pilot.pause()
+        assert _shown(screen) == [
+            "INFO - boot done",
+            "WARNING - slow boot",
+            "ERROR - boom",
+        ]
+
+        screen.query_one("#log-filter", Input).value = "BOO"
+        await pilot.pause()
+        screen.query_one("#log-filter", Input).value = "boot"
+        await pilot.pause()
+        assert _shown(screen) == ["INFO - boot done", "WARNING - slow boot"]
+
+        # New lines go through the same filter.
+        buffer.append((LogGroup.DEBUG, "debug boot"))
+        buffer.append((LogGroup.ERROR, "reboot failed"))
+        await pilot.pause()
+        assert _shown(screen)[-1] == "ERROR - reboot failed"
+        assert len(_shown(screen)) == 3
+
+        # Widening reads the lines back from the log.
+        screen.query_one("#log-level", Select).value = logging.DEBUG
+        await pilot.pause()
+        assert "DEBUG - debug boot" in _shown(screen)
+        screen.query_one("#log-filter", Input).value = ""
+        await pilot.pause()
+        assert len(_shown(screen)) == 6
+
+
+async def test_dismissed_viewer_unsubscribes(monkeypatch):
+    import oterm.app.log_viewer as lv
+    from oterm.log import LogBuffer
+
+    buffer = LogBuffer()
+    monkeypatch.setattr(lv, "log_lines", buffer)
+
+    app = _Host()
+    async with app.run_test() as pilot:
+        app.push_screen(LogViewer())
+        await pilot.pause()
+        assert len(buffer._subscribers) == 1
+        await pilot.press("escape")
+        await pilot.pause()
+        assert buffer._subscribers == ()
@@ -1,14 +1,32 @@
+import asyncio
+import json
+
+import mcp.types as mcp_types
 import pytest
 from fastmcp.client.transports import (
     SSETransport,
     StdioTransport,
     StreamableHttpTransport,
 )
-from pydantic_ai.mcp import MCPToolset
+from pydantic_ai import Agent
+from pydantic_ai.mcp import TOOL_SCHEMA_VALIDATOR, MCPToolset
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import ToolsetTool
 
 from oterm.tools.mcp.setup import (
+    LazyMCPToolset,
     _build_toolsets,
+    _tools_changed_handler,
     mcp_servers,
+    mcp_tool_meta,
     setup_mcp_servers,
     teardown_mcp_servers,
 )
@@ -220,3 +238,578 @@ class TestSetupAndTeardown:
             assert any("could not be parsed" in m for m in messages)
         finally:
             await teardown_mcp_servers()
+
+
+class _FakeToolset:
+    """Stands in for an MCPToolset that takes ``delay`` seconds to start."""
+
+    max_retries = None
+    include_return_schema = None
+
+    def __init__(self, tools: list[str], delay: float = 0, fail: bool = False):
+        self.tools = tools
+        self.delay = delay
+        self.fail = fail
+        self.entered = 0
+        self.exited = False
+        self.calls: list[str] = []
+        # When set, tool calls wait for it, so a test can act mid-call.
+        self.release: asyncio.Event | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.entered > 0 and not self.exited
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("spawn failed")
+        self.entered += 1
+        self.exited = False
+        return self
+
+    async def __aexit__(self, *exc):
+        self.exited = True
+
+    async def list_tools(self):
+        return [
+            mcp_types.Tool(name=n, inputSchema={"type": "object"}) for n in self.tools
+        ]
+
+    def tool_for_tool_def(self, tool_def):
+        return ToolsetTool(
+            toolset=self,  # ty: ignore[invalid-argument-type]
+            tool_def=tool_def,
+            max_retries=1,
+            args_validator=TOOL_SCHEMA_VALIDATOR,
+        )
+
+    async def get_tools(self, ctx):
+        return {
+            t.name: self.tool_for_tool_def(ToolDefinition(name=t.name))
+            for t in await self.list_tools()
+        }
+
+    async def call_tool(self, name, tool_args, ctx, tool):
+        assert self.is_running
+        self.calls.append(name)
+        if self.release is not None:
+            await self.release.wait()
+        return f"{name} done"
+
+
+class _FailingExit(_FakeToolset):
+    async def __aexit__(self, *exc):
+        await super().__aexit__(*exc)
+        raise RuntimeError("broken pipe")
+
+
+class TestConcurrentStartup:
+    @pytest.fixture
+    def toolsets(self, app_config, monkeypatch):
+        import oterm.tools.mcp.setup as setup_mod
+
+        built: dict[str, _FakeToolset] = {}
+
+        def configure(**servers: tuple[_FakeToolset, float | None]) -> None:
+            config = {}
+            for name, (toolset, timeout) in servers.items():
+                built[name] = toolset
+                config[name] = {"command": name}
+                if timeout is not None:
+                    config[name]["startupTimeout"] = timeout
+            app_config.set("mcpServers", config)
+
+        monkeypatch.setattr(setup_mod, "_build_toolsets", lambda raw: dict(built))
+        return configure
+
+    async def test_servers_start_concurrently(self, toolsets):
+        toolsets(
+            a=(_FakeToolset(["ta"], delay=0.2), None),
+            b=(_FakeToolset(["tb"], delay=0.2), None),
+            c=(_FakeToolset(["tc"], delay=0.2), None),
+        )
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            meta = await setup_mcp_servers()
+            assert loop.time() - start < 0.5
+            assert set(meta) == {"a", "b", "c"}
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_failed_server_does_not_block_others(self, toolsets):
+        toolsets(
+            ok=(_FakeToolset(["t"]), None),
+            broken=(_FakeToolset(["x"], fail=True), None),
+        )
+        try:
+            meta = await setup_mcp_servers()
+            assert set(meta) == {"ok"}
+            assert set(mcp_servers) == {"ok"}
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_slow_server_is_registered_when_ready(self, toolsets):
+        slow = _FakeToolset(["late_tool"], delay=0.3)
+        toolsets(fast=(_FakeToolset(["t"]), None), slow=(slow, 0.05))
+        ready: list[str] = []
+        try:
+            meta = await setup_mcp_servers(on_ready=ready.append)
+            assert set(meta) == {"fast"}
+            assert ready == []
+
+            for _ in range(100):
+                if ready:
+                    break
+                await asyncio.sleep(0.01)
+            assert ready == ["slow"]
+            assert [m["name"] for m in meta["slow"]] == ["late_tool"]
+            assert mcp_servers["slow"] is slow
+        finally:
+            await teardown_mcp_servers()
+        assert slow.exited
+
+    async def test_teardown_abandons_servers_still_starting(self, toolsets):
+        stuck = _FakeToolset(["t"], delay=60)
+        toolsets(stuck=(stuck, 0.01))
+        await setup_mcp_servers()
+        await asyncio.wait_for(teardown_mcp_servers(), 1)
+        assert mcp_servers == {}
+
+    async def test_known_server_is_offered_without_waiting(self, toolsets):
+        toolsets(srv=(_FakeToolset(["t"]), None))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        slow = _FakeToolset(["t"], delay=60)
+        toolsets(srv=(slow, None))
+        try:
+            meta = await asyncio.wait_for(setup_mcp_servers(), 1)
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+            assert isinstance(mcp_servers["srv"], LazyMCPToolset)
+            assert slow.entered == 0
+        finally:
+            await asyncio.wait_for(teardown_mcp_servers(), 1)
+
+    async def test_snapshot_is_refreshed_once_server_is_up(
+        self, toolsets, tmp_data_dir
+    ):
+        toolsets(srv=(_FakeToolset(["old"]), None))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        server = _FakeToolset(["new"], delay=0.05)
+        toolsets(srv=(server, None))
+        try:
+            meta = await setup_mcp_servers()
+            assert [m["name"] for m in meta["srv"]] == ["old"]
+
+            def saved_tools() -> list[str]:
+                saved = json.loads((tmp_data_dir / "mcp_tools.json").read_text())
+                return [t["name"] for t in saved["srv"]["tools"]]
+
+            for _ in range(100):
+                if saved_tools() == ["new"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert [m["name"] for m in meta["srv"]] == ["new"]
+            assert saved_tools() == ["new"]
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_list_changed_notification_refreshes_tools(self, toolsets):
+        server = _FakeToolset(["a"])
+        toolsets(srv=(server, None))
+        try:
+            meta = await setup_mcp_servers()
+            server.tools = ["a", "b"]
+            handler = _tools_changed_handler("srv")
+            await handler(
+                mcp_types.ServerNotification(
+                    mcp_types.ToolListChangedNotification(
+                        method="notifications/tools/list_changed"
+                    )
+                )
+            )
+            for _ in range(100):
+                if len(meta["srv"]) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert [m["name"] for m in meta["srv"]] == ["a", "b"]
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_failed_refresh_keeps_the_servers_tools(self, toolsets):
+        import oterm.tools.mcp.setup as setup_mod
+
+        server = _FakeToolset(["a"])
+        toolsets(srv=(server, None))
+        try:
+            meta = await setup_mcp_servers()
+
+            async def broken():
+                raise RuntimeError("session closed")
+
+            server.list_tools = broken  # ty: ignore[invalid-assignment]
+            await _tools_changed_handler("srv")(_TOOLS_CHANGED)
+            for _ in range(100):
+                if not setup_mod._refreshes:
+                    break
+                await asyncio.sleep(0.01)
+            assert setup_mod._refreshes == set()
+            assert [m["name"] for m in meta["srv"]] == ["a"]
+            assert mcp_servers["srv"] is server
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_failed_start_keeps_the_saved_tools(self, toolsets):
+        import oterm.tools.mcp.setup as setup_mod
+
+        toolsets(srv=(_FakeToolset(["t"]), None))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        toolsets(srv=(_FakeToolset(["t"], fail=True), None))
+        try:
+            meta = await setup_mcp_servers()
+            task = setup_mod._servers["srv"].task
+            assert task is not None
+            await task
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+            assert isinstance(mcp_servers["srv"], LazyMCPToolset)
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_failed_shutdown_is_logged(self, toolsets):
+        import oterm.log
+
+        server = _FailingExit(["t"])
+        toolsets(srv=(server, None))
+        await setup_mcp_servers()
+        before = len(oterm.log.log_lines)
+        await teardown_mcp_servers()
+        messages = [msg for _, msg in oterm.log.log_lines[before:]]
+        assert any("'srv' failed to shut down: broken pipe" in m for m in messages)
+        assert server.exited
+
+    async def test_snapshot_is_keyed_by_the_unexpanded_config(
+        self, toolsets, app_config, tmp_data_dir, monkeypatch
+    ):
+        from oterm.tools.mcp.setup import _fingerprint
+
+        entry = {"command": "srv", "env": {"TOKEN": "${TOKEN}"}}
+        monkeypatch.setenv("TOKEN", "s3cret")
+        toolsets(srv=(_FakeToolset(["t"]), None))
+        app_config.set("mcpServers", {"srv": entry})
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+        saved = json.loads((tmp_data_dir / "mcp_tools.json").read_text())
+        assert saved["srv"]["config"] == _fingerprint(entry)
+
+        # The saved tools still apply once the secret changes.
+        monkeypatch.setenv("TOKEN", "rotated")
+        toolsets(srv=(_FakeToolset(["t"]), None))
+        app_config.set("mcpServers", {"srv": entry})
+        try:
+            await setup_mcp_servers()
+            assert isinstance(mcp_servers["srv"], LazyMCPToolset)
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_unreadable_snapshot_is_ignored(self, toolsets, tmp_data_dir):
+        (tmp_data_dir / "mcp_tools.json").write_text("not json")
+        server = _FakeToolset(["t"])
+        toolsets(srv=(server, None))
+        try:
+            meta = await setup_mcp_servers()
+            assert mcp_servers["srv"] is server
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_malformed_snapshot_entry_is_ignored(self, toolsets, tmp_data_dir):
+        from oterm.tools.mcp.setup import _fingerprint
+
+        (tmp_data_dir / "mcp_tools.json").write_text(
+            json.dumps(
+                {"srv": {"config": _fingerprint({"command": "srv"}), "tools": 1}}
+            )
+        )
+        server = _FakeToolset(["t"])
+        toolsets(srv=(server, None))
+        try:
+            await setup_mcp_servers()
+            assert mcp_servers["srv"] is server
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_unwritable_snapshot_is_only_logged(
+        self, toolsets, tmp_data_dir, monkeypatch
+    ):
+        import oterm.tools.mcp.setup as setup_mod
+
+        (tmp_data_dir / "file").write_text("")
+        monkeypatch.setattr(
+            setup_mod, "_snapshot_path", lambda: tmp_data_dir / "file" / "tools.json"
+        )
+        toolsets(srv=(_FakeToolset(["t"]), None))
+        try:
+            meta = await setup_mcp_servers()
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_snapshot_is_saved_off_the_event_loop(self, toolsets, monkeypatch):
+        import threading
+
+        import oterm.tools.mcp.setup as setup_mod
+
+        threads: list[threading.Thread] = []
+        save = setup_mod._save_snapshot
+
+        def recording_save(*args):
+            threads.append(threading.current_thread())
+            save(*args)
+
+        monkeypatch.setattr(setup_mod, "_save_snapshot", recording_save)
+        toolsets(a=(_FakeToolset(["ta"]), None), b=(_FakeToolset(["tb"]), None))
+        try:
+            await setup_mcp_servers()
+            assert len(threads) == 2
+            assert threading.main_thread() not in threads
+            saved = setup_mod._load_snapshot()
+            assert set(saved) == {"a", "b"}
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_other_notifications_are_ignored(self, toolsets):
+        import oterm.tools.mcp.setup as setup_mod
+
+        toolsets(srv=(_FakeToolset(["a"]), None))
+        try:
+            await setup_mcp_servers()
+            handler = _tools_changed_handler("srv")
+            await handler(RuntimeError("transport hiccup"))
+            await handler(
+                mcp_types.ServerNotification(
+                    mcp_types.ResourceListChangedNotification(
+                        method="notifications/resources/list_changed"
+                    )
+                )
+            )
+            assert setup_mod._refreshes == set()
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_teardown_cancels_refreshes_in_flight(self, toolsets):
+        import oterm.tools.mcp.setup as setup_mod
+
+        server = _FakeToolset(["a"])
+        toolsets(srv=(server, None))
+        await setup_mcp_servers()
+        listing = asyncio.Event()
+
+        async def hang():
+            listing.set()
+            await asyncio.sleep(60)
+
+        server.list_tools = hang  # ty: ignore[invalid-assignment]
+        await _tools_changed_handler("srv")(_TOOLS_CHANGED)
+        (refresh,) = setup_mod._refreshes
+        await listing.wait()
+        await asyncio.wait_for(teardown_mcp_servers(), 1)
+        await asyncio.sleep(0)
+        assert refresh.cancelled()
+
+
+_TOOLS_CHANGED = mcp_types.ServerNotification(
+    mcp_types.ToolListChangedNotification(method="notifications/tools/list_changed")
+)
+
+
+def _call_tool_once(name: str):
+    """A model that calls ``name`` once, then answers with the tool's result."""
+
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        for message in messages:
+            for part in message.parts:
+                if isinstance(part, ToolReturnPart):
+                    return ModelResponse(parts=[TextPart(str(part.content))])
+        return ModelResponse(parts=[ToolCallPart(name, {})])
+
+    return FunctionModel(respond)
+
+
+class TestLazyServers:
+    @pytest.fixture
+    def lazy(self, app_config, monkeypatch):
+        import oterm.tools.mcp.setup as setup_mod
+
+        built: dict[str, _FakeToolset] = {}
+
+        def configure(idle: float = 60, **servers: _FakeToolset) -> None:
+            built.update(servers)
+            app_config.set(
+                "mcpServers",
+                {
+                    name: {"command": name, "lazy": True, "idleTimeout": idle}
+                    for name in servers
+                },
+            )
+
+        monkeypatch.setattr(setup_mod, "_build_toolsets", lambda raw: dict(built))
+        return configure
+
+    async def _until(self, condition) -> None:
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_first_run_starts_server_and_saves_snapshot(self, lazy, tmp_data_dir):
+        server = _FakeToolset(["t"])
+        lazy(idle=0.05, srv=server)
+        try:
+            meta = await setup_mcp_servers()
+            assert server.entered == 1
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+            assert isinstance(mcp_servers["srv"], LazyMCPToolset)
+            saved = json.loads((tmp_data_dir / "mcp_tools.json").read_text())
+            assert [t["name"] for t in saved["srv"]["tools"]] == ["t"]
+
+            await self._until(lambda: server.exited)
+            assert server.exited
+            assert "srv" in mcp_tool_meta
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_known_server_starts_on_first_tool_call(self, lazy):
+        lazy(srv=_FakeToolset(["t"]))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        server = _FakeToolset(["t"])
+        lazy(idle=0.05, srv=server)
+        try:
+            meta = await setup_mcp_servers()
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+            agent = Agent(_call_tool_once("t"), toolsets=[mcp_servers["srv"]])
+            assert server.entered == 0
+
+            result = await agent.run("go")
+            assert result.output == "t done"
+            assert server.calls == ["t"]
+            assert server.entered == 1
+
+            await self._until(lambda: server.exited)
+            assert server.exited
+            result = await agent.run("again")
+            assert result.output == "t done"
+            assert server.entered == 2
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_busy_server_outlives_its_idle_timeout(self, lazy):
+        server = _FakeToolset(["t"])
+        lazy(idle=0.05, srv=server)
+        try:
+            await setup_mcp_servers()
+            server.release = asyncio.Event()
+            agent = Agent(_call_tool_once("t"), toolsets=[mcp_servers["srv"]])
+            run = asyncio.create_task(agent.run("go"))
+            await self._until(lambda: server.calls == ["t"])
+
+            await asyncio.sleep(0.2)
+            assert not server.exited
+            server.release.set()
+            result = await run
+            assert result.output == "t done"
+            await self._until(lambda: server.exited)
+            assert server.exited
+            assert server.entered == 1
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_tools_changed_during_a_call_are_refreshed(self, lazy):
+        server = _FakeToolset(["t"])
+        lazy(srv=server)
+        try:
+            meta = await setup_mcp_servers()
+            proxy = mcp_servers["srv"]
+            assert isinstance(proxy, LazyMCPToolset)
+            server.release = asyncio.Event()
+            agent = Agent(_call_tool_once("t"), toolsets=[proxy])
+            run = asyncio.create_task(agent.run("go"))
+            await self._until(lambda: server.calls == ["t"])
+
+            server.tools = ["t", "u"]
+            await _tools_changed_handler("srv")(_TOOLS_CHANGED)
+            await self._until(lambda: len(meta["srv"]) == 2)
+            assert [m["name"] for m in meta["srv"]] == ["t", "u"]
+            assert [t.name for t in proxy.tools] == ["t", "u"]
+
+            server.release.set()
+            result = await run
+            assert result.output == "t done"
+            assert server.entered == 1
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_server_that_cannot_start_fails_the_call(self, lazy):
+        lazy(srv=_FakeToolset(["t"]))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        lazy(srv=_FakeToolset(["t"], fail=True))
+        try:
+            meta = await setup_mcp_servers()
+            agent = Agent(_call_tool_once("t"), toolsets=[mcp_servers["srv"]])
+            with pytest.raises(RuntimeError, match="'srv' could not be started"):
+                await agent.run("go")
+            assert [m["name"] for m in meta["srv"]] == ["t"]
+            assert isinstance(mcp_servers["srv"], LazyMCPToolset)
+        finally:
+            await teardown_mcp_servers()
+
+    async def test_server_acquired_after_teardown_raises(self, lazy):
+        import oterm.tools.mcp.setup as setup_mod
+
+        lazy(srv=_FakeToolset(["t"]))
+        await setup_mcp_servers()
+        server = setup_mod._servers["srv"]
+        await teardown_mcp_servers()
+
+        with pytest.raises(RuntimeError, match="'srv' has been shut down"):
+            await setup_mod._acquire(server)
+        assert server.users == 0
+
+    async def test_proxy_names_its_server(self):
+        proxy = LazyMCPToolset("srv", [])
+        assert proxy.id == "srv"
+        assert proxy.label == "MCP server 'srv'"
+
+    async def test_proxy_of_a_shut_down_server_raises(self, lazy):
+        lazy(srv=_FakeToolset(["t"]))
+        await setup_mcp_servers()
+        proxy = mcp_servers["srv"]
+        await teardown_mcp_servers()
+
+        agent = Agent(_call_tool_once("t"), toolsets=[proxy])
+        with pytest.raises(RuntimeError, match="'srv' has been shut down"):
+            await agent.run("go")
+
+    async def test_changed_config_ignores_snapshot(self, lazy, app_config):
+        lazy(srv=_FakeToolset(["old"]))
+        await setup_mcp_servers()
+        await teardown_mcp_servers()
+
+        server = _FakeToolset(["new"])
+        lazy(srv=server)
+        app_config.set("mcpServers", {"srv": {"command": "other", "lazy": True}})
+        try:
+            meta = await setup_mcp_servers()
+            assert server.entered == 1
+            assert [m["name"] for m in meta["srv"]] == ["new"]
+        finally:
+            await teardown_mcp_servers()
@@ -18,7 +18,7 @@ def ollama_thinking(monkeypatch):
 
         monkeypatch.setattr(
             agent_mod,
-            "get_capabilities",
+            "cached_capabilities",
             lambda provider, model: ModelCapabilities(
                 supports_thinking=supports_thinking
             ),
@@ -115,6 +115,64 @@ class TestBuildModelSettings:
         assert settings["temperature"] == 0.7
         assert settings["top_p"] == 0.9
 
+    def test_anthropic_caches_instructions_tools_and_history(self):
+        settings = _build_model_settings({}, thinking=False, provider="anthropic")
+        assert settings.get("anthropic_cache_instructions") is True
+        assert settings.get("anthropic_cache_tool_definitions") is True
+        assert settings.get("anthropic_cache") is True
+
+    def test_chat_parameters_override_prompt_caching(self):
+        settings = _build_model_settings(
+            {"anthropic_cache": "1h", "anthropic_cache_tool_definitions": False},
+            thinking=False,
+            provider="anthropic",
+        )
+        assert settings.get("anthropic_cache") == "1h"
+        assert settings.get("anthropic_cache_tool_definitions") is False
+
+    def test_caching_messages_replaces_the_automatic_breakpoint(self):
+        settings = _build_model_settings(
+            {"anthropic_cache_messages": "1h"}, thinking=False, provider="anthropic"
+        )
+        assert settings.get("anthropic_cache_messages") == "1h"
+        assert "anthropic_cache" not in settings
+        assert settings.get("anthropic_cache_instructions") is True
+
+        settings = _build_model_settings(
+            {"anthropic_cache_messages": False}, thinking=False, provider="anthropic"
+        )
+        assert settings.get("anthropic_cache") is True
+
+    def test_cached_messages_setting_is_accepted_by_anthropic(self):
+        from pydantic_ai.models.anthropic import AnthropicModel
+        from pydantic_ai.providers.anthropic import AnthropicProvider
+
+        model = AnthropicModel(
+            "claude-sonnet-4-5", provider=AnthropicProvider(api_key="test")
+        )
+        settings = _build_model_settings(
+            {"anthropic_cache_messages": True}, thinking=False, provider="anthropic"
+        )
+        # Raises `UserError` when both caching modes are on.
+        model._build_automatic_cache_control(settings)  # ty: ignore[invalid-argument-type]
+
+    @pytest.mark.parametrize("provider", ["openai-chat", "openai-responses"])
+    def test_openai_cache_key_follows_model_and_instructions(self, provider):
+        def key(model: str, system: str | None) -> str | None:
+            settings = _build_model_settings(
+                {}, thinking=False, provider=provider, model=model, system=system
+            )
+            return settings.get("openai_prompt_cache_key")
+
+        assert key("gpt-4.1", "be brief") == key("gpt-4.1", "be brief")
+        assert key("gpt-4.1", "be brief") != key("gpt-4.1", "be verbose")
+        assert key("gpt-4.1", None) != key("gpt-5", None)
+
+    @pytest.mark.parametrize("provider", ["ollama", "openai-compat/vllm", "groq"])
+    def test_no_cache_settings_elsewhere(self, provider):
+        settings = _build_model_settings({}, thinking=False, provider=provider)
+        assert not [key for key in settings if "cache" in key]
+
 
 class TestGetAgent:
     def test_ollama_provider(self, monkeypatch, ollama_thinking):
@@ -180,6 +238,14 @@ class TestGetAgent:
         assert isinstance(agent.model, OpenAIChatModel)
         assert agent.model.profile.supports_thinking is False
 
+    def test_ollama_model_is_built_without_asking_ollama(self, monkeypatch):
+        from oterm.providers import ollama as ollama_mod
+
+        monkeypatch.setattr(ollama_mod, "show_model", pytest.fail)
+        agent = get_agent(provider="ollama", model="qwen3.6")
+        assert isinstance(agent.model, OpenAIChatModel)
+        assert agent.model.profile.supports_thinking is False
+
     def test_openai_responses_provider_enables_image_generation_tool(self, monkeypatch):
         from pydantic_ai.models.openai import OpenAIResponsesModel
         from pydantic_ai.native_tools import ImageGenerationTool
@@ -275,3 +341,91 @@ class TestGetAgent:
         )
         tool_names = [t.name for t in agent._function_toolset.tools.values()]
         assert "hello" in tool_names
+
+
+class TestAgentCache:
+    @pytest.fixture(autouse=True)
+    def _ollama(self, monkeypatch, ollama_thinking):
+        import oterm.config
+
+        ollama_thinking(True)
+        monkeypatch.setattr(
+            oterm.config.envConfig, "OLLAMA_URL", "http://localhost:11434"
+        )
+
+    def test_same_configuration_reuses_agent(self):
+        first = get_agent(model="llama3", system="s", parameters={"top_p": 0.9})
+        second = get_agent(model="llama3", system="s", parameters={"top_p": 0.9})
+        assert first is second
+
+    def test_different_configuration_shares_model(self):
+        plain = get_agent(model="llama3")
+        thinking = get_agent(model="llama3", thinking=True)
+        briefed = get_agent(model="llama3", system="be brief")
+        assert plain is not thinking and plain is not briefed
+        assert plain.model is thinking.model is briefed.model
+
+    def test_models_on_one_server_share_http_client(self):
+        from oterm.providers.http import get_http_client
+
+        llama = get_agent(model="llama3").model
+        devstral = get_agent(model="devstral").model
+        assert isinstance(llama, OpenAIChatModel)
+        assert isinstance(devstral, OpenAIChatModel)
+        shared = get_http_client("http://localhost:11434/v1")
+        assert llama.client._client is devstral.client._client is shared
+
+    def test_model_is_rebuilt_when_capabilities_change(self, ollama_thinking):
+        ollama_thinking(False)
+        plain = get_agent(model="llama3").model
+        assert get_agent(model="llama3", system="s").model is plain
+        ollama_thinking(True)
+        thinking = get_agent(model="llama3").model
+        assert thinking is not plain
+        assert isinstance(thinking, OpenAIChatModel)
+        assert thinking.profile.supports_thinking is True
+
+    def test_model_is_rebuilt_when_endpoint_config_changes(self, app_config):
+        app_config.set(
+            "openaiCompatible", {"local": {"base_url": "http://localhost:1234/v1"}}
+        )
+        first = get_agent(provider="openai-compat/local", model="m").model
+        app_config.set(
+            "openaiCompatible", {"local": {"base_url": "http://localhost:5678/v1"}}
+        )
+        second = get_agent(provider="openai-compat/local", model="m")
+        assert isinstance(second.model, OpenAIChatModel)
+        assert second.model is not first
+        assert second.model.base_url == "http://localhost:5678/v1/"
+
+    def test_tool_selection_is_part_of_the_key(self):
+        from pydantic_ai import Tool as PydanticTool
+
+        def hello() -> str:
+            return "hi"
+
+        tool = PydanticTool(hello, takes_ctx=False)
+        bare = get_agent(model="llama3")
+        with_tool = get_agent(model="llama3", tools=[tool])
+        assert bare is not with_tool
+        assert get_agent(model="llama3", tools=[tool]) is with_tool
+
+    def test_least_recently_used_agent_is_evicted(self, monkeypatch):
+        import oterm.agent as agent_mod
+
+        monkeypatch.setattr(agent_mod, "AGENT_CACHE_SIZE", 2)
+        first = get_agent(model="llama3", system="1")
+        second = get_agent(model="llama3", system="2")
+        assert get_agent(model="llama3", system="1") is first
+        get_agent(model="llama3", system="3")
+        assert get_agent(model="llama3", system="1") is first
+        assert get_agent(model="llama3", system="2") is not second
+
+    def test_failed_builds_are_not_cached(self, app_config):
+        with pytest.raises(ValueError):
+            get_agent(provider="openai-compat/late", model="m")
+        app_config.set(
+            "openaiCompatible", {"late": {"base_url": "http://localhost:1234/v1"}}
+        )
+        agent = get_agent(provider="openai-compat/late", model="m")
+        assert isinstance(agent.model, OpenAIChatModel)
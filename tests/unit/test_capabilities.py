@@ -2,6 +2,7 @@ import pytest
 
 from oterm.providers.capabilities import (
     ModelCapabilities,
+    _cache_path,
     get_capabilities,
     is_chat_model,
 )
@@ -139,3 +140,223 @@ class TestGetCapabilities:
         # huggingface isn't in pydantic-ai's infer_provider_class map; we
         # should swallow the LookupError and return False rather than crash.
         assert get_capabilities("huggingface", "some-model").supports_thinking is False
+
+
+class TestOllamaCapabilityCache:
+    @staticmethod
+    def _listing(**digests: str) -> list:
+        from types import SimpleNamespace
+
+        return [
+            SimpleNamespace(model=model, digest=digest)
+            for model, digest in digests.items()
+        ]
+
+    @pytest.fixture
+    def shows(self, monkeypatch) -> list[str]:
+        from oterm.providers import ollama as ollama_mod
+
+        calls: list[str] = []
+
+        def fake_show(model):
+            calls.append(model)
+            return {"capabilities": ["tools", "thinking"]}
+
+        monkeypatch.setattr(ollama_mod, "show_model", fake_show)
+        return calls
+
+    def test_show_called_once_per_model(self, shows):
+        first = get_capabilities("ollama", "llama3")
+        second = get_capabilities("ollama", "llama3")
+        assert first == second
+        assert first.supports_thinking is True
+        assert shows == ["llama3"]
+
+    def test_cache_persists_across_sessions(self, shows, monkeypatch):
+        import oterm.providers.capabilities as capabilities
+
+        get_capabilities("ollama", "llama3")
+        monkeypatch.setattr(capabilities, "_ollama_cache", None)
+        assert get_capabilities("ollama", "llama3").supports_tools is True
+        assert shows == ["llama3"]
+
+    def test_failures_are_cached_briefly(self, monkeypatch, shows):
+        import oterm.providers.capabilities as capabilities
+        from oterm.providers import ollama as ollama_mod
+
+        def boom(model):
+            shows.append(model)
+            raise RuntimeError("ollama down")
+
+        now = [1000.0]
+        monkeypatch.setattr(capabilities.time, "monotonic", lambda: now[0])
+        with monkeypatch.context() as m:
+            m.setattr(ollama_mod, "show_model", boom)
+            assert get_capabilities("ollama", "llama3") == ModelCapabilities()
+            now[0] += capabilities.FAILED_LOOKUP_TTL - 1
+            assert get_capabilities("ollama", "llama3") == ModelCapabilities()
+            assert shows == ["llama3"]
+        now[0] += 1
+        assert get_capabilities("ollama", "llama3").supports_tools is True
+        assert shows == ["llama3", "llama3"]
+
+    def test_cached_capabilities_never_ask_ollama(self, shows):
+        from oterm.providers.capabilities import cached_capabilities
+
+        assert cached_capabilities("ollama", "llama3") is None
+        assert cached_capabilities("anthropic", "claude-4-sonnet") == (
+            get_capabilities("anthropic", "claude-4-sonnet")
+        )
+        assert shows == []
+        get_capabilities("ollama", "llama3")
+        assert cached_capabilities("ollama", "llama3") == (
+            get_capabilities("ollama", "llama3")
+        )
+        assert shows == ["llama3"]
+
+    def test_changed_digest_invalidates(self, shows):
+        from oterm.providers.capabilities import note_ollama_models
+
+        note_ollama_models(self._listing(llama3="sha256:a", qwen3="sha256:q"))
+        get_capabilities("ollama", "llama3")
+        get_capabilities("ollama", "qwen3")
+
+        note_ollama_models(self._listing(llama3="sha256:b", qwen3="sha256:q"))
+        get_capabilities("ollama", "llama3")
+        get_capabilities("ollama", "qwen3")
+        assert shows == ["llama3", "qwen3", "llama3"]
+
+    def test_removed_model_is_forgotten(self, shows):
+        from oterm.providers.capabilities import note_ollama_models
+
+        note_ollama_models(self._listing(llama3="sha256:a"))
+        get_capabilities("ollama", "llama3")
+        note_ollama_models(self._listing())
+        get_capabilities("ollama", "llama3")
+        assert shows == ["llama3", "llama3"]
+
+    def test_entry_without_digest_adopts_listed_one(self, shows):
+        import oterm.providers.capabilities as capabilities
+        from oterm.providers.capabilities import note_ollama_models
+
+        get_capabilities("ollama", "llama3")
+        note_ollama_models(self._listing(llama3="sha256:a"))
+        assert capabilities._load_ollama_cache()["llama3"][0] == "sha256:a"
+        get_capabilities("ollama", "llama3")
+        assert shows == ["llama3"]
+
+    def test_remember_from_show_response(self, shows):
+        from oterm.providers.capabilities import remember_ollama_capabilities
+
+        caps = remember_ollama_capabilities("llava", {"capabilities": ["vision"]})
+        assert caps.supports_vision is True
+        assert get_capabilities("ollama", "llava") == caps
+        assert shows == []
+
+    def test_unreadable_cache_file_is_ignored(self, shows):
+        import oterm.providers.capabilities as capabilities
+
+        capabilities._cache_path().write_text("not json")
+        assert get_capabilities("ollama", "llama3").supports_tools is True
+        assert shows == ["llama3"]
+
+    def test_cache_with_the_old_context_window_is_refetched(self, shows):
+        import json
+
+        import oterm.providers.capabilities as capabilities
+
+        capabilities._cache_path().write_text(
+            json.dumps({"llama3": {"supports_tools": True, "context_window": 131072}})
+        )
+        get_capabilities("ollama", "llama3")
+        assert shows == ["llama3"]
+
+    async def test_fetch_runs_show_off_the_event_loop(self, monkeypatch):
+        import threading
+
+        from oterm.providers import ollama as ollama_mod
+        from oterm.providers.capabilities import fetch_capabilities
+
+        threads: list[threading.Thread] = []
+
+        def fake_show(model):
+            threads.append(threading.current_thread())
+            return {"capabilities": ["tools"]}
+
+        monkeypatch.setattr(ollama_mod, "show_model", fake_show)
+        caps = await fetch_capabilities("ollama", "llama3")
+        assert caps.supports_tools is True
+        assert threads and threads[0] is not threading.main_thread()
+        assert await fetch_capabilities("ollama", "llama3") == caps
+        assert len(threads) == 1
+
+    async def test_refresh_lists_models_off_the_event_loop(self, shows, monkeypatch):
+        from types import SimpleNamespace
+
+        from oterm.providers import ollama as ollama_mod
+        from oterm.providers.capabilities import (
+            note_ollama_models,
+            refresh_ollama_models,
+        )
+
+        note_ollama_models(self._listing(llama3="sha256:a"))
+        get_capabilities("ollama", "llama3")
+        monkeypatch.setattr(
+            ollama_mod,
+            "list_models",
+            lambda: SimpleNamespace(models=self._listing(llama3="sha256:b")),
+        )
+        await refresh_ollama_models()
+        get_capabilities("ollama", "llama3")
+        assert shows == ["llama3", "llama3"]
+
+    async def test_failed_refresh_keeps_capabilities(self, shows, monkeypatch):
+        from oterm.providers import ollama as ollama_mod
+        from oterm.providers.capabilities import refresh_ollama_models
+
+        def boom():
+            raise RuntimeError("ollama down")
+
+        get_capabilities("ollama", "llama3")
+        monkeypatch.setattr(ollama_mod, "list_models", boom)
+        await refresh_ollama_models()
+        get_capabilities("ollama", "llama3")
+        assert shows == ["llama3"]
+
+    def test_listed_models_without_digest_are_skipped(self, shows):
+        from types import SimpleNamespace
+
+        import oterm.providers.capabilities as capabilities
+        from oterm.providers.capabilities import note_ollama_models
+
+        note_ollama_models(
+            [
+                SimpleNamespace(model="llama3", digest="sha256:a"),
+                SimpleNamespace(model="pulling", digest=None),
+            ]
+        )
+        assert capabilities._ollama_digests == {"llama3": "sha256:a"}
+
+    def test_unchanged_capabilities_are_not_saved_again(self, shows):
+        import oterm.providers.capabilities as capabilities
+        from oterm.providers.capabilities import remember_ollama_capabilities
+
+        remember_ollama_capabilities("llava", {"capabilities": ["vision"]})
+        path = capabilities._cache_path()
+        path.unlink()
+        remember_ollama_capabilities("llava", {"capabilities": ["vision"]})
+        assert not path.exists()
+
+    def test_unwritable_cache_is_only_logged(self, shows, monkeypatch, tmp_path):
+        from oterm.config import envConfig
+
+        (tmp_path / "file").write_text("")
+        monkeypatch.setattr(envConfig, "OTERM_DATA_DIR", tmp_path / "file")
+        assert get_capabilities("ollama", "llama3").supports_tools is True
+        assert shows == ["llama3"]
+
+    def test_cache_lives_in_the_data_dir(self, monkeypatch, tmp_path):
+        from oterm.config import envConfig
+
+        monkeypatch.setattr(envConfig, "OTERM_DATA_DIR", tmp_path)
+        assert _cache_path() == tmp_path / "capabilities.json"
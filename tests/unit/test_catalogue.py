@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import oterm.providers as providers
+import oterm.providers.catalogue as catalogue
+from oterm.providers.catalogue import MODEL_LIST_TTL, get_models, prefetch_models
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Record provider fetches; each returns ``["<provider>-model"]``."""
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def fake(provider):
+        with lock:
+            calls.append(provider)
+        time.sleep(0.05)
+        return [f"{provider}-model"]
+
+    monkeypatch.setattr(providers, "fetch_models", fake)
+    return calls
+
+
+class TestGetModels:
+    async def test_fetches_and_catalogues(self, fetches, tmp_path):
+        assert await get_models("anthropic") == ["anthropic-model"]
+        assert await get_models("anthropic") == ["anthropic-model"]
+        assert fetches == ["anthropic"]
+        saved = json.loads((tmp_path / "models.json").read_text())
+        assert saved["anthropic"]["models"] == ["anthropic-model"]
+
+    async def test_catalogue_is_read_from_disk(self, fetches, tmp_path):
+        (tmp_path / "models.json").write_text(
+            json.dumps({"anthropic": {"fetched": time.time(), "models": ["saved"]}})
+        )
+        assert await get_models("anthropic") == ["saved"]
+        assert fetches == []
+
+    async def test_stale_list_is_served_then_refreshed(self, fetches, tmp_path):
+        stale = time.time() - MODEL_LIST_TTL - 1
+        (tmp_path / "models.json").write_text(
+            json.dumps({"anthropic": {"fetched": stale, "models": ["old"]}})
+        )
+        assert await get_models("anthropic") == ["old"]
+        await asyncio.gather(*catalogue._fetches.values())
+        assert fetches == ["anthropic"]
+        assert await get_models("anthropic") == ["anthropic-model"]
+
+    async def test_unreadable_catalogue_is_ignored(self, fetches, tmp_path):
+        (tmp_path / "models.json").write_text("not json")
+        assert await get_models("anthropic") == ["anthropic-model"]
+        assert fetches == ["anthropic"]
+        saved = json.loads((tmp_path / "models.json").read_text())
+        assert saved["anthropic"]["models"] == ["anthropic-model"]
+
+    async def test_unwritable_catalogue_is_only_logged(
+        self, fetches, monkeypatch, tmp_path
+    ):
+        from oterm.config import envConfig
+
+        (tmp_path / "file").write_text("")
+        monkeypatch.setattr(envConfig, "OTERM_DATA_DIR", tmp_path / "file")
+        assert await get_models("anthropic") == ["anthropic-model"]
+        assert await get_models("anthropic") == ["anthropic-model"]
+        assert fetches == ["anthropic"]
+
+    async def test_concurrent_callers_share_a_fetch(self, fetches):
+        results = await asyncio.gather(*(get_models("cohere") for _ in range(5)))
+        assert results == [["cohere-model"]] * 5
+        assert fetches == ["cohere"]
+
+    async def test_failure_falls_back_to_known_models_uncached(
+        self, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(providers, "fetch_models", lambda provider: None)
+        monkeypatch.setattr(providers, "known_models", lambda provider: ["known"])
+        assert await get_models("anthropic") == ["known"]
+        assert not (tmp_path / "models.json").exists()
+
+    async def test_compat_endpoints_are_keyed_by_url(self, fetches, app_config):
+        app_config.set("openaiCompatible", {"vllm": {"base_url": "http://a/v1"}})
+        await get_models("openai-compat/vllm")
+        app_config.set("openaiCompatible", {"vllm": {"base_url": "http://b/v1"}})
+        await get_models("openai-compat/vllm")
+        assert fetches == ["openai-compat/vllm", "openai-compat/vllm"]
+
+    async def test_ollama_is_always_listed_live(self, monkeypatch, fetches):
+        monkeypatch.setattr(providers, "list_models", lambda provider: ["llama3"])
+        assert await get_models("ollama") == ["llama3"]
+        assert fetches == []
+
+
+class TestPrefetchModels:
+    async def test_providers_are_fetched_concurrently(self, fetches):
+        names = ["ollama", "anthropic", "cohere", "mistral", "google"]
+        start = time.perf_counter()
+        await prefetch_models(names)
+        assert time.perf_counter() - start < 0.05 * 3
+        assert sorted(fetches) == ["anthropic", "cohere", "google", "mistral"]
+
+    async def test_defaults_to_available_providers(self, fetches, monkeypatch):
+        monkeypatch.setattr(
+            providers, "get_available_providers", lambda: ["ollama", "anthropic"]
+        )
+        await prefetch_models()
+        assert fetches == ["anthropic"]
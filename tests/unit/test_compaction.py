@@ -0,0 +1,169 @@
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    BinaryContent,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ThinkingPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import oterm.compaction as compaction_mod
+from oterm.compaction import (
+    COMPACTION_THRESHOLD,
+    KEEP_TURNS,
+    compaction_settings,
+    summarize,
+    transcript,
+    turn_starts,
+    turns_to_summarize,
+    with_summary,
+)
+from oterm.types import SummaryModel
+
+
+def _history(turns: int, size: int = 10) -> list[ModelMessage]:
+    history: list[ModelMessage] = []
+    for i in range(turns):
+        history.append(ModelRequest(parts=[UserPromptPart(content=f"q{i}" * size)]))
+        history.append(ModelResponse(parts=[TextPart(content=f"a{i}" * size)]))
+    return history
+
+
+class TestSettings:
+    def test_off_without_a_model(self, app_config):
+        assert compaction_settings() is None
+        app_config.set("compaction", {"threshold": 100})
+        assert compaction_settings() is None
+
+    def test_defaults(self, app_config):
+        app_config.set("compaction", {"model": "small"})
+        assert compaction_settings() == {
+            "provider": "ollama",
+            "model": "small",
+            "threshold": COMPACTION_THRESHOLD,
+            "keepTurns": KEEP_TURNS,
+        }
+
+    def test_at_least_one_turn_is_kept(self, app_config):
+        app_config.set("compaction", {"model": "small", "keepTurns": 0})
+        settings = compaction_settings()
+        assert settings is not None
+        assert settings["keepTurns"] == 1
+
+
+class TestTurns:
+    def test_turn_starts_skip_tool_returns(self):
+        history = [
+            ModelRequest(parts=[UserPromptPart(content="q")]),
+            ModelResponse(parts=[ToolCallPart("t", {}, tool_call_id="c")]),
+            ModelRequest(parts=[ToolReturnPart("t", "r", tool_call_id="c")]),
+            ModelResponse(parts=[TextPart(content="a")]),
+            ModelRequest(parts=[UserPromptPart(content="q2")]),
+        ]
+        assert turn_starts(history) == [0, 4]
+
+    def test_with_summary_replaces_covered_turns(self):
+        history = _history(3)
+        summary = SummaryModel(chat_id=1, turns=2, text="earlier")
+        sent = with_summary(history, summary)
+        assert sent[1:] == history[4:]
+        first = sent[0]
+        assert isinstance(first, ModelRequest)
+        assert isinstance(first.parts[0], SystemPromptPart)
+        assert "earlier" in first.parts[0].content
+        # The same message is reused while the summary is unchanged.
+        assert with_summary(history, summary)[0] is first
+
+    def test_with_summary_keeps_history_it_does_not_cover(self):
+        history = _history(2)
+        assert with_summary(history, None) is history
+        stale = SummaryModel(chat_id=1, turns=5, text="x")
+        assert with_summary(history, stale) is history
+
+    def test_nothing_to_summarize_under_threshold(self):
+        assert turns_to_summarize(_history(10), None, 10_000, 4) == 0
+
+    def test_all_but_kept_turns_over_threshold(self):
+        assert turns_to_summarize(_history(10, size=100), None, 1000, 4) == 6
+
+    def test_summarized_turns_are_not_counted_again(self):
+        history = _history(10, size=100)
+        summary = SummaryModel(chat_id=1, turns=6, text="x")
+        assert turns_to_summarize(history, summary, 400, 4) == 0
+        assert turns_to_summarize(history + _history(1, 100), summary, 400, 4) == 7
+
+    def test_too_few_turns(self):
+        assert turns_to_summarize(_history(3, size=1000), None, 10, 4) == 0
+
+
+def test_transcript():
+    history = [
+        ModelRequest(
+            parts=[
+                UserPromptPart(
+                    content=["look", BinaryContent(data=b"x", media_type="image/png")]
+                )
+            ]
+        ),
+        ModelResponse(parts=[ToolCallPart("search", {"q": "cats"}, tool_call_id="c")]),
+        ModelRequest(parts=[ToolReturnPart("search", "r" * 1000, tool_call_id="c")]),
+        ModelResponse(parts=[TextPart(content="Cats.")]),
+    ]
+    text = transcript(history)
+    assert "User: look [image]" in text
+    assert 'Assistant called search({"q":"cats"})' in text
+    assert "search returned: " + "r" * 500 + "…" in text
+    assert text.endswith("Assistant: Cats.")
+
+
+def test_transcript_skips_system_and_thinking_parts():
+    history = [
+        ModelRequest(
+            parts=[
+                SystemPromptPart(content="Be brief."),
+                ToolReturnPart("clock", "noon", tool_call_id="c"),
+            ]
+        ),
+        ModelResponse(parts=[ThinkingPart(content="hmm"), TextPart(content="Noon.")]),
+    ]
+    assert transcript(history) == "clock returned: noon\nAssistant: Noon."
+
+
+async def test_summarize_folds_in_the_previous_summary(monkeypatch):
+    prompts: list[str] = []
+
+    def reply(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        request = messages[-1]
+        assert isinstance(request, ModelRequest)
+        part = request.parts[-1]
+        assert isinstance(part, UserPromptPart)
+        assert isinstance(part.content, str)
+        prompts.append(part.content)
+        assert info.instructions == compaction_mod.SUMMARY_INSTRUCTIONS
+        return ModelResponse(parts=[TextPart(content=" new summary \n")])
+
+    seen: list[tuple] = []
+
+    def fake_get_agent(**kwargs):
+        seen.append((kwargs["provider"], kwargs["model"]))
+        return Agent(FunctionModel(reply), instructions=kwargs["system"])
+
+    monkeypatch.setattr(compaction_mod, "get_agent", fake_get_agent)
+
+    text = await summarize("ollama", "small", "old summary", _history(1))
+    assert text == "new summary"
+    assert seen == [("ollama", "small")]
+    assert prompts[0].startswith("Summary so far:\n\nold summary")
+    assert "User: q0" in prompts[0]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_summary_messages():
+    compaction_mod.summary_message.cache_clear()
@@ -0,0 +1,205 @@
+import pytest
+from pydantic_ai.messages import (
+    BinaryContent,
+    FilePart,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+import oterm.context as context_mod
+from oterm.context import (
+    IMAGE_TOKENS,
+    MESSAGE_TOKENS,
+    ContextWindow,
+    context_window_for,
+    estimate_tokens,
+)
+from oterm.providers.capabilities import ModelCapabilities
+
+
+def _turn(prompt: str, answer: str) -> list:
+    return [
+        ModelRequest(parts=[UserPromptPart(content=prompt)]),
+        ModelResponse(parts=[TextPart(content=answer)]),
+    ]
+
+
+def _tool_turn(prompt: str) -> list:
+    return [
+        ModelRequest(parts=[UserPromptPart(content=prompt)]),
+        ModelResponse(parts=[ToolCallPart("lookup", {"q": "x"}, tool_call_id="c1")]),
+        ModelRequest(parts=[ToolReturnPart("lookup", "y" * 400, tool_call_id="c1")]),
+        ModelResponse(parts=[TextPart(content="done")]),
+    ]
+
+
+class TestEstimateTokens:
+    def test_text_is_about_four_chars_per_token(self):
+        message = ModelResponse(parts=[TextPart(content="x" * 400)])
+        assert estimate_tokens(message) == MESSAGE_TOKENS + 100
+
+    def test_images_have_a_flat_cost(self):
+        image = BinaryContent(data=b"png", media_type="image/png")
+        message = ModelRequest(parts=[UserPromptPart(content=["abcd", image])])
+        assert estimate_tokens(message) == MESSAGE_TOKENS + 1 + IMAGE_TOKENS
+
+    def test_tool_calls_and_returns_count(self):
+        call, ret = _tool_turn("q")[1:3]
+        assert estimate_tokens(call) > MESSAGE_TOKENS
+        assert estimate_tokens(ret) >= MESSAGE_TOKENS + 100
+
+    def test_retry_prompts_count(self):
+        message = ModelRequest(parts=[RetryPromptPart(content="x" * 400)])
+        assert estimate_tokens(message) > MESSAGE_TOKENS + 100
+
+    def test_files_have_an_image_cost(self):
+        image = BinaryContent(data=b"png", media_type="image/png")
+        message = ModelResponse(parts=[FilePart(content=image)])
+        assert estimate_tokens(message) == MESSAGE_TOKENS + IMAGE_TOKENS
+
+
+class TestContextWindow:
+    def test_without_a_window_history_is_kept(self):
+        history = _turn("a" * 4000, "b" * 4000)
+        window = ContextWindow()
+        assert window.fit(history, "next") == history
+        assert window.budget is None
+        assert window.used > 2000
+
+    def test_budget_reserves_room_for_the_response(self):
+        assert ContextWindow(1000).budget == 750
+        assert ContextWindow(1000, max_tokens=100).budget == 900
+
+    def test_reserve_larger_than_the_window_leaves_no_budget(self):
+        window = ContextWindow(1000, max_tokens=4000)
+        assert window.budget == 0
+        assert window.fit(_turn("a", "b"), "next") == []
+
+    def test_oldest_turns_are_dropped_to_fit(self):
+        old = _turn("a" * 2000, "b" * 2000)
+        recent = _turn("c" * 40, "d" * 40)
+        window = ContextWindow(800)
+        fitted = window.fit(old + recent, "next")
+        assert fitted == recent
+        assert window.dropped_turns == 1
+        assert window.used <= window.budget  # ty: ignore[unsupported-operator]
+
+    def test_tool_call_stays_with_its_return(self):
+        tool = _tool_turn("first")
+        recent = _turn("c" * 40, "d" * 40)
+        history = tool + recent
+        window = ContextWindow(200)
+        fitted = window.fit(history, "next")
+        assert fitted == recent
+
+        window = ContextWindow(10_000)
+        assert window.fit(history, "next") == history
+
+    def test_everything_is_dropped_if_nothing_fits(self):
+        window = ContextWindow(10)
+        assert window.fit(_turn("a" * 400, "b" * 400), "next") == []
+        assert window.dropped_turns == 1
+
+    def test_estimates_are_reused_for_a_growing_history(self, monkeypatch):
+        counted: list = []
+        real = context_mod.estimate_tokens
+
+        def counting(message):
+            counted.append(message)
+            return real(message)
+
+        monkeypatch.setattr(context_mod, "estimate_tokens", counting)
+        first = _turn("a", "b")
+        window = ContextWindow(10_000)
+        window.fit(first, "next")
+        counted.clear()
+        window.fit(first + _turn("c", "d"), "next")
+        # The two new messages and the prompt.
+        assert len(counted) == 3
+
+
+def _capabilities(monkeypatch, **kwargs) -> None:
+    monkeypatch.setattr(
+        context_mod,
+        "cached_capabilities",
+        lambda provider, model: ModelCapabilities(**kwargs),
+    )
+
+
+class TestContextWindowFor:
+    def test_config_overrides_provider(self, app_config, monkeypatch):
+        _capabilities(monkeypatch, num_ctx=4096)
+        assert context_window_for("ollama", "llama3") == 4096
+        app_config.set("contextWindows", {"llama3": 32768})
+        assert context_window_for("ollama", "llama3") == 32768
+
+    def test_for_chat_uses_max_tokens(self, monkeypatch):
+        _capabilities(monkeypatch, num_ctx=8000)
+        window = ContextWindow.for_chat("ollama", "m", {"max_tokens": 1000})
+        assert window.budget == 7000
+
+    def test_unfetched_capabilities_leave_window_unknown(self, monkeypatch):
+        from oterm.providers import ollama as ollama_mod
+
+        monkeypatch.setattr(ollama_mod, "show_model", pytest.fail)
+        assert context_window_for("ollama", "llama3") is None
+
+    def test_ollama_runs_models_with_its_default_context(self, monkeypatch):
+        from oterm.config import envConfig
+
+        _capabilities(monkeypatch, context_length=131072)
+        assert context_window_for("ollama", "llama3") == 4096
+        monkeypatch.setattr(envConfig, "OLLAMA_CONTEXT_LENGTH", 16384)
+        assert context_window_for("ollama", "llama3") == 16384
+
+    def test_chat_num_ctx_overrides_the_modelfile(self, monkeypatch):
+        _capabilities(monkeypatch, num_ctx=8192, context_length=32768)
+        options = {"extra_body": {"options": {"num_ctx": 16384}}}
+        assert context_window_for("ollama", "llama3", options) == 16384
+        assert context_window_for("ollama", "llama3", {"extra_body": "x"}) == 8192
+
+    def test_window_is_capped_at_the_trained_length(self, monkeypatch):
+        _capabilities(monkeypatch, context_length=2048)
+        assert context_window_for("ollama", "llama3") == 2048
+        options = {"extra_body": {"options": {"num_ctx": 65536}}}
+        assert context_window_for("ollama", "llama3", options) == 2048
+
+    def test_other_providers_use_the_reported_length(self, monkeypatch):
+        _capabilities(monkeypatch, context_length=200000)
+        assert context_window_for("anthropic", "claude") == 200000
+        _capabilities(monkeypatch)
+        assert context_window_for("anthropic", "claude") is None
+
+
+@pytest.mark.parametrize(
+    ("info", "num_ctx", "context_length"),
+    [
+        ({"parameters": "stop <end>\nnum_ctx 8192"}, 8192, None),
+        ({"modelinfo": {"llama.context_length": 131072}}, None, 131072),
+        (
+            {
+                "parameters": "num_ctx 4096",
+                "modelinfo": {"llama.context_length": 131072},
+            },
+            4096,
+            131072,
+        ),
+        (
+            {"modelinfo": {"general.context_length": "n/a", "llama.context_length": 8}},
+            None,
+            8,
+        ),
+        ({}, None, None),
+    ],
+)
+def test_ollama_context_sizes(info, num_ctx, context_length):
+    from oterm.providers.capabilities import remember_ollama_capabilities
+
+    caps = remember_ollama_capabilities("m", {"capabilities": [], **info})
+    assert caps.num_ctx == num_ctx
+    assert caps.context_length == context_length
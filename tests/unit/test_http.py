@@ -0,0 +1,54 @@
+import httpx
+
+from oterm.providers import http as http_mod
+from oterm.providers.http import (
+    clear_http_clients,
+    close_http_clients,
+    get_http_client,
+    shared_client,
+)
+
+
+class TestGetHttpClient:
+    def test_same_server_shares_a_client(self):
+        client = get_http_client("http://h:1/v1")
+        assert isinstance(client, httpx.AsyncClient)
+        assert get_http_client("http://h:1/other") is client
+
+    def test_servers_get_their_own_client(self):
+        assert get_http_client("http://a:1") is not get_http_client("http://b:1")
+        assert get_http_client("http://a:1") is not get_http_client("https://a:1")
+
+    def test_verify_setting_is_part_of_the_key(self, monkeypatch):
+        import oterm.config
+
+        monkeypatch.setattr(oterm.config.envConfig, "OTERM_VERIFY_SSL", True)
+        verified = get_http_client("https://h")
+        monkeypatch.setattr(oterm.config.envConfig, "OTERM_VERIFY_SSL", False)
+        assert get_http_client("https://h") is not verified
+
+    async def test_closed_client_is_replaced(self):
+        client = get_http_client("http://h:1")
+        await client.aclose()
+        assert get_http_client("http://h:1") is not client
+
+    def test_clear_forgets_clients(self):
+        client = get_http_client("http://h:1")
+        clear_http_clients()
+        assert get_http_client("http://h:1") is not client
+
+
+class TestCloseHttpClients:
+    async def test_closes_async_and_blocking_clients(self):
+        class _Blocking:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        client = get_http_client("http://h:1")
+        blocking = shared_client("blocking", "h", lambda verify: _Blocking())
+        await close_http_clients()
+        assert client.is_closed
+        assert blocking.closed
+        assert http_mod._clients == {}
@@ -0,0 +1,141 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image as PILImage
+from PIL import UnidentifiedImageError
+
+from oterm.images import (
+    MAX_DIMENSION,
+    format_size,
+    image_media_type,
+    image_settings,
+    prepare_image,
+)
+
+
+def _open(data: bytes) -> PILImage.Image:
+    return PILImage.open(BytesIO(data))
+
+
+class TestSettings:
+    def test_defaults_per_provider(self, app_config):
+        assert image_settings("anthropic", "claude") == {
+            "maxDimension": MAX_DIMENSION,
+            "quality": 85,
+            "format": "auto",
+        }
+        assert image_settings("openai-chat", "gpt-4.1")["maxDimension"] == 2048
+
+    def test_models_override_providers_override_defaults(self, app_config):
+        app_config.set(
+            "images",
+            {
+                "maxDimension": 1024,
+                "quality": 70,
+                "providers": {"ollama": {"maxDimension": 896, "format": "png"}},
+                "models": {"llava": {"maxDimension": 672}},
+            },
+        )
+        assert image_settings("anthropic", "claude") == {
+            "maxDimension": 1024,
+            "quality": 70,
+            "format": "auto",
+        }
+        assert image_settings("ollama", "gemma3") == {
+            "maxDimension": 896,
+            "quality": 70,
+            "format": "png",
+        }
+        assert image_settings("ollama", "llava")["maxDimension"] == 672
+
+    def test_unknown_format_falls_back_to_auto(self, app_config):
+        app_config.set("images", {"format": "tiff"})
+        assert image_settings("ollama", "llava")["format"] == "auto"
+
+
+class TestPrepare:
+    def test_large_photo_is_downscaled_to_jpeg(self, make_image):
+        data = make_image((4000, 3000), format="PNG")
+        prepared = prepare_image(data, max_dimension=1000)
+        assert prepared.media_type == "image/jpeg"
+        assert (prepared.width, prepared.height) == (1000, 750)
+        assert prepared.original_size == len(data)
+        with _open(prepared.data) as image:
+            assert (image.format, image.size) == ("JPEG", (1000, 750))
+
+    def test_image_that_fits_is_sent_as_it_is(self, make_image):
+        data = make_image((800, 600), format="PNG")
+        prepared = prepare_image(data, max_dimension=1000)
+        assert prepared.data == data
+        assert prepared.media_type == "image/png"
+
+    def test_transparency_is_kept_as_png(self, make_image):
+        data = make_image((2000, 1000), format="PNG", mode="RGBA")
+        prepared = prepare_image(data, max_dimension=1000)
+        assert prepared.media_type == "image/png"
+        with _open(prepared.data) as image:
+            assert image.mode == "RGBA"
+
+    def test_other_formats_are_re_encoded(self, make_image):
+        prepared = prepare_image(make_image((10, 10), format="GIF", mode="P"))
+        assert prepared.media_type == "image/jpeg"
+
+    def test_chosen_format(self, make_image):
+        prepared = prepare_image(make_image((10, 10), format="JPEG"), format="webp")
+        assert prepared.media_type == "image/webp"
+        with _open(prepared.data) as image:
+            assert image.format == "WEBP"
+
+    def test_no_max_dimension_keeps_the_size(self, make_image):
+        prepared = prepare_image(make_image((3000, 10), format="GIF", mode="P"), None)
+        assert (prepared.width, prepared.height) == (3000, 10)
+
+    def test_exif_orientation_is_applied(self, make_image):
+        exif = PILImage.Exif()
+        exif[0x0112] = 6  # Rotated 90° clockwise.
+        prepared = prepare_image(make_image((40, 20), format="JPEG", exif=exif))
+        assert (prepared.width, prepared.height) == (20, 40)
+
+    @pytest.mark.parametrize("format", ["JPEG", "PNG"])
+    def test_location_is_not_sent(self, make_image, format):
+        exif = PILImage.Exif()
+        exif[0x8825] = {1: "N", 2: (37.0, 58.0, 12.0)}  # GPSInfo
+        data = make_image((40, 20), format=format, exif=exif)
+        with _open(data) as image:
+            assert image.getexif().get_ifd(0x8825)
+
+        prepared = prepare_image(data)
+        with _open(prepared.data) as image:
+            assert not image.getexif().get_ifd(0x8825)
+            assert "exif" not in image.info
+
+    def test_text_chunks_are_not_sent(self):
+        from PIL.PngImagePlugin import PngInfo
+
+        info = PngInfo()
+        info.add_text("Comment", "taken at home")
+        buf = BytesIO()
+        PILImage.new("RGB", (40, 20), "red").save(buf, format="PNG", pnginfo=info)
+
+        prepared = prepare_image(buf.getvalue())
+        assert prepared.data != buf.getvalue()
+        with _open(prepared.data) as image:
+            assert not image.info.get("Comment")
+
+    def test_unreadable_image_raises(self):
+        with pytest.raises(UnidentifiedImageError):
+            prepare_image(b"not an image")
+
+
+def test_media_type_from_signature(make_image):
+    assert image_media_type(make_image((4, 4), format="JPEG")) == "image/jpeg"
+    assert image_media_type(make_image((4, 4), format="PNG")) == "image/png"
+    assert image_media_type(make_image((4, 4), format="GIF", mode="P")) == "image/gif"
+    assert image_media_type(make_image((4, 4), format="WEBP")) == "image/webp"
+    assert image_media_type(b"unknown") == "image/png"
+
+
+def test_format_size():
+    assert format_size(999) == "999 B"
+    assert format_size(240_400) == "240 KB"
+    assert format_size(3_160_000) == "3.2 MB"
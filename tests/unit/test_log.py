@@ -0,0 +1,186 @@
+import logging
+from collections.abc import Iterator
+
+import pytest
+from textual import LogGroup
+
+import oterm.log
+from oterm.log import (
+    LogBuffer,
+    configure_logging,
+    log,
+    start_file_sink,
+    stop_file_sink,
+)
+
+
+@pytest.fixture
+def buffer(monkeypatch) -> Iterator[LogBuffer]:
+    """A fresh `log_lines`, so configuring it leaves the real one alone."""
+    buffer = LogBuffer()
+    monkeypatch.setattr(oterm.log, "log_lines", buffer)
+    yield buffer
+    stop_file_sink()
+
+
+class TestLogBuffer:
+    def test_keeps_the_most_recent_lines(self):
+        buffer = LogBuffer(capacity=3)
+        for i in range(5):
+            buffer.append((LogGroup.INFO, str(i)))
+        assert [line for _, line in buffer] == ["2", "3", "4"]
+        assert buffer.total == 5
+
+    def test_lines_below_the_level_are_dropped(self):
+        buffer = LogBuffer(level=logging.WARNING)
+        buffer.append((LogGroup.DEBUG, "d"))
+        buffer.append((LogGroup.INFO, "i"))
+        buffer.append((LogGroup.ERROR, "e"))
+        assert list(buffer) == [(LogGroup.ERROR, "e")]
+        assert buffer.total == 1
+
+    def test_since_returns_what_is_still_held(self):
+        buffer = LogBuffer(capacity=3)
+        for i in range(2):
+            buffer.append((LogGroup.INFO, str(i)))
+        assert buffer.since(buffer.total) == []
+        assert [line for _, line in buffer.since(1)] == ["1"]
+        for i in range(2, 6):
+            buffer.append((LogGroup.INFO, str(i)))
+        # Lines 2 to 5 were added, but only the last 3 are held.
+        assert [line for _, line in buffer.since(2)] == ["3", "4", "5"]
+
+    def test_subscribers_hear_of_kept_lines(self):
+        buffer = LogBuffer(level=logging.INFO)
+        calls: list[int] = []
+
+        def subscriber() -> None:
+            calls.append(buffer.total)
+
+        buffer.subscribe(subscriber)
+        buffer.append((LogGroup.INFO, "kept"))
+        buffer.append((LogGroup.DEBUG, "dropped"))
+        buffer.unsubscribe(subscriber)
+        buffer.append((LogGroup.INFO, "unheard"))
+        assert calls == [1]
+
+    def test_configure_keeps_the_latest_lines(self):
+        buffer = LogBuffer()
+        for i in range(5):
+            buffer.append((LogGroup.INFO, str(i)))
+        buffer.configure(2, logging.INFO)
+        assert [line for _, line in buffer] == ["3", "4"]
+        buffer.append((LogGroup.DEBUG, "d"))
+        assert len(buffer) == 2
+
+    def test_lines_are_indexed_oldest_first(self):
+        buffer = LogBuffer(capacity=3)
+        for i in range(4):
+            buffer.append((LogGroup.INFO, str(i)))
+        assert buffer[0] == (LogGroup.INFO, "1")
+        assert buffer[-1] == (LogGroup.INFO, "3")
+        assert [line for _, line in buffer[1:]] == ["2", "3"]
+        assert [line for _, line in buffer[::-2]] == ["3", "1"]
+        buffer.clear()
+        assert len(buffer) == 0
+        assert buffer.since(0) == []
+
+    def test_lines_kept_from_many_threads_are_all_counted(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        buffer = LogBuffer(capacity=10)
+
+        def log_lines(thread: int) -> None:
+            for i in range(1000):
+                buffer.append((LogGroup.INFO, f"{thread}:{i}"))
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(log_lines, range(8)))
+        assert buffer.total == 8000
+        assert len(buffer.since(7990)) == 10
+
+    def test_iterating_while_lines_are_kept_elsewhere(self):
+        import threading
+
+        buffer = LogBuffer(capacity=1000)
+        done = threading.Event()
+
+        def keep_logging() -> None:
+            while not done.is_set():
+                buffer.append((LogGroup.INFO, "line"))
+
+        thread = threading.Thread(target=keep_logging)
+        thread.start()
+        try:
+            for _ in range(200):
+                assert all(line == "line" for _, line in buffer)
+        finally:
+            done.set()
+            thread.join()
+
+
+def test_logger_appends_to_the_buffer(buffer):
+    log.warning("careful", code=1)
+    assert list(buffer) == [(LogGroup.WARNING, "careful code=1")]
+
+
+def test_configure_from_config(buffer, app_config, tmp_data_dir):
+    app_config.set("logs", {"level": "warning", "lines": 10})
+    configure_logging()
+    assert buffer.level == logging.WARNING
+    log.info("dropped")
+    log.error("kept")
+    assert [line for _, line in buffer] == ["kept"]
+    assert not (tmp_data_dir / "logs").exists()
+
+
+@pytest.mark.parametrize("lines", ["many", 0, None, [5]])
+def test_invalid_buffer_size_falls_back_to_the_default(
+    buffer, app_config, tmp_data_dir, lines
+):
+    app_config.set("logs", {"lines": lines})
+    configure_logging()
+    assert buffer.capacity == oterm.log.LOG_CAPACITY
+    [(group, line)] = list(buffer)
+    assert group == LogGroup.WARNING
+    assert f"Invalid logs.lines {lines!r}" in line
+
+
+def test_log_file_is_always_rotated(buffer, app_config, tmp_data_dir, monkeypatch):
+    sinks: list[tuple[int, int]] = []
+    monkeypatch.setattr(
+        oterm.log,
+        "start_file_sink",
+        lambda path, max_bytes, backups: sinks.append((max_bytes, backups)),
+    )
+    app_config.set("logs", {"file": True, "fileSize": 0, "fileCount": 0})
+    configure_logging()
+    assert sinks == [(oterm.log.LOG_FILE_SIZE, 0)]
+    assert "Invalid logs.fileSize 0" in buffer[-1][1]
+
+
+def test_file_sink_writes_kept_lines(buffer, app_config, tmp_data_dir):
+    app_config.set("logs", {"level": "info", "file": True})
+    configure_logging()
+    log.debug("dropped")
+    log.info("hello")
+    log.error("boom")
+    stop_file_sink()
+    text = (tmp_data_dir / "logs" / "oterm.log").read_text(encoding="utf-8")
+    assert "dropped" not in text
+    assert "[INFO] hello" in text
+    assert "[ERROR] boom" in text
+
+
+def test_file_sink_rotates(buffer, tmp_path):
+    path = tmp_path / "logs" / "oterm.log"
+    start_file_sink(path, max_bytes=200, backups=2)
+    for i in range(20):
+        log.info(f"line {i:02} " + "x" * 40)
+    stop_file_sink()
+    assert sorted(p.name for p in path.parent.iterdir()) == [
+        "oterm.log",
+        "oterm.log.1",
+        "oterm.log.2",
+    ]
+    assert "line 19" in path.read_text(encoding="utf-8")
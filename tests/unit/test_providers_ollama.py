@@ -45,6 +45,10 @@ class TestClientWrappers:
         monkeypatch.setattr(ollama_mod, "Client", _FakeClient)
         assert ollama_mod.show_model("llama3") == "show-llama3"
 
+    def test_client_is_reused_across_calls(self, monkeypatch):
+        monkeypatch.setattr(ollama_mod, "Client", _FakeClient)
+        assert ollama_mod.ollama_client() is ollama_mod.ollama_client()
+
 
 class TestOllamaClientHost:
     def test_passthrough_for_plain_host(self, monkeypatch):
@@ -1,7 +1,8 @@
 import aiosqlite
+import pytest
 
-from oterm.store.store import Store
-from oterm.types import ChatModel, MessageModel
+from oterm.store.store import Store, dump_turn, load_turn
+from oterm.types import ChatModel, MessageModel, SummaryModel
 
 
 async def test_fresh_db_is_created(tmp_data_dir):
@@ -10,6 +11,46 @@ async def test_fresh_db_is_created(tmp_data_dir):
     assert store.db_path == tmp_data_dir / "store.db"
 
 
+async def test_fresh_db_is_not_upgraded_again(tmp_data_dir, monkeypatch):
+    import importlib.metadata as meta
+
+    from oterm.store.store import image_hash
+
+    # A development install, older than the schema it creates.
+    monkeypatch.setattr(meta, "version", lambda name: "0.19.5")
+    store = await Store.get_store()
+    assert await store.get_user_version() == "0.20.0"
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    hash = await store.save_image(b"png")
+    await store.save_message(
+        MessageModel(chat_id=chat_id, role="user", text="look", images=[hash])
+    )
+    await Store.close_store()
+
+    monkeypatch.setattr(meta, "version", lambda name: "0.20.0")
+    store = await Store.get_store()
+    [message] = await store.get_messages(chat_id)
+    assert message.images == [hash] == [image_hash(b"png")]
+    assert await store.get_image(hash) == b"png"
+
+
+async def test_fresh_db_indexes_messages_by_chat(store: Store):
+    rows = await store.connection.execute_fetchall("PRAGMA index_info(message_chat_id)")
+    assert [name for _, _, name in rows] == ["chat_id", "id"]
+
+
+async def test_connection_pragmas(store: Store):
+    async def pragma(name: str):
+        rows = await store.connection.execute_fetchall(f"PRAGMA {name}")
+        return list(rows)[0][0]
+
+    assert await pragma("journal_mode") == "wal"
+    assert await pragma("synchronous") == 1  # NORMAL
+    assert await pragma("cache_size") == -32000
+    assert await pragma("mmap_size") == 268435456
+    assert await pragma("foreign_keys") == 1
+
+
 async def test_store_is_singleton_per_process(tmp_data_dir):
     a = await Store.get_store()
     b = await Store.get_store()
@@ -34,6 +75,28 @@ async def test_singleton_reset_picks_up_new_data_dir(
     assert second is not first
 
 
+async def test_operations_share_one_connection(store: Store):
+    connection = store.connection
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    await store.save_message(MessageModel(chat_id=chat_id, role="user", text="hi"))
+    await store.get_messages(chat_id)
+    assert store.connection is connection
+
+
+async def test_close_drops_singleton(tmp_data_dir):
+    first = await Store.get_store()
+    await first.close()
+    assert Store._store is None
+
+    second = await Store.get_store()
+    assert second is not first
+    assert await second.get_chats() == []
+
+    # Closing a stale instance leaves the current singleton alone.
+    await first.close()
+    assert Store._store is second
+
+
 async def test_save_and_get_chats(store: Store):
     chat = ChatModel(
         name="c1",
@@ -71,6 +134,19 @@ async def test_get_chat_missing_returns_none(store: Store):
     assert await store.get_chat(9999) is None
 
 
+async def test_save_chat_with_existing_id_keeps_messages(store: Store):
+    chat = ChatModel(name="c", model="m")
+    chat.id = await store.save_chat(chat)
+    await store.save_message(MessageModel(chat_id=chat.id, role="user", text="hi"))
+
+    chat.name = "overwritten"
+    assert await store.save_chat(chat) == chat.id
+
+    found = await store.get_chat(chat.id)
+    assert found is not None and found.name == "overwritten"
+    assert len(await store.get_messages(chat.id)) == 1
+
+
 async def test_rename_chat(store: Store):
     chat = ChatModel(name="old", model="m")
     chat_id = await store.save_chat(chat)
@@ -124,6 +200,19 @@ async def test_save_and_get_messages(store: Store):
     assert messages[0].images == ["b64"]
 
 
+async def test_get_messages_in_insertion_order(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    other_id = await store.save_chat(ChatModel(name="o", model="m"))
+    for i in range(5):
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="user", text=str(i))
+        )
+        await store.save_message(MessageModel(chat_id=other_id, role="user", text="x"))
+
+    messages = await store.get_messages(chat_id)
+    assert [m.text for m in messages] == ["0", "1", "2", "3", "4"]
+
+
 async def test_clear_chat_removes_messages(store: Store):
     chat_id = await store.save_chat(ChatModel(name="c", model="m"))
     await store.save_message(MessageModel(chat_id=chat_id, role="user", text="a"))
@@ -133,6 +222,88 @@ async def test_clear_chat_removes_messages(store: Store):
     assert await store.get_messages(chat_id) == []
 
 
+async def test_save_image_is_content_addressed(store: Store):
+    import hashlib
+
+    first = await store.save_image(b"png-bytes")
+    second = await store.save_image(b"png-bytes")
+    assert first == second == hashlib.sha256(b"png-bytes").hexdigest()
+    assert await store.get_image(first) == b"png-bytes"
+    rows = await store.connection.execute_fetchall("SELECT COUNT(*) FROM image")
+    assert list(rows)[0][0] == 1
+
+
+async def test_get_images_omits_unknown_hashes(store: Store):
+    known = await store.save_image(b"a")
+    assert await store.get_images([known, "missing", known]) == {known: b"a"}
+    assert await store.get_images([]) == {}
+    assert await store.get_image("missing") is None
+
+
+async def test_unreferenced_images_are_pruned(store: Store):
+    shared = await store.save_image(b"shared")
+    only_a = await store.save_image(b"only a")
+    chat_a = await store.save_chat(ChatModel(name="a", model="m"))
+    chat_b = await store.save_chat(ChatModel(name="b", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=chat_a, role="user", text="x", images=[shared, only_a])
+    )
+    await store.save_message(
+        MessageModel(chat_id=chat_b, role="user", text="y", images=[shared])
+    )
+
+    await store.clear_chat(chat_a)
+    assert await store.get_images([shared, only_a]) == {shared: b"shared"}
+
+    await store.delete_chat(chat_b)
+    assert await store.get_image(shared) is None
+
+
+async def test_only_the_deleted_messages_images_are_pruned(store: Store):
+    # Saved ahead of the message that will reference it.
+    pending = await store.save_image(b"pending")
+    shared = await store.save_image(b"shared")
+    replaced = await store.save_image(b"replaced")
+    chat_id = await store.save_chat(ChatModel(name="a", model="m"))
+    message_id = await store.save_message(
+        MessageModel(chat_id=chat_id, role="user", text="x", images=[shared])
+    )
+    await store.save_message(
+        MessageModel(
+            id=message_id, chat_id=chat_id, role="user", text="x", images=[replaced]
+        )
+    )
+    other = await store.save_chat(ChatModel(name="b", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=other, role="user", text="y", images=[shared])
+    )
+
+    await store.delete_chat(chat_id)
+    assert await store.get_images([pending, shared, replaced]) == {
+        pending: b"pending",
+        shared: b"shared",
+    }
+
+
+async def test_pruned_images_lose_their_thumbnails(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+):
+    import oterm.store.store as store_mod
+
+    discarded: list[list[str]] = []
+    monkeypatch.setattr(store_mod, "discard_thumbnails", discarded.append)
+    kept = await store.save_image(b"kept")
+    dropped = await store.save_image(b"dropped")
+    for image in (kept, dropped):
+        chat_id = await store.save_chat(ChatModel(name=image, model="m"))
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="assistant", text="x", images=[image])
+        )
+
+    await store.clear_chat(chat_id)
+    assert discarded == [[dropped]]
+
+
 async def test_user_version_round_trip(store: Store):
     await store.set_user_version("1.2.3")
     assert await store.get_user_version() == "1.2.3"
@@ -187,6 +358,78 @@ async def test_existing_db_triggers_upgrades(tmp_data_dir, monkeypatch):
     assert await store.get_user_version() == "99.0.0"
 
 
+async def test_v0_19_db_gains_message_index(tmp_data_dir, monkeypatch):
+    import importlib.metadata as meta
+
+    db_path = tmp_data_dir / "store.db"
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.executescript(
+            """
+            CREATE TABLE chat (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                model TEXT NOT NULL,
+                system TEXT,
+                provider TEXT DEFAULT "ollama",
+                parameters TEXT DEFAULT "{}",
+                tools TEXT DEFAULT "[]",
+                thinking BOOLEAN DEFAULT 0
+            );
+            CREATE TABLE message (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                author TEXT NOT NULL,
+                text TEXT NOT NULL,
+                images TEXT DEFAULT "[]"
+            );
+            PRAGMA user_version = 4864;  -- 0.19.0
+            """
+        )
+    monkeypatch.setattr(meta, "version", lambda name: "0.20.0")
+
+    store = await Store.get_store()
+    rows = await store.connection.execute_fetchall("PRAGMA index_list(message)")
+    assert "message_chat_id" in {row[1] for row in rows}
+    assert await store.get_user_version() == "0.20.0"
+
+
+async def test_v0_19_db_is_upgraded_by_this_release(tmp_data_dir):
+    """A store made by 0.19.0 is migrated by the installed version of oterm."""
+    db_path = tmp_data_dir / "store.db"
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.executescript(
+            """
+            CREATE TABLE chat (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                model TEXT NOT NULL,
+                system TEXT,
+                provider TEXT DEFAULT "ollama",
+                parameters TEXT DEFAULT "{}",
+                tools TEXT DEFAULT "[]",
+                thinking BOOLEAN DEFAULT 0
+            );
+            CREATE TABLE message (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                author TEXT NOT NULL,
+                text TEXT NOT NULL,
+                images TEXT DEFAULT "[]"
+            );
+            INSERT INTO chat (name, model) VALUES ('old', 'm');
+            INSERT INTO message (chat_id, author, text)
+                VALUES (1, 'user', 'hello from before');
+            PRAGMA user_version = 4864;  -- 0.19.0
+            """
+        )
+
+    store = await Store.get_store()
+    [message] = await store.get_messages(1)
+    assert message.text == "hello from before"
+    assert message.history is None
+    assert [r.message_id for r in await store.search_messages("hello")] == [message.id]
+
+
 async def test_existing_db_skips_upgrades_if_current(tmp_data_dir, monkeypatch):
     """If db version >= current, no upgrade steps run."""
     import importlib.metadata as meta
@@ -210,3 +453,212 @@ async def test_existing_db_skips_upgrades_if_current(tmp_data_dir, monkeypatch):
 
     await Store.get_store()
     assert called is False
+
+
+async def test_save_and_get_summary(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    assert await store.get_summary(chat_id) is None
+
+    await store.save_summary(SummaryModel(chat_id=chat_id, turns=2, text="first"))
+    await store.save_summary(SummaryModel(chat_id=chat_id, turns=5, text="second"))
+    assert await store.get_summary(chat_id) == SummaryModel(
+        chat_id=chat_id, turns=5, text="second"
+    )
+
+
+async def test_clearing_or_deleting_a_chat_drops_its_summary(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    await store.save_summary(SummaryModel(chat_id=chat_id, turns=1, text="s"))
+    await store.clear_chat(chat_id)
+    assert await store.get_summary(chat_id) is None
+
+    await store.save_summary(SummaryModel(chat_id=chat_id, turns=1, text="s"))
+    await store.delete_chat(chat_id)
+    assert await store.get_summary(chat_id) is None
+
+
+async def test_turn_history_round_trips(store: Store):
+    from pydantic_ai.messages import (
+        ModelRequest,
+        ModelResponse,
+        TextPart,
+        ToolCallPart,
+        ToolReturnPart,
+    )
+
+    turn = [
+        ModelResponse(parts=[ToolCallPart("fetch", {"url": "x"}, tool_call_id="c")]),
+        ModelRequest(parts=[ToolReturnPart("fetch", "page " * 200, tool_call_id="c")]),
+        ModelResponse(parts=[TextPart(content="done")]),
+    ]
+    encoded = dump_turn(turn)
+    # Compressed: the repeated tool output shrinks to a fraction.
+    assert len(encoded) < 1000
+    assert load_turn(encoded) == turn
+
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=chat_id, role="assistant", text="done", history=encoded)
+    )
+    [message] = await store.get_messages(chat_id)
+    assert message.history == encoded
+
+
+def test_stored_images_are_referenced_from_turn_history():
+    import base64
+    import zlib
+
+    from pydantic_ai.messages import (
+        BinaryImage,
+        FilePart,
+        ModelRequest,
+        ModelResponse,
+        ToolReturnPart,
+    )
+
+    from oterm.store.store import image_hash
+
+    # Bytes whose base64 differs between the standard and URL-safe alphabets.
+    image = b"\x89PNG" + b"\xfb\xff" * 100_000
+    other = b"GIF89a\xfb\xff"
+    turn = [
+        ModelRequest(
+            parts=[
+                ToolReturnPart(
+                    "draw",
+                    [BinaryImage(data=image, media_type="image/png"), "drawn"],
+                    tool_call_id="c",
+                )
+            ]
+        ),
+        ModelResponse(
+            parts=[
+                FilePart(content=BinaryImage(data=image, media_type="image/png")),
+                FilePart(content=BinaryImage(data=other, media_type="image/gif")),
+            ]
+        ),
+    ]
+    encoded = dump_turn(turn, [image_hash(image)])
+    dumped = zlib.decompress(encoded)
+    assert len(dumped) < 10_000
+    # Images that aren't stored stay inline.
+    assert base64.urlsafe_b64encode(other) in dumped
+    assert load_turn(encoded, {image_hash(image): image}) == load_turn(dump_turn(turn))
+    # Without its image the turn can't be replayed.
+    assert load_turn(encoded) is None
+
+
+def test_unreadable_turn_history_is_ignored():
+    import zlib
+
+    assert load_turn(b"not compressed") is None
+    assert load_turn(zlib.compress(b'[{"kind": "nope"}]')) is None
+
+
+async def test_get_messages_pages_back_from_the_end(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    other = await store.save_chat(ChatModel(name="other", model="m"))
+    ids = []
+    for i in range(5):
+        ids.append(
+            await store.save_message(
+                MessageModel(chat_id=chat_id, role="user", text=str(i))
+            )
+        )
+        await store.save_message(MessageModel(chat_id=other, role="user", text="x"))
+
+    async def texts(**kwargs) -> list[str]:
+        return [m.text for m in await store.get_messages(chat_id, **kwargs)]
+
+    assert await texts() == ["0", "1", "2", "3", "4"]
+    assert await texts(limit=2) == ["3", "4"]
+    assert await texts(before_id=ids[3], limit=2) == ["1", "2"]
+    assert await texts(before_id=ids[1], limit=2) == ["0"]
+    assert await texts(before_id=ids[3]) == ["0", "1", "2"]
+
+
+async def test_search_ranks_matches_across_chats(store: Store):
+    from oterm.store.store import SEARCH_MATCH_END, SEARCH_MATCH_START
+
+    first = await store.save_chat(ChatModel(name="first", model="m"))
+    second = await store.save_chat(ChatModel(name="second", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=first, role="user", text="how do I bake bread?")
+    )
+    bread = await store.save_message(
+        MessageModel(chat_id=second, role="assistant", text="Bread, bread, bread.")
+    )
+    await store.save_message(
+        MessageModel(chat_id=second, role="user", text="something else")
+    )
+
+    results = await store.search_messages("bread")
+    assert [(r.chat_name, r.role) for r in results] == [
+        ("second", "assistant"),
+        ("first", "user"),
+    ]
+    assert results[0].message_id == bread
+    assert results[0].chat_id == second
+    assert f"{SEARCH_MATCH_START}Bread{SEARCH_MATCH_END}" in results[0].snippet
+
+
+async def test_search_requires_every_word_and_matches_prefixes(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=chat_id, role="user", text="sourdough starter")
+    )
+    await store.save_message(MessageModel(chat_id=chat_id, role="user", text="Café"))
+
+    assert len(await store.search_messages("sourdough starter")) == 1
+    assert await store.search_messages("sourdough pizza") == []
+    assert len(await store.search_messages("sourd")) == 1
+    assert await store.search_messages("sourd ") == []
+    # One letter is too short a prefix.
+    assert await store.search_messages("sourdough s") == []
+    assert len(await store.search_messages("cafe")) == 1
+
+
+async def test_search_ranks_only_the_most_recent_matches(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    for text in ["toast toast toast", "toast", "toast and jam"]:
+        await store.save_message(MessageModel(chat_id=chat_id, role="user", text=text))
+
+    results = await store.search_messages("toast", candidates=2)
+    assert [r.snippet.replace("\x02", "").replace("\x03", "") for r in results] == [
+        "toast",
+        "toast and jam",
+    ]
+
+
+async def test_search_treats_query_syntax_literally(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    await store.save_message(
+        MessageModel(chat_id=chat_id, role="user", text='say "NEAR" AND (x)')
+    )
+    for query in ['"', "AND", "NEAR(", "x OR", "*", "   ", "(x)"]:
+        await store.search_messages(query)
+    assert len(await store.search_messages('"near" and')) == 1
+    assert await store.search_messages("*") == []
+
+
+async def test_search_index_follows_edits_and_deletes(store: Store):
+    chat_id = await store.save_chat(ChatModel(name="c", model="m"))
+    message = MessageModel(chat_id=chat_id, role="assistant", text="old answer")
+    message.id = await store.save_message(message)
+
+    # Regenerating overwrites the message in place.
+    message.text = "new answer"
+    assert await store.save_message(message) == message.id
+    assert await store.search_messages("old") == []
+    assert len(await store.search_messages("new")) == 1
+
+    await store.clear_chat(chat_id)
+    assert await store.search_messages("new") == []
+
+    await store.save_message(MessageModel(chat_id=chat_id, role="user", text="again"))
+    await store.delete_chat(chat_id)
+    assert await store.search_messages("again") == []
+    rows = await store.connection.execute_fetchall(
+        "INSERT INTO message_search(message_search) VALUES ('integrity-check');"
+    )
+    assert list(rows) == []
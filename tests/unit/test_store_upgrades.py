@@ -8,6 +8,14 @@ from oterm.store.upgrades.v0_15_0 import (
     migrate_tools_to_names,
 )
 from oterm.store.upgrades.v0_18_0 import rename_providers
+from oterm.store.upgrades.v0_20_0 import (
+    add_message_chat_index,
+    add_message_history_column,
+    add_message_image_index,
+    add_message_search_index,
+    add_summary_table,
+    move_images_to_image_table,
+)
 
 
 async def _old_chat_schema(db_path):
@@ -240,3 +248,186 @@ class TestRenameProviders:
                 ("c", "google-cloud"),
                 ("d", "ollama"),
             ]
+
+
+async def _old_message_schema(db_path):
+    async with aiosqlite.connect(db_path) as connection:
+        await connection.executescript(
+            """
+            CREATE TABLE message (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                author TEXT NOT NULL,
+                text TEXT NOT NULL,
+                images TEXT DEFAULT '[]'
+            );
+            """
+        )
+        await connection.commit()
+
+
+class TestAddMessageChatIndex:
+    async def test_creates_chat_id_index(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+
+        await add_message_chat_index(db)
+
+        async with aiosqlite.connect(db) as c:
+            rows = await c.execute_fetchall("PRAGMA index_info(message_chat_id)")
+            assert [name for _, _, name in rows] == ["chat_id", "id"]
+            plan = await c.execute_fetchall(
+                "EXPLAIN QUERY PLAN SELECT * FROM message WHERE chat_id = 1"
+            )
+            assert "message_chat_id" in list(plan)[0][3]
+
+    async def test_is_idempotent(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+
+        await add_message_chat_index(db)
+        await add_message_chat_index(db)
+
+
+class TestMoveImagesToImageTable:
+    async def test_replaces_base64_with_hashes(self, tmp_path):
+        import base64
+        import hashlib
+
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+        png = base64.b64encode(b"png").decode()
+        async with aiosqlite.connect(db) as c:
+            await c.executemany(
+                "INSERT INTO message(chat_id, author, text, images) VALUES(1, ?, ?, ?)",
+                [
+                    ("user", "a", json.dumps([png, "not-valid!!"])),
+                    ("user", "b", json.dumps([png])),
+                    ("assistant", "c", "[]"),
+                ],
+            )
+            await c.commit()
+
+        await move_images_to_image_table(db)
+
+        digest = hashlib.sha256(b"png").hexdigest()
+        async with aiosqlite.connect(db) as c:
+            rows = await c.execute_fetchall("SELECT images FROM message ORDER BY id")
+            assert [json.loads(images) for (images,) in rows] == [
+                [digest, "not-valid!!"],
+                [digest],
+                [],
+            ]
+            images = await c.execute_fetchall("SELECT hash, data FROM image")
+            assert list(images) == [(digest, b"png")]
+
+    async def test_hashes_of_stored_images_are_kept(self, tmp_path):
+        import base64
+        import hashlib
+
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+        image = bytes(range(256))
+        digest = hashlib.sha256(image).hexdigest()
+        # A hex digest is valid base64 as well.
+        assert base64.b64decode(digest, validate=True)
+        async with aiosqlite.connect(db) as c:
+            await c.execute(
+                "INSERT INTO message(chat_id, author, text, images) VALUES(1, ?, ?, ?)",
+                ("user", "a", json.dumps([base64.b64encode(image).decode()])),
+            )
+            await c.commit()
+
+        await move_images_to_image_table(db)
+        await move_images_to_image_table(db)
+
+        async with aiosqlite.connect(db) as c:
+            rows = await c.execute_fetchall("SELECT images FROM message")
+            assert [json.loads(images) for (images,) in rows] == [[digest]]
+            images = await c.execute_fetchall("SELECT hash, data FROM image")
+            assert list(images) == [(digest, image)]
+
+
+class TestAddSummaryTable:
+    async def test_creates_table_and_is_idempotent(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+
+        await add_summary_table(db)
+        await add_summary_table(db)
+
+        async with aiosqlite.connect(db) as c:
+            rows = await c.execute_fetchall("PRAGMA table_info(summary)")
+            assert [name for _, name, *_ in rows] == ["chat_id", "turns", "text"]
+
+
+class TestAddMessageHistoryColumn:
+    async def test_adds_column_once(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+
+        await add_message_history_column(db)
+        await add_message_history_column(db)
+
+        async with aiosqlite.connect(db) as c:
+            rows = await c.execute_fetchall("PRAGMA table_info(message)")
+            assert [name for _, name, *_ in rows][-2:] == ["images", "history"]
+
+
+class TestAddMessageSearchIndex:
+    async def test_indexes_existing_and_new_messages(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+        async with aiosqlite.connect(db) as c:
+            await c.execute(
+                "INSERT INTO message(chat_id, author, text) VALUES(1, 'user', 'old bread')"
+            )
+            await c.commit()
+
+        await add_message_search_index(db)
+        await add_message_search_index(db)
+
+        async with aiosqlite.connect(db) as c:
+            await c.execute(
+                "INSERT INTO message(chat_id, author, text) VALUES(1, 'user', 'new bread')"
+            )
+            await c.execute("UPDATE message SET text = 'old toast' WHERE id = 1")
+            await c.commit()
+            rows = await c.execute_fetchall(
+                "SELECT rowid FROM message_search WHERE message_search MATCH 'bread'"
+            )
+            assert list(rows) == [(2,)]
+            rows = await c.execute_fetchall(
+                "SELECT rowid FROM message_search WHERE message_search MATCH 'toast'"
+            )
+            assert list(rows) == [(1,)]
+
+
+class TestAddMessageImageIndex:
+    async def test_indexes_existing_and_new_references(self, tmp_path):
+        db = tmp_path / "store.db"
+        await _old_message_schema(db)
+        async with aiosqlite.connect(db) as c:
+            await c.execute(
+                "INSERT INTO message(chat_id, author, text, images) "
+                """VALUES(1, 'user', 'x', '["a", "b", "a"]')"""
+            )
+            await c.commit()
+
+        await add_message_image_index(db)
+        await add_message_image_index(db)
+
+        async with aiosqlite.connect(db) as c:
+            await c.execute(
+                """INSERT INTO message(chat_id, author, text, images) VALUES(1, 'user', 'y', '["b"]')"""
+            )
+            await c.execute("""UPDATE message SET images = '["c"]' WHERE id = 1""")
+            await c.commit()
+            rows = await c.execute_fetchall(
+                "SELECT message_id, hash FROM message_image ORDER BY hash"
+            )
+            assert list(rows) == [(2, "b"), (1, "c")]
+            plan = await c.execute_fetchall(
+                "EXPLAIN QUERY PLAN SELECT 1 FROM message_image WHERE hash = 'b'"
+            )
+            assert "message_image_hash" in list(plan)[0][3]
@@ -0,0 +1,89 @@
+import oterm.thumbnails as thumbnails
+from oterm.thumbnails import (
+    THUMBNAIL_SIZE,
+    cached_thumbnail,
+    cached_thumbnails,
+    discard_thumbnails,
+    make_thumbnail,
+    make_thumbnails,
+)
+
+
+def test_thumbnail_is_downscaled_and_kept_on_disk(make_image):
+    thumbnail = make_thumbnail("a", make_image((2048, 1024)))
+    assert thumbnail is not None
+    assert thumbnail.size == (THUMBNAIL_SIZE, THUMBNAIL_SIZE // 2)
+
+    thumbnails._memory.clear()
+    cached = cached_thumbnail("a")
+    assert cached is not None
+    assert cached.size == thumbnail.size
+    assert "a" in thumbnails._memory
+
+
+def test_small_images_keep_their_size(make_image):
+    thumbnail = make_thumbnail("a", make_image((40, 30), format="JPEG"))
+    assert thumbnail is not None
+    assert thumbnail.size == (40, 30)
+
+
+def test_modes_png_cannot_store_are_converted(make_image):
+    thumbnail = make_thumbnail("a", make_image((40, 30), format="JPEG", mode="CMYK"))
+    assert thumbnail is not None
+    assert thumbnail.mode in ("RGB", "RGBA")
+    thumbnails._memory.clear()
+    assert cached_thumbnail("a") is not None
+
+
+def test_memory_cache_keeps_the_most_recently_used(make_image, monkeypatch):
+    monkeypatch.setattr(thumbnails, "MEMORY_CACHE_SIZE", 2)
+    for hash in ("a", "b"):
+        make_thumbnail(hash, make_image((8, 8)))
+    cached_thumbnail("a")
+    make_thumbnail("c", make_image((8, 8)))
+    assert list(thumbnails._memory) == ["a", "c"]
+    # Still on disk.
+    assert cached_thumbnail("b") is not None
+
+
+def test_unreadable_images_are_left_out(make_image):
+    assert make_thumbnail("a", b"not an image") is None
+    images = {"a": b"not an image", "b": make_image((8, 8))}
+    assert make_thumbnails(images).keys() == {"b"}
+    assert cached_thumbnails(["a", "b", "b"]).keys() == {"b"}
+
+
+def test_unreadable_thumbnail_on_disk_is_dropped(tmp_path):
+    path = tmp_path / "thumbnails" / "a.png"
+    path.parent.mkdir()
+    path.write_bytes(b"truncated")
+    assert cached_thumbnail("a") is None
+    assert not path.exists()
+
+
+def test_unwritable_cache_only_keeps_thumbnails_in_memory(
+    make_image, tmp_path, monkeypatch
+):
+    import oterm.config
+
+    (tmp_path / "file").write_text("")
+    monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path / "file")
+    assert make_thumbnail("a", make_image((8, 8))) is not None
+    assert cached_thumbnail("a") is not None
+
+
+def test_make_thumbnails_reuses_cached_ones(make_image, monkeypatch):
+    make_thumbnail("a", make_image((8, 8)))
+    made: list[str] = []
+    monkeypatch.setattr(
+        thumbnails, "make_thumbnail", lambda hash, data: made.append(hash)
+    )
+    assert make_thumbnails({"a": b""}).keys() == {"a"}
+    assert made == []
+
+
+def test_discard_forgets_thumbnails(make_image, tmp_path):
+    make_thumbnail("a", make_image((8, 8)))
+    discard_thumbnails(["a", "unknown"])
+    assert "a" not in thumbnails._memory
+    assert not (tmp_path / "thumbnails" / "a.png").exists()
@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import time
 from collections.abc import AsyncIterator
 from pathlib import Path
 
@@ -29,7 +30,9 @@ from tests._helpers import wait_until
 class _Host(App):
     CSS_PATH = "../../src/oterm/app/oterm.tcss"
 
-    def __init__(self, chat_model: ChatModel, messages: list[MessageModel]):
+    def __init__(
+        self, chat_model: ChatModel, messages: list[MessageModel] | None = None
+    ):
         super().__init__()
         self._chat_model = chat_model
         self._messages = messages
@@ -90,6 +93,362 @@ class TestLoadMessages:
             await pilot.pause()
             assert len(list(container.query(ChatItem))) == 1
 
+    async def test_fetches_messages_from_store_when_not_given(self, store, chat_model):
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        await store.save_message(MessageModel(chat_id=chat_id, role="user", text="q"))
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="assistant", text="a")
+        )
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            assert container.messages == []
+            assert container.pydantic_history == []
+
+            await container.load_messages()
+            await pilot.pause()
+
+            assert [item.text for item in container.query(ChatItem)] == ["q", "a"]
+            # The full history is only read once it is needed.
+            assert container.messages == []
+            await container._fetch_messages()
+            assert [m.text for m in container.messages] == ["q", "a"]
+            assert len(container.pydantic_history) == 2
+
+    async def test_send_before_load_includes_stored_history(self, store, chat_model):
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="user", text="earlier")
+        )
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="assistant", text="reply")
+        )
+
+        seen: list[int] = []
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            seen.append(len(messages))
+            yield "ok"
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            await container.response_task("now")
+            await pilot.pause()
+
+            # Two stored messages plus the new prompt.
+            assert seen == [3]
+            assert [m.text for m in container.messages] == [
+                "earlier",
+                "reply",
+                "now",
+                "ok",
+            ]
+
+    async def test_history_is_trimmed_to_the_context_window(self, store, chat_model):
+        from oterm.context import ContextWindow
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="user", text="x" * 4000)
+        )
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="assistant", text="y" * 4000)
+        )
+
+        seen: list[int] = []
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            seen.append(len(messages))
+            yield "ok"
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+            container.context_window = ContextWindow(1000)
+
+            await container.response_task("now")
+            await pilot.pause()
+
+            # The long first turn doesn't fit and only the prompt is sent,
+            # but the chat keeps its whole history.
+            assert seen == [1]
+            assert container.context_window.dropped_turns == 1
+            assert len(container.pydantic_history) == 4
+
+    async def test_reload_replays_tool_calls_without_running_them(
+        self, store, chat_model
+    ):
+        from pydantic_ai import Tool
+        from pydantic_ai.messages import ModelRequest, ToolCallPart, ToolReturnPart
+        from pydantic_ai.models.function import DeltaToolCall
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        calls: list[str] = []
+
+        def fetch(url: str) -> str:
+            calls.append(url)
+            return f"contents of {url}"
+
+        def returned(messages: list[ModelMessage]) -> list[ToolReturnPart]:
+            return [
+                part
+                for m in messages
+                if isinstance(m, ModelRequest)
+                for part in m.parts
+                if isinstance(part, ToolReturnPart)
+            ]
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str | dict[int, DeltaToolCall]]:
+            if len(returned(messages)) == len(calls) and calls:
+                yield "done"
+                return
+            yield {
+                0: DeltaToolCall(
+                    name="fetch", json_args='{"url": "x.org"}', tool_call_id="tc-1"
+                )
+            }
+
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(
+                FunctionModel(stream_function=stream_fn), tools=[Tool(fetch)]
+            )
+            await container.response_task("fetch x.org")
+            await pilot.pause()
+        assert calls == ["x.org"]
+
+        seen: list[list[ModelMessage]] = []
+
+        async def follow_up(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            seen.append(messages)
+            yield "still done"
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container._fetch_messages()
+            history = container.pydantic_history
+            assert any(
+                isinstance(part, ToolCallPart) for m in history for part in m.parts
+            )
+            [tool_return] = returned(history)
+            assert tool_return.content == "contents of x.org"
+            assert [m.text for m in container.messages] == ["fetch x.org", "done"]
+
+            container.agent = Agent(
+                FunctionModel(stream_function=follow_up), tools=[Tool(fetch)]
+            )
+            await container.response_task("and?")
+            await pilot.pause()
+
+        assert calls == ["x.org"]
+        assert len(returned(seen[0])) == 1
+
+    async def test_unreadable_turn_falls_back_to_text(self, store, chat_model):
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        await store.save_message(MessageModel(chat_id=chat_id, role="user", text="q"))
+        await store.save_message(
+            MessageModel(chat_id=chat_id, role="assistant", text="a", history=b"junk")
+        )
+
+        app = _Host(chat_model)
+        async with app.run_test():
+            container = app.query_one(ChatContainer)
+            await container._fetch_messages()
+            [_, response] = container.pydantic_history
+            assert response.parts[0].content == "a"  # ty: ignore[unresolved-attribute]
+
+
+class TestCompaction:
+    async def test_summary_stands_in_for_covered_turns(self, store, chat_model):
+        from pydantic_ai.messages import ModelRequest, SystemPromptPart
+
+        from oterm.types import SummaryModel
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        for i in range(3):
+            await store.save_message(
+                MessageModel(chat_id=chat_id, role="user", text=f"q{i}")
+            )
+            await store.save_message(
+                MessageModel(chat_id=chat_id, role="assistant", text=f"a{i}")
+            )
+        await store.save_summary(SummaryModel(chat_id=chat_id, turns=2, text="gist"))
+
+        seen: list[list[ModelMessage]] = []
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            seen.append(messages)
+            yield "ok"
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            await container.response_task("now")
+            await pilot.pause()
+
+            # The summary (merged into the request that follows it), the last
+            # stored turn and the new prompt.
+            [messages] = seen
+            assert len(messages) == 3
+            first = messages[0]
+            assert isinstance(first, ModelRequest)
+            summary, prompt = first.parts
+            assert isinstance(summary, SystemPromptPart)
+            assert "gist" in summary.content
+            assert prompt.content == "q2"
+            # Everything is still kept and shown.
+            assert len(container.pydantic_history) == 8
+            assert len(container.messages) == 8
+
+    async def test_older_turns_are_summarized_in_the_background(
+        self, store, chat_model, app_config, monkeypatch
+    ):
+        import oterm.compaction as compaction_mod
+
+        app_config.set("compaction", {"model": "small", "threshold": 0, "keepTurns": 1})
+        summarized: list[str] = []
+
+        def summarize_fn(messages: list[ModelMessage], info: AgentInfo):
+            from pydantic_ai.messages import ModelResponse, TextPart
+
+            summarized.append(str(messages[-1].parts[-1].content))  # ty: ignore[unresolved-attribute]
+            return ModelResponse(parts=[TextPart(content=f"gist {len(summarized)}")])
+
+        monkeypatch.setattr(
+            compaction_mod,
+            "get_agent",
+            lambda **kwargs: Agent(FunctionModel(summarize_fn)),
+        )
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            yield "ok"
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            await container.response_task("first")
+            await pilot.pause()
+            assert container.summary is None
+
+            await container.response_task("second")
+            await wait_until(pilot, lambda: container.summary is not None)
+            assert container.summary is not None
+            assert container.summary.turns == 1
+            assert container.summary.text == "gist 1"
+            assert "User: first" in summarized[0]
+            assert "second" not in summarized[0]
+            assert await store.get_summary(chat_id) == container.summary
+
+            await container.response_task("third")
+            await wait_until(pilot, lambda: container.summary.turns == 2)
+            assert "Summary so far:\n\ngist 1" in summarized[1]
+            assert "first" not in summarized[1]
+
+            await container.action_clear_chat()
+            assert container.summary is None
+            assert await store.get_summary(chat_id) is None
+
+    async def test_summary_of_a_cleared_chat_is_dropped(
+        self, store, chat_model, app_config, monkeypatch
+    ):
+        import oterm.app.widgets.chat as chat_mod
+        from oterm.log import log_lines
+
+        app_config.set("compaction", {"model": "small", "threshold": 0, "keepTurns": 1})
+        release = asyncio.Event()
+
+        async def slow_summarize(*args) -> str:
+            await release.wait()
+            return "gist"
+
+        monkeypatch.setattr(chat_mod, "summarize", slow_summarize)
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            yield "ok"
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            await container.response_task("first")
+            await container.response_task("second")
+            assert container._compacting
+
+            before = log_lines.total
+            await container.action_clear_chat()
+            release.set()
+            await wait_until(pilot, lambda: not container._compacting)
+            assert container.summary is None
+            assert await store.get_summary(chat_id) is None
+            assert log_lines.since(before) == []
+
+    async def test_failed_summary_leaves_history_alone(
+        self, store, chat_model, app_config, monkeypatch
+    ):
+        import oterm.compaction as compaction_mod
+
+        app_config.set("compaction", {"model": "small", "threshold": 0, "keepTurns": 1})
+
+        def broken(**kwargs):
+            raise RuntimeError("no such model")
+
+        monkeypatch.setattr(compaction_mod, "get_agent", broken)
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            yield "ok"
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            await container.response_task("first")
+            await container.response_task("second")
+            await wait_until(pilot, lambda: not container._compacting)
+            assert not container._compacting
+            assert container.summary is None
+            assert len(container.pydantic_history) == 4
+
 
 class TestOnSubmit:
     async def test_empty_input_is_ignored(self, store, chat_model):
@@ -259,6 +618,56 @@ class TestImages:
             assert "image-token" in names
             assert "image-token" in textarea._theme.syntax_styles
 
+    async def test_selected_image_is_downscaled_for_the_model(
+        self, chat_model, app_config, tmp_path
+    ):
+        from io import BytesIO
+
+        from PIL import Image as PILImage
+
+        from oterm.app.widgets.image import ImageSelected
+
+        app_config.set("images", {"models": {"test-model": {"maxDimension": 500}}})
+        path = tmp_path / "photo.png"
+        PILImage.new("RGB", (2000, 1000), "red").save(path, format="PNG")
+
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await pilot.pause()
+
+            container.post_message(ImageSelected(path))
+            await wait_until(pilot, lambda: len(container.images) == 1)
+
+            added_path, b64 = container.images[0]
+            assert added_path == path
+            with PILImage.open(BytesIO(base64.b64decode(b64))) as image:
+                assert (image.format, image.size) == ("JPEG", (500, 250))
+            assert any(
+                "photo.png added" in n.message and "→" in n.message
+                for n in _notifications(app)
+            )
+
+    async def test_unreadable_image_is_not_added(self, chat_model, tmp_path):
+        from oterm.app.widgets.image import ImageSelected
+
+        path = tmp_path / "broken.png"
+        path.write_bytes(b"not an image")
+
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await pilot.pause()
+
+            container.post_message(ImageSelected(path))
+            await wait_until(
+                pilot,
+                lambda: any(
+                    "Could not read image" in n.message for n in _notifications(app)
+                ),
+            )
+            assert container.images == []
+
     async def test_backspace_inside_token_deletes_whole_token(self, chat_model):
         from oterm.app.widgets.image import ImageAdded
         from oterm.app.widgets.prompt import FlexibleInput, PostableTextArea
@@ -356,101 +765,654 @@ class TestImages:
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
-            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+
+            good = base64.b64encode(b"\x89PNG\r\n").decode()
+            bad = "not-valid-base64!!"
+
+            user_prompt, skipped = build_user_prompt("look", [good, bad])
+            assert skipped == 1
+
+            chunks = []
+            async for chunk in container.stream_agent(user_prompt):
+                chunks.append(chunk)
+
+            text = "".join(
+                p.content_delta for p in chunks if isinstance(p, TextPartDelta)
+            )
+            assert text == "ok response"
+            await pilot.pause()
+
+
+class TestBuildUserPrompt:
+    def test_no_tokens_no_images_returns_text(self):
+        from oterm.app.widgets.chat import build_user_prompt
+
+        assert build_user_prompt("hello", []) == ("hello", 0)
+
+    def test_no_tokens_with_images_appends_at_end(self):
+        from pydantic_ai import BinaryContent
+
+        from oterm.app.widgets.chat import build_user_prompt
+
+        good = base64.b64encode(b"\x89PNG\r\n").decode()
+        prompt, skipped = build_user_prompt("describe", [good])
+        assert skipped == 0
+        assert isinstance(prompt, list)
+        assert prompt[0] == "describe"
+        assert isinstance(prompt[1], BinaryContent)
+
+    def test_images_are_labelled_with_their_media_type(self):
+        from pydantic_ai import BinaryContent
+
+        from oterm.app.widgets.chat import build_user_prompt
+
+        jpeg = b"\xff\xd8\xff\xe0 jpeg"
+        prompt, _ = build_user_prompt(
+            "[Image #1] [Image #2]", [base64.b64encode(jpeg).decode(), b"\x89PNG\r\n"]
+        )
+        assert isinstance(prompt, list)
+        media_types = [p.media_type for p in prompt if isinstance(p, BinaryContent)]
+        assert media_types == ["image/jpeg", "image/png"]
+
+    def test_token_interleaves_image_at_position(self):
+        from pydantic_ai import BinaryContent
+
+        from oterm.app.widgets.chat import build_user_prompt
+
+        good = base64.b64encode(b"\x89PNG\r\n").decode()
+        prompt, skipped = build_user_prompt("see [Image #1] please", [good])
+        assert skipped == 0
+        assert isinstance(prompt, list)
+        assert prompt[0] == "see "
+        assert isinstance(prompt[1], BinaryContent)
+        assert prompt[2] == " please"
+
+    def test_unreferenced_image_is_dropped_when_tokens_present(self):
+        from pydantic_ai import BinaryContent
+
+        from oterm.app.widgets.chat import build_user_prompt
+
+        good1 = base64.b64encode(b"\x89PNG\r\n1").decode()
+        good2 = base64.b64encode(b"\x89PNG\r\n2").decode()
+        prompt, skipped = build_user_prompt("[Image #2] only", [good1, good2])
+        assert skipped == 0
+        assert isinstance(prompt, list)
+        # Only image #2 is referenced; image #1 is not appended.
+        binaries = [p for p in prompt if isinstance(p, BinaryContent)]
+        assert len(binaries) == 1
+
+    def test_invalid_token_index_preserved_as_literal(self):
+        from oterm.app.widgets.chat import build_user_prompt
+
+        prompt, skipped = build_user_prompt("[Image #5] hi", [])
+        assert skipped == 0
+        assert prompt == "[Image #5] hi"
+
+    def test_no_token_all_invalid_b64_returns_text(self):
+        from oterm.app.widgets.chat import build_user_prompt
+
+        prompt, skipped = build_user_prompt("describe", ["not-valid!!"])
+        assert skipped == 1
+        assert prompt == "describe"
+
+    def test_token_with_invalid_b64_increments_skipped(self):
+        from oterm.app.widgets.chat import build_user_prompt
+
+        prompt, skipped = build_user_prompt("see [Image #1]", ["not-valid!!"])
+        assert skipped == 1
+        assert prompt == "see [Image #1]"
+
+    def test_text_ending_at_token_keeps_no_trailing(self):
+        from pydantic_ai import BinaryContent
+
+        from oterm.app.widgets.chat import build_user_prompt
+
+        good = base64.b64encode(b"\x89PNG\r\n").decode()
+        prompt, skipped = build_user_prompt("see [Image #1]", [good])
+        assert skipped == 0
+        assert isinstance(prompt, list)
+        assert prompt[-1].__class__ is BinaryContent  # no trailing text part
+
+
+async def _long_chat(store, chat_model, count: int) -> list[MessageModel]:
+    chat_model.id = await store.save_chat(chat_model)
+    messages = []
+    for i in range(count):
+        message = MessageModel(
+            chat_id=chat_model.id,
+            role="user" if i % 2 == 0 else "assistant",
+            text=f"message {i}",
+        )
+        message.id = await store.save_message(message)
+        messages.append(message)
+    return messages
+
+
+def _settled(message_list) -> bool:
+    """No window update in flight and every mounted row is tracked."""
+    return not message_list._syncing and len(message_list.query(ChatItem)) == len(
+        message_list._items
+    )
+
+
+def _settled_at_end(message_list) -> bool:
+    return (
+        _settled(message_list)
+        and message_list.scroll_y > 0
+        and message_list.max_scroll_y - message_list.scroll_y <= 2
+    )
+
+
+class TestMessageList:
+    @pytest.fixture(autouse=True)
+    def _one_page(self, monkeypatch):
+        # Every row up front; paging is covered by `TestPaging`.
+        monkeypatch.setattr(ChatContainer, "PAGE_SIZE", 1000)
+
+    async def test_long_chat_mounts_only_rows_near_the_end(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 300)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(
+                pilot,
+                lambda: (
+                    _settled(message_list)
+                    and message_list.scroll_y > 0
+                    and message_list.max_scroll_y - message_list.scroll_y <= 2
+                ),
+            )
+
+            texts = [item.text for item in container.query(ChatItem)]
+            assert 0 < len(texts) < 100
+            assert texts[-1] == "message 299"
+            assert "message 0" not in texts
+            # The spacer stands in for the unmounted rows above.
+            assert message_list.virtual_size.height >= 300 * 2
+            assert message_list.max_scroll_y - message_list.scroll_y <= 2
+
+    async def test_scrolling_recycles_items(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 300)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+            before = set(container.query(ChatItem))
+
+            message_list.scroll_home(animate=False, immediate=True)
+            await wait_until(
+                pilot,
+                lambda: _settled(message_list) and 0 in message_list._items,
+            )
+
+            after = list(container.query(ChatItem))
+            assert len(after) < 100
+            assert "message 299" not in [item.text for item in after]
+            assert before & set(after), "items should be rebound, not remounted"
+            assert [item.text for item in after][:2] == ["message 0", "message 1"]
+            assert [item.author for item in after][:2] == ["user", "assistant"]
+
+    async def test_recycled_item_copies_its_new_text(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 300)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+            before = set(container.query(ChatItem))
+
+            message_list.scroll_home(animate=False, immediate=True)
+            await wait_until(
+                pilot,
+                lambda: _settled(message_list) and 1 in message_list._items,
+            )
+            await pilot.pause()
+
+            item = message_list._items[1]
+            assert item.text == "message 1"
+            assert item in before
+            copied: list[str] = []
+            app.copy_to_clipboard = copied.append  # ty: ignore[invalid-assignment]
+            await pilot.click(item.query_one(".response", Markdown))
+            assert copied == ["message 1"]
+
+    async def test_measured_heights_replace_estimates(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        chat_model.id = await store.save_chat(chat_model)
+        long_text = "\n\n".join(f"paragraph {i}" for i in range(10))
+        for role in ("user", "assistant"):
+            await store.save_message(
+                MessageModel(chat_id=chat_model.id, role=role, text=long_text)
+            )
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            await pilot.pause()
+
+            message_list = container.query_one(MessageList)
+            items = list(container.query(ChatItem))
+            await wait_until(pilot, lambda: len(message_list._heights) == 2)
+            assert message_list._heights == {
+                0: items[0].outer_size.height,
+                1: items[1].outer_size.height,
+            }
+
+    async def test_mis_estimated_rows_above_keep_the_view_in_place(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
+
+        chat_model.id = await store.save_chat(chat_model)
+        # Blank lines count towards the estimate, but Markdown paragraphs here
+        # have no margin, so each row renders shorter than estimated.
+        text = "\n\n".join(f"paragraph {i}" for i in range(10))
+        for _ in range(100):
+            await store.save_message(
+                MessageModel(chat_id=chat_model.id, role="assistant", text=text)
+            )
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            estimate = message_list._estimate(message_list._rows[0])
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+
+            message_list.scroll_to(y=50 * estimate, animate=False, immediate=True)
+
+            def row_50_at_top() -> bool:
+                items = {id(i): i for i in message_list._items.values()}
+                row = message_list._items.get(50)
+                return (
+                    row is not None
+                    and all(i.outer_size.height for i in items.values())
+                    and row.virtual_region.y == round(message_list.scroll_y)
+                )
+
+            await wait_until(pilot, row_50_at_top)
+            assert row_50_at_top()
+            assert message_list._heights[49] < estimate
+
+    async def test_rebinding_assistant_item_swaps_images(self, store, chat_model):
+        from io import BytesIO
+
+        from PIL import Image as PILImage
+
+        from oterm.app.widgets.chat import AssistantImage
+
+        buf = BytesIO()
+        PILImage.new("RGB", (4, 4), "red").save(buf, format="PNG")
+        png = buf.getvalue()
+        chat_model.id = await store.save_chat(chat_model)
+        first = MessageModel(
+            chat_id=chat_model.id,
+            role="assistant",
+            text="one",
+            images=[await store.save_image(png)],
+        )
+        second = MessageModel(chat_id=chat_model.id, role="assistant", text="two")
+
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            item = ChatItem()
+            item.author = "assistant"
+            await container.query_one("#messageContainer").mount(item)
+
+            thumbnail = PILImage.open(BytesIO(png))
+            await item.show_message(first, [(first.images[0], thumbnail)])
+            await pilot.pause()
+            assert item.text == "one"
+            assert len(item.query(AssistantImage)) == 1
+
+            await item.show_message(second, [])
+            await pilot.pause()
+            assert item.text == "two"
+            assert len(item.query(AssistantImage)) == 0
+            assert "two" in item.query_one(".response", Markdown).source
+
+    async def test_remove_last_drops_last_row(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 4)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+
+            await message_list.remove_last()
+            await pilot.pause()
+            texts = [item.text for item in container.query(ChatItem)]
+            assert texts == ["message 0", "message 1", "message 2"]
+
+    async def test_remove_last_prefers_widgets_mounted_after_rows(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 2)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            live = ChatItem()
+            live.author = "assistant"
+            live.text = "live"
+            await message_list.mount(live)
+            await message_list.mount(UsageStatus())
+
+            await message_list.remove_last()
+            await pilot.pause()
+            assert [i.text for i in container.query(ChatItem)] == [
+                "message 0",
+                "message 1",
+            ]
+            assert list(container.query(UsageStatus)) == []
+
+    async def test_new_rows_mounted_before_a_recycled_one_keep_their_order(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
+
+        chat_model.id = await store.save_chat(chat_model)
+        # Only assistant items are mounted at the end, so jumping to the one
+        # user message mounts it new, between recycled assistant items.
+        target = 0
+        for i in range(300):
+            message = MessageModel(
+                chat_id=chat_model.id,
+                role="user" if i == 100 else "assistant",
+                text=f"message {i}",
+            )
+            message.id = await store.save_message(message)
+            if i == 100:
+                target = message.id
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+            before = set(container.query(ChatItem))
+
+            assert await message_list.show_message(target)
+            await wait_until(pilot, lambda: _settled(message_list))
+
+            items = list(container.query(ChatItem))
+            indexes = sorted(message_list._items)
+            assert [i.text for i in items] == [f"message {i}" for i in indexes]
+            assert message_list._items[100].author == "user"
+            assert message_list._items[100] not in before
+            assert before & set(items)
+
+    async def test_found_highlight_fades(self, store, chat_model, monkeypatch):
+        from oterm.app.widgets.chat import MessageList
+
+        monkeypatch.setattr(MessageList, "HIGHLIGHT_DURATION", 0.1)
+        await _long_chat(store, chat_model, 4)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled(message_list))
+            first, second = (m.id for m in message_list._rows[:2])
+            assert first is not None and second is not None
+
+            assert not await message_list.show_message(max(first, second) + 1000)
+            assert message_list._found is None
+
+            # A second find before the first fades keeps its own highlight.
+            assert await message_list.show_message(first)
+            assert await message_list.show_message(second)
+            message_list._unhighlight(0)
+            assert message_list._found == 1
+            assert message_list._items[1].has_class("-found")
+            await wait_until(pilot, lambda: message_list._found is None)
+            assert not container.query("ChatItem.-found")
+
+    async def test_found_row_scrolled_out_of_view_stops_being_found(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
+
+        messages = await _long_chat(store, chat_model, 300)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+            assert await message_list.show_message(messages[0].id)  # ty: ignore[invalid-argument-type]
+            await wait_until(
+                pilot,
+                lambda: _settled(message_list) and message_list._target is None,
+            )
+
+            message_list.scroll_end(animate=False)
+            await wait_until(pilot, lambda: _settled_at_end(message_list))
+            assert 0 not in message_list._items
+            message_list._unhighlight(0)
+            assert message_list._found is None
+
+    async def test_scrolling_within_a_row_does_not_sync(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 4)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled(message_list))
+
+            message_list.watch_scroll_y(3.1, 3.3)
+            assert not message_list._dirty
+            message_list.watch_scroll_y(3.3, 4.0)
+            assert message_list._dirty
+
+    async def test_scroll_target_is_only_used_once(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        await _long_chat(store, chat_model, 4)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _settled(message_list))
+            scrolls: list[float | None] = []
+            message_list.scroll_to = (  # ty: ignore[invalid-assignment]
+                lambda y=None, **kwargs: scrolls.append(y)
+            )
 
-            good = base64.b64encode(b"\x89PNG\r\n").decode()
-            bad = "not-valid-base64!!"
+            # Two queued scrolls (e.g. two pages prepended before a refresh)
+            # go to the target once.
+            message_list._target = 7
+            message_list._scroll_to_target()
+            message_list._scroll_to_target()
+            assert scrolls == [7]
+            assert message_list._target is None
 
-            user_prompt, skipped = build_user_prompt("look", [good, bad])
-            assert skipped == 1
 
-            chunks = []
-            async for chunk in container.stream_agent(user_prompt):
-                chunks.append(chunk)
+def _paged(message_list) -> bool:
+    """Settled, with no page being read."""
+    return _settled(message_list) and not any(
+        worker.group == "history" and worker.is_running
+        for worker in message_list.app.workers
+    )
 
-            text = "".join(
-                p.content_delta for p in chunks if isinstance(p, TextPartDelta)
-            )
-            assert text == "ok response"
-            await pilot.pause()
 
+class TestPaging:
+    @pytest.fixture(autouse=True)
+    def _small_pages(self, monkeypatch):
+        monkeypatch.setattr(ChatContainer, "PAGE_SIZE", 10)
 
-class TestBuildUserPrompt:
-    def test_no_tokens_no_images_returns_text(self):
-        from oterm.app.widgets.chat import build_user_prompt
+    async def test_opens_with_the_latest_page(self, store, chat_model, monkeypatch):
+        from oterm.app.widgets.chat import MessageList
+        from oterm.store.store import Store
 
-        assert build_user_prompt("hello", []) == ("hello", 0)
+        await _long_chat(store, chat_model, 35)
+        pages: list[tuple[int | None, int | None]] = []
+        get_messages = Store.get_messages
 
-    def test_no_tokens_with_images_appends_at_end(self):
-        from pydantic_ai import BinaryContent
+        async def spy(self, chat_id, before_id=None, limit=None):
+            pages.append((before_id, limit))
+            return await get_messages(self, chat_id, before_id, limit)
 
-        from oterm.app.widgets.chat import build_user_prompt
+        monkeypatch.setattr(Store, "get_messages", spy)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _paged(message_list))
+
+            assert pages[0] == (None, 10)
+            # Older pages are read only while the first row is within reach.
+            assert message_list.has_older
+            assert 10 <= len(message_list._rows) < 35
+            assert message_list._rows[-1].text == "message 34"
+            assert container.messages == []
 
-        good = base64.b64encode(b"\x89PNG\r\n").decode()
-        prompt, skipped = build_user_prompt("describe", [good])
-        assert skipped == 0
-        assert isinstance(prompt, list)
-        assert prompt[0] == "describe"
-        assert isinstance(prompt[1], BinaryContent)
+    async def test_scrolling_back_prepends_older_pages_in_place(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
 
-    def test_token_interleaves_image_at_position(self):
-        from pydantic_ai import BinaryContent
+        messages = await _long_chat(store, chat_model, 35)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(
+                pilot,
+                lambda: _settled_at_end(message_list) and _paged(message_list),
+            )
+            assert message_list.has_older
+            first = message_list.first_row
+            assert first is not None
 
-        from oterm.app.widgets.chat import build_user_prompt
+            message_list.scroll_home(animate=False, immediate=True)
+            await wait_until(
+                pilot,
+                lambda: not message_list.has_older and _paged(message_list),
+            )
+            assert [m.id for m in message_list._rows] == [m.id for m in messages]
 
-        good = base64.b64encode(b"\x89PNG\r\n").decode()
-        prompt, skipped = build_user_prompt("see [Image #1] please", [good])
-        assert skipped == 0
-        assert isinstance(prompt, list)
-        assert prompt[0] == "see "
-        assert isinstance(prompt[1], BinaryContent)
-        assert prompt[2] == " please"
+            # The row that was first when scrolled back is still at the top.
+            index = message_list._rows.index(first)
 
-    def test_unreferenced_image_is_dropped_when_tokens_present(self):
-        from pydantic_ai import BinaryContent
+            def first_at_top() -> bool:
+                row = message_list._items.get(index)
+                return (
+                    row is not None
+                    and row.text == first.text
+                    and row.virtual_region.y == round(message_list.scroll_y)
+                )
 
-        from oterm.app.widgets.chat import build_user_prompt
+            await wait_until(pilot, first_at_top)
+            assert first_at_top()
 
-        good1 = base64.b64encode(b"\x89PNG\r\n1").decode()
-        good2 = base64.b64encode(b"\x89PNG\r\n2").decode()
-        prompt, skipped = build_user_prompt("[Image #2] only", [good1, good2])
-        assert skipped == 0
-        assert isinstance(prompt, list)
-        # Only image #2 is referenced; image #1 is not appended.
-        binaries = [p for p in prompt if isinstance(p, BinaryContent)]
-        assert len(binaries) == 1
+    async def test_landing_on_an_older_message_reads_back_to_it(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
 
-    def test_invalid_token_index_preserved_as_literal(self):
-        from oterm.app.widgets.chat import build_user_prompt
+        messages = await _long_chat(store, chat_model, 35)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.land_on(messages[3].id)  # ty: ignore[invalid-argument-type]
+            await container.load_messages()
+            await pilot.pause()
+            message_list = container.query_one(MessageList)
 
-        prompt, skipped = build_user_prompt("[Image #5] hi", [])
-        assert skipped == 0
-        assert prompt == "[Image #5] hi"
+            assert message_list.first_row is not None
+            assert message_list.first_row.text == "message 0"
+            [found] = container.query("ChatItem.-found").results(ChatItem)
+            assert found.text == "message 3"
 
-    def test_no_token_all_invalid_b64_returns_text(self):
-        from oterm.app.widgets.chat import build_user_prompt
+    async def test_landing_on_a_loaded_message_reads_nothing_more(
+        self, store, chat_model
+    ):
+        from oterm.app.widgets.chat import MessageList
 
-        prompt, skipped = build_user_prompt("describe", ["not-valid!!"])
-        assert skipped == 1
-        assert prompt == "describe"
+        messages = await _long_chat(store, chat_model, 35)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            container.land_on(messages[-3].id)  # ty: ignore[invalid-argument-type]
+            await container.load_messages()
+            await pilot.pause()
+            message_list = container.query_one(MessageList)
 
-    def test_token_with_invalid_b64_increments_skipped(self):
-        from oterm.app.widgets.chat import build_user_prompt
+            assert message_list.has_older
+            [found] = container.query("ChatItem.-found").results(ChatItem)
+            assert found.text == "message 32"
 
-        prompt, skipped = build_user_prompt("see [Image #1]", ["not-valid!!"])
-        assert skipped == 1
-        assert prompt == "see [Image #1]"
+    async def test_page_read_while_cleared_is_dropped(
+        self, store, chat_model, monkeypatch
+    ):
+        from oterm.app.widgets.chat import MessageList
 
-    def test_text_ending_at_token_keeps_no_trailing(self):
-        from pydantic_ai import BinaryContent
+        await _long_chat(store, chat_model, 35)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _paged(message_list))
+            page = container._page
 
-        from oterm.app.widgets.chat import build_user_prompt
+            async def cleared_meanwhile(before_id=None):
+                messages = await page(before_id)
+                await message_list.load([])
+                return messages
 
-        good = base64.b64encode(b"\x89PNG\r\n").decode()
-        prompt, skipped = build_user_prompt("see [Image #1]", [good])
-        assert skipped == 0
-        assert isinstance(prompt, list)
-        assert prompt[-1].__class__ is BinaryContent  # no trailing text part
+            monkeypatch.setattr(container, "_page", cleared_meanwhile)
+            await container._load_older()
+            assert message_list._rows == []
+
+    async def test_older_pages_keep_the_found_message(self, store, chat_model):
+        from oterm.app.widgets.chat import MessageList
+
+        messages = await _long_chat(store, chat_model, 35)
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            message_list = container.query_one(MessageList)
+            await wait_until(pilot, lambda: _paged(message_list))
+            first = message_list.first_row
+            assert first is not None and first.id is not None
+            assert await message_list.show_message(first.id)
+
+            await container._load_older(until=messages[0].id)
+            assert message_list._found is not None
+            assert message_list._rows[message_list._found] is first
+
+            # Reading back past the first message finds nothing more.
+            await message_list.prepend([], older=False)
+            assert not message_list.has_older
+            assert len(message_list._rows) == len(messages)
 
 
 class TestPydanticHistoryRebuild:
@@ -462,18 +1424,18 @@ class TestPydanticHistoryRebuild:
 
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
-        good = base64.b64encode(b"\x89PNG\r\n").decode()
         msg = MessageModel(
             chat_id=chat_id,
             role="user",
             text="see [Image #1] please",
-            images=[good],
+            images=[await store.save_image(b"\x89PNG\r\n")],
         )
         msg.id = await store.save_message(msg)
 
-        app = _Host(chat_model, [msg])
+        app = _Host(chat_model)
         async with app.run_test():
             container = app.query_one(ChatContainer)
+            await container._fetch_messages()
             history = container.pydantic_history
             assert len(history) == 1
             req = history[0]
@@ -491,18 +1453,18 @@ class TestPydanticHistoryRebuild:
 
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
-        good = base64.b64encode(b"\x89PNG\r\n").decode()
         msg = MessageModel(
             chat_id=chat_id,
             role="user",
             text="describe",
-            images=[good],
+            images=[await store.save_image(b"\x89PNG\r\n")],
         )
         msg.id = await store.save_message(msg)
 
-        app = _Host(chat_model, [msg])
+        app = _Host(chat_model)
         async with app.run_test():
             container = app.query_one(ChatContainer)
+            await container._fetch_messages()
             req = container.pydantic_history[0]
             assert isinstance(req, ModelRequest)
             user_part = req.parts[0]
@@ -639,6 +1601,35 @@ class TestEditChat:
             assert reloaded.thinking is True
             assert reloaded.parameters == {"temperature": 0.2}
 
+    async def test_edited_chat_fetches_capabilities_off_the_event_loop(
+        self, store, chat_model, monkeypatch
+    ):
+        import threading
+
+        from oterm.providers import ollama as ollama_mod
+
+        chat_model.id = await store.save_chat(chat_model)
+        threads: list[threading.Thread] = []
+
+        def fake_show(model):
+            threads.append(threading.current_thread())
+            return {"parameters": "num_ctx 8192"}
+
+        monkeypatch.setattr(ollama_mod, "show_model", fake_show)
+        app = _Host(chat_model, [])
+
+        async def fake_push_screen_wait(self, screen):
+            return chat_model.model_dump_json()
+
+        monkeypatch.setattr(type(app), "push_screen_wait", fake_push_screen_wait)
+
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            assert container.context_window.window is None
+            container.action_edit_chat()
+            await wait_until(pilot, lambda: container.context_window.window == 8192)
+            assert threads and threads[0] is not threading.main_thread()
+
     async def test_edit_chat_cancelled_modal_is_noop(
         self, store, chat_model, monkeypatch
     ):
@@ -671,18 +1662,17 @@ class TestToggleThinking:
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
 
-        monkeypatch.setattr(
-            chat_module,
-            "get_capabilities",
-            lambda provider, model: ModelCapabilities(supports_thinking=True),
-        )
+        async def fake_fetch(provider, model):
+            return ModelCapabilities(supports_thinking=True)
+
+        monkeypatch.setattr(chat_module, "fetch_capabilities", fake_fetch)
 
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
             assert container.chat_model.thinking is False
 
-            container.action_toggle_thinking()
+            await container.action_toggle_thinking()
             await pilot.pause()
 
             assert container.chat_model.thinking is True
@@ -702,16 +1692,15 @@ class TestToggleThinking:
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
 
-        monkeypatch.setattr(
-            chat_module,
-            "get_capabilities",
-            lambda provider, model: ModelCapabilities(supports_thinking=True),
-        )
+        async def fake_fetch(provider, model):
+            return ModelCapabilities(supports_thinking=True)
+
+        monkeypatch.setattr(chat_module, "fetch_capabilities", fake_fetch)
 
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
-            container.action_toggle_thinking()
+            await container.action_toggle_thinking()
             await pilot.pause()
 
             assert container.chat_model.thinking is False
@@ -729,11 +1718,10 @@ class TestToggleThinking:
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
 
-        monkeypatch.setattr(
-            chat_module,
-            "get_capabilities",
-            lambda provider, model: ModelCapabilities(supports_thinking=True),
-        )
+        async def fake_fetch(provider, model):
+            return ModelCapabilities(supports_thinking=True)
+
+        monkeypatch.setattr(chat_module, "fetch_capabilities", fake_fetch)
 
         thinking_seen: list[bool] = []
 
@@ -747,7 +1735,7 @@ class TestToggleThinking:
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
             thinking_seen.clear()
-            container.action_toggle_thinking()
+            await container.action_toggle_thinking()
             await pilot.pause()
             assert thinking_seen == [True]
 
@@ -760,16 +1748,15 @@ class TestToggleThinking:
         chat_id = await store.save_chat(chat_model)
         chat_model.id = chat_id
 
-        monkeypatch.setattr(
-            chat_module,
-            "get_capabilities",
-            lambda provider, model: ModelCapabilities(supports_thinking=False),
-        )
+        async def fake_fetch(provider, model):
+            return ModelCapabilities(supports_thinking=False)
+
+        monkeypatch.setattr(chat_module, "fetch_capabilities", fake_fetch)
 
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
-            container.action_toggle_thinking()
+            await container.action_toggle_thinking()
             await pilot.pause()
 
             assert any(
@@ -1170,7 +2157,7 @@ class TestChatItemStreaming:
     incrementally instead of re-parsing the whole document per token.
     """
 
-    async def test_append_text_updates_text_reactive(self, chat_model):
+    async def test_append_text_buffers_until_finish(self, chat_model):
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
             container = app.query_one(ChatContainer)
@@ -1182,10 +2169,33 @@ class TestChatItemStreaming:
             await item.append_text("hello ")
             await item.append_text("world")
             await pilot.pause()
+            # Deltas are not concatenated onto the reactive per token.
+            assert item.text == ""
 
-            # Reactive kept in sync for click-to-copy and chrome refresh.
+            await item.finish_stream()
             assert item.text == "hello world"
 
+    async def test_click_copies_text_streamed_so_far(self, chat_model):
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            item = ChatItem()
+            item.author = "assistant"
+            await container.query_one("#messageContainer").mount(item)
+            await pilot.pause()
+
+            await item.append_text("hello ")
+            await item.append_text("world")
+            await pilot.pause()
+            copied: list[str] = []
+            app.copy_to_clipboard = copied.append  # ty: ignore[invalid-assignment]
+            await pilot.click(item.query_one(".response", Markdown))
+            assert copied == ["hello world"]
+
+            await item.append_text("!")
+            await item.finish_stream()
+            assert item.text == "hello world!"
+
     async def test_append_text_collapses_thoughts_on_first_delta(self, chat_model):
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
@@ -1228,6 +2238,7 @@ class TestChatItemStreaming:
             await pilot.pause()
 
             assert label.display is True
+            await item.finish_stream()
             assert item.thinking == "musing"
 
     async def test_user_item_append_is_noop(self, chat_model):
@@ -1290,6 +2301,7 @@ class TestChatItemStreaming:
             await pilot.pause()
             # Second call must reuse the same MarkdownStream, not recreate one.
             assert item._thinking_stream is stream
+            await item.finish_stream()
             assert item.thinking == "first second"
 
     async def test_finish_stream_drains_thinking_stream(self, chat_model):
@@ -1378,6 +2390,52 @@ class TestChatItemStreaming:
             assert item._thinking_stream is None
 
 
+class TestStoredImages:
+    async def test_attached_image_is_stored_once_and_replayed(self, store, chat_model):
+        import hashlib
+
+        from pydantic_ai import BinaryContent
+        from pydantic_ai.messages import ModelRequest, UserPromptPart
+
+        chat_id = await store.save_chat(chat_model)
+        chat_model.id = chat_id
+        png = b"\x89PNG\r\nimage"
+        seen: list[bytes] = []
+
+        async def stream_fn(
+            messages: list[ModelMessage], info: AgentInfo
+        ) -> AsyncIterator[str]:
+            request = messages[-1]
+            assert isinstance(request, ModelRequest)
+            part = request.parts[-1]
+            assert isinstance(part, UserPromptPart)
+            seen.extend(p.data for p in part.content if isinstance(p, BinaryContent))
+            yield "a cat"
+
+        app = _Host(chat_model)
+        async with app.run_test():
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            container.agent = Agent(FunctionModel(stream_function=stream_fn))
+            b64 = base64.b64encode(png).decode()
+            container.images = [(Path("/tmp/a.png"), b64), (Path("/tmp/b.png"), b64)]
+
+            await container.response_task("[Image #1] and [Image #2]")
+
+            digest = hashlib.sha256(png).hexdigest()
+            assert container.messages[0].images == [digest, digest]
+            assert await store.get_image(digest) == png
+            count = await store.connection.execute_fetchall(
+                "SELECT COUNT(*) FROM image"
+            )
+            assert list(count)[0][0] == 1
+
+            seen.clear()
+            await container.action_regenerate_llm_message()
+            await container.inference_task
+            assert seen == [png, png]
+
+
 class TestSkippedImageNotify:
     async def test_response_task_notifies_for_malformed_image(self, store, chat_model):
         chat_id = await store.save_chat(chat_model)
@@ -1571,7 +2629,7 @@ class TestThinkingViaResponseTask:
             # Persisted: the assistant row carries the image as base64.
             assistant_row = container.messages[-1]
             assert len(assistant_row.images) == 1
-            assert base64.b64decode(assistant_row.images[0]) == png_bytes
+            assert await store.get_image(assistant_row.images[0]) == png_bytes
             stored = await store.get_messages(chat_id)
             assistant_rows = [m for m in stored if m.role == "assistant"]
             assert len(assistant_rows[0].images) == 1
@@ -1706,11 +2764,12 @@ class TestThinkingViaResponseTask:
 
     async def test_tool_returning_binary_image_renders_inline(self, store, chat_model):
         """A tool returning `BinaryImage` mounts an Image widget and persists."""
+        import zlib
         from io import BytesIO
 
         from PIL import Image as PILImage
         from pydantic_ai import Tool
-        from pydantic_ai.messages import BinaryImage
+        from pydantic_ai.messages import BinaryImage, ToolReturnPart
         from pydantic_ai.models.function import DeltaToolCall
         from textual_image.widget import Image as ImageWidget
 
@@ -1767,11 +2826,26 @@ class TestThinkingViaResponseTask:
 
             assistant_row = container.messages[-1]
             assert len(assistant_row.images) == 1
-            assert base64.b64decode(assistant_row.images[0]) == png_bytes
+            assert await store.get_image(assistant_row.images[0]) == png_bytes
             stored = await store.get_messages(chat_id)
             assistant_rows = [m for m in stored if m.role == "assistant"]
             assert len(assistant_rows[0].images) == 1
 
+            # The saved turn references the stored image instead of repeating
+            # it, and replays it from the store.
+            history = assistant_rows[0].history
+            assert history is not None
+            assert base64.b64encode(png_bytes) not in zlib.decompress(history)
+            container.messages = stored
+            replayed = await container._load_pydantic_history()
+            [tool_return] = [
+                part
+                for message in replayed
+                for part in message.parts
+                if isinstance(part, ToolReturnPart)
+            ]
+            assert tool_return.content.data == png_bytes  # ty: ignore[unresolved-attribute]
+
     async def test_persisted_assistant_image_renders_on_load(self, store, chat_model):
         from io import BytesIO
 
@@ -1790,7 +2864,7 @@ class TestThinkingViaResponseTask:
             chat_id=chat_id,
             role="assistant",
             text="here you go",
-            images=[base64.b64encode(png_bytes).decode()],
+            images=[await store.save_image(png_bytes)],
         )
         assistant_msg.id = await store.save_message(assistant_msg)
 
@@ -1927,6 +3001,85 @@ class TestToolCallRendering:
             assert saved[0].suffix == ".png"
             assert any("Image saved" in n.message for n in _notifications(app))
 
+    async def test_stored_image_shows_a_thumbnail_and_saves_the_original(
+        self, store, chat_model, tmp_path, monkeypatch
+    ):
+        from io import BytesIO
+
+        from PIL import Image as PILImage
+
+        import oterm.config
+        from oterm.app.widgets.chat import AssistantImage
+        from oterm.thumbnails import THUMBNAIL_SIZE
+
+        monkeypatch.setattr(oterm.config.envConfig, "OTERM_DATA_DIR", tmp_path)
+        buf = BytesIO()
+        PILImage.new("RGB", (1024, 1024), "teal").save(buf, format="JPEG")
+        jpg_bytes = buf.getvalue()
+        chat_model.id = await store.save_chat(chat_model)
+        await store.save_message(
+            MessageModel(
+                chat_id=chat_model.id,
+                role="assistant",
+                text="here",
+                images=[await store.save_image(jpg_bytes)],
+            )
+        )
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            await pilot.pause()
+            [item] = container.query(ChatItem)
+            image = item.query_one(AssistantImage)
+            assert image.image_bytes is None
+            assert max(image.image.size) == THUMBNAIL_SIZE
+
+            await item._save_assistant_image(image)
+            [saved] = (tmp_path / "downloads").iterdir()
+            assert saved.read_bytes() == jpg_bytes
+            assert saved.suffix == ".jpg"
+
+    async def test_cached_thumbnail_outlives_its_stored_image(
+        self, store, chat_model, tmp_path
+    ):
+        from io import BytesIO
+
+        from PIL import Image as PILImage
+
+        from oterm.app.widgets.chat import AssistantImage
+        from oterm.thumbnails import make_thumbnail
+
+        buf = BytesIO()
+        PILImage.new("RGB", (8, 8), "teal").save(buf, format="PNG")
+        chat_model.id = await store.save_chat(chat_model)
+        hash = await store.save_image(buf.getvalue())
+        await store.save_message(
+            MessageModel(
+                chat_id=chat_model.id, role="assistant", text="here", images=[hash]
+            )
+        )
+        make_thumbnail(hash, buf.getvalue())
+        await store.connection.execute("DELETE FROM image")
+        await store.connection.commit()
+
+        app = _Host(chat_model)
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            await container.load_messages()
+            await pilot.pause()
+            [item] = container.query(ChatItem)
+            image = item.query_one(AssistantImage)
+            assert image.image is not None
+
+            await item._save_assistant_image(image)
+            await pilot.pause()
+            assert not (tmp_path / "downloads").exists()
+            assert any(
+                n.message == "Image is no longer stored." for n in _notifications(app)
+            )
+
     async def test_jpeg_assistant_image_saves_with_jpg_extension(
         self, chat_model, tmp_path, monkeypatch
     ):
@@ -2080,6 +3233,59 @@ class TestUsageStatus:
             assert "↑ 42" in rendered
             assert "↓ 7" in rendered
 
+    async def test_prompt_cache_tokens_shown_with_input(self, chat_model):
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            status = UsageStatus()
+            await container.query_one("#messageContainer").mount(status)
+            await pilot.pause()
+
+            status.update_usage(input_tokens=42, output_tokens=7)
+            assert "cache" not in str(status.render())
+            status.update_usage(
+                input_tokens=1200,
+                output_tokens=7,
+                cache_read_tokens=1000,
+                cache_write_tokens=150,
+            )
+            assert "↑ 1200 (1000 cached, 150 to cache)" in str(status.render())
+
+    async def test_rate_shown_once_output_starts(self, chat_model):
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            status = UsageStatus()
+            await container.query_one("#messageContainer").mount(status)
+            await pilot.pause()
+
+            status.update_usage(input_tokens=10, output_tokens=50)
+            assert status.tokens_per_second is None
+            assert "tok/s" not in str(status.render())
+
+            status.start_output()
+            # No time has passed since the output started.
+            assert status.tokens_per_second is None
+            status._output_started_at = time.monotonic() - 2.0
+            status.finish()
+            await pilot.pause()
+            assert status.tokens_per_second is not None
+            assert 20 <= status.tokens_per_second <= 25
+            assert "tok/s" in str(status.render())
+
+    async def test_context_budget_shown_when_known(self, chat_model):
+        app = _Host(chat_model, [])
+        async with app.run_test() as pilot:
+            container = app.query_one(ChatContainer)
+            status = UsageStatus()
+            await container.query_one("#messageContainer").mount(status)
+            await pilot.pause()
+
+            status.update_context(1234, None)
+            assert "ctx" not in str(status.render())
+            status.update_context(1234, 96000)
+            assert "ctx 1.2k/96k" in str(status.render())
+
     async def test_finish_drops_spinner_glyph(self, chat_model):
         app = _Host(chat_model, [])
         async with app.run_test() as pilot:
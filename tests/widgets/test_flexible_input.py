@@ -142,10 +142,10 @@ async def test_delete_in_plain_text_no_token():
 
 
 async def test_add_image_callback_posts_image_added_message():
-    """When the image screen returns a (path, b64), FlexibleInput posts ImageAdded."""
+    """When the image screen returns a path, FlexibleInput posts ImageSelected."""
     from pathlib import Path
 
-    from oterm.app.widgets.image import ImageAdded
+    from oterm.app.widgets.image import ImageSelected
 
     app = _Host()
     async with app.run_test() as pilot:
@@ -154,8 +154,8 @@ async def test_add_image_callback_posts_image_added_message():
         original = flex.post_message
 
         def record(msg):
-            if isinstance(msg, ImageAdded):
-                received.append((msg.path, msg.image))
+            if isinstance(msg, ImageSelected):
+                received.append(msg.path)
             return original(msg)
 
         flex.post_message = record  # ty: ignore[invalid-assignment]
@@ -169,8 +169,8 @@ async def test_add_image_callback_posts_image_added_message():
         flex.action_add_image()
         await pilot.pause()
         _, cb = received_calls[0]
-        await cb((Path("/tmp/img.png"), "b64"))
+        await cb(Path("/tmp/img.png"))
         await cb(None)  # callback with None is a no-op
         await pilot.pause()
 
-        assert received == [(Path("/tmp/img.png"), "b64")]
+        assert received == [Path("/tmp/img.png")]
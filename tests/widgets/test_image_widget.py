@@ -1,12 +1,22 @@
 from pathlib import Path
 
-from oterm.app.widgets.image import IMAGE_EXTENSIONS, ImageAdded, ImageDirectoryTree
+from oterm.app.widgets.image import (
+    IMAGE_EXTENSIONS,
+    ImageAdded,
+    ImageDirectoryTree,
+    ImageSelected,
+)
 
 
 def test_image_added_carries_path_and_b64():
     msg = ImageAdded(Path("/tmp/x.png"), "b64data")
     assert msg.path == Path("/tmp/x.png")
     assert msg.image == "b64data"
+    assert msg.prepared is None
+
+
+def test_image_selected_carries_path():
+    assert ImageSelected(Path("/tmp/x.png")).path == Path("/tmp/x.png")
 
 
 def test_image_extensions_contains_common_formats():